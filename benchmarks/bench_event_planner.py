@@ -0,0 +1,253 @@
+import copy
+import os
+import sqlite3
+import sys
+from datetime import date
+
+import streamlit as st
+
+from data import _categories, make_event_data
+from harness import benchmark, load_app_module
+
+# event_planner 핫패스 벤치마크
+
+
+class Context:
+    HISTORY_SAVES = 25
+    MIGRATION_COPIES = 10
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.app = load_app_module('event_planner', 'main.py', 'event_planner_main')
+        self.workdir = os.getcwd()
+        self.stored = make_event_data(scale['categories'], scale['items'], scale['deliveries'])
+        self.event = self.app.event_from_dict(self.stored)
+
+        # 조회 벤치마크용 이벤트 채우기
+        for seed in range(scale['events']):
+            self.app.save_event_data(self.app.event_from_dict(
+                make_event_data(scale['categories'], scale['items'], scale['deliveries'], seed=seed)))
+        self.saved_id = self.app.get_all_events()[0][0]
+
+        # 버전 이력 벤치마크용: 한 이벤트를 여러 번 수정 저장
+        history_event = copy.deepcopy(self.event)
+        for i in range(self.HISTORY_SAVES):
+            history_event.contract_amount += i
+            history_event.expected_profit_percentage = float(i % 30)
+            self.app.save_event_data(history_event)
+        self.history_id = history_event.id
+        self.history = sys.modules['event_history']
+        self.portfolio = sys.modules['portfolio']
+        self.export_jobs = sys.modules['export_jobs']
+        self.venue_bookings = sys.modules['venue_bookings']
+        self.capacity = sys.modules['capacity']
+        self.outbox = sys.modules['outbox']
+
+        # 수요 계획 벤치마크용: 인력/시스템/제작·렌탈을 포함한 이벤트의 수요 구간
+        self.capacity_conn = sqlite3.connect(os.path.join(self.workdir, 'capacity.db'))
+        self.capacity.ensure_capacity_schema(self.capacity_conn)
+        n_categories = len(_categories())
+        with self.capacity_conn:
+            for seed in range(scale['events']):
+                document = make_event_data(n_categories, scale['items'], 0, seed=seed)
+                self.capacity.refresh_event_demand(self.capacity_conn, seed, document)
+
+        # 분석 스냅샷 벤치마크용: 저장된 이벤트로 Parquet 스냅샷 생성
+        self.analytics = sys.modules['analytics_snapshot']
+        self.snapshot_dir = os.path.join(self.workdir, 'analytics_snapshot')
+        self.analytics.refresh_snapshot(self.snapshot_dir, self.app.EVENT_DB_PATH, self.app.BUDGET_DB_PATH)
+
+        # 마이그레이션 벤치마크용: 저장된 이벤트를 복제해 마이그레이션 전 스키마의 큰 events 테이블 생성
+        self.migrations = sys.modules['migrations']
+        self.migration_conn = sqlite3.connect(os.path.join(self.workdir, 'migration.db'))
+        self.migration_conn.execute('ATTACH DATABASE ? AS app', (self.app.EVENT_DB_PATH,))
+        self.migration_conn.execute('''
+        CREATE TABLE events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''')
+        for _ in range(self.MIGRATION_COPIES):
+            self.migration_conn.execute('''
+            INSERT INTO events (id, event_data, created_at, updated_at)
+            SELECT (SELECT COALESCE(MAX(id), 0) FROM events) + id, event_data, created_at, updated_at FROM app.events
+            ''')
+        self.migration_conn.commit()
+        self.migration_conn.execute('DETACH DATABASE app')
+        self.migrations.migrate(self.migration_conn, self.migrations.EVENT_MIGRATIONS)
+
+        st.session_state.event_data = self.event
+
+        # 엑셀 생성은 safe_operation으로 감싸져 있어 실패해도 예외가 나지 않으므로 한 번 확인
+        summary_path = os.path.join(self.workdir, 'summary_check.xlsx')
+        self.app.create_excel_summary(self.event, summary_path)
+        assert os.path.exists(summary_path), "create_excel_summary 실패"
+
+
+def build_context(scale):
+    return Context(scale)
+
+
+def _new_event(ctx):
+    event = copy.deepcopy(ctx.event)
+    event.id = None
+    return (ctx, event)
+
+
+@benchmark('event_planner.save_event_data[insert]', setup=_new_event, group='event_planner')
+def bench_save_insert(ctx, event):
+    ctx.app.save_event_data(event)
+
+
+def _existing_event(ctx):
+    event = copy.deepcopy(ctx.event)
+    event.id = ctx.saved_id
+    return (ctx, event)
+
+
+@benchmark('event_planner.save_event_data[update]', setup=_existing_event, group='event_planner')
+def bench_save_update(ctx, event):
+    ctx.app.save_event_data(event)
+
+
+def _clear_load_cache(ctx):
+    ctx.app.load_event_data.cache_clear()
+    return (ctx,)
+
+
+@benchmark('event_planner.load_event_data', setup=_clear_load_cache, group='event_planner')
+def bench_load(ctx):
+    ctx.app.load_event_data(ctx.saved_id)
+
+
+@benchmark('event_planner.get_all_events', group='event_planner')
+def bench_get_all_events(ctx):
+    ctx.app.get_all_events()
+
+
+@benchmark('event_planner.create_excel_summary', group='event_planner')
+def bench_excel_summary(ctx):
+    ctx.app.create_excel_summary(ctx.event, os.path.join(ctx.workdir, 'summary.xlsx'))
+
+
+@benchmark('event_planner.create_category_excel', group='event_planner')
+def bench_category_excel(ctx):
+    category, component = next(iter(ctx.event.components.items()))
+    ctx.app.create_category_excel(ctx.event, category, component, os.path.join(ctx.workdir, 'category.xlsx'))
+
+
+@benchmark('event_planner.history.get_version[latest]', group='event_planner')
+def bench_history_latest(ctx):
+    with ctx.app.get_db_connection() as conn:
+        ctx.history.get_version(conn, ctx.history_id, ctx.HISTORY_SAVES)
+
+
+@benchmark('event_planner.history.diff_versions', group='event_planner')
+def bench_history_diff(ctx):
+    with ctx.app.get_db_connection() as conn:
+        ctx.history.diff_versions(conn, ctx.history_id, 2, ctx.HISTORY_SAVES)
+
+
+@benchmark('event_planner.portfolio.query_totals', group='event_planner')
+def bench_portfolio_totals(ctx):
+    with ctx.app.get_db_connection() as conn:
+        for group_by in ctx.portfolio.DIMENSIONS:
+            ctx.portfolio.query_totals(conn, group_by, event_types=['오프라인 이벤트'])
+
+
+@benchmark('event_planner.portfolio.query_category_budgets', group='event_planner')
+def bench_portfolio_category_budgets(ctx):
+    with ctx.app.get_db_connection() as conn:
+        ctx.portfolio.query_category_budgets(conn, 'month')
+
+
+@benchmark('event_planner.export_jobs.submit_export[dedup]', group='event_planner')
+def bench_export_submit_dedup(ctx):
+    # 정의서 단계는 재실행마다 제출하므로 같은 문서의 기존 작업을 찾는 경로가 핫패스
+    with ctx.app.get_db_connection() as conn:
+        ctx.export_jobs.submit_export(conn, ctx.stored, ctx.saved_id)
+
+
+@benchmark('event_planner.venue_bookings.find_conflicts', group='event_planner')
+def bench_venue_conflicts(ctx):
+    # 장소 단계는 재실행마다 충돌을 조회
+    venues = [(venue['name'], venue['address']) for venue in ctx.stored['venues']]
+    with ctx.app.get_db_connection() as conn:
+        ctx.venue_bookings.find_conflicts(conn, venues, ctx.stored['setup_date'], ctx.stored['teardown_date'],
+                                          exclude_event_id=ctx.saved_id)
+
+
+@benchmark('event_planner.capacity.daily_demand[year]', group='event_planner')
+def bench_capacity_daily_demand(ctx):
+    demand = ctx.capacity.daily_demand(ctx.capacity_conn, date(2024, 1, 1), date(2024, 12, 31))
+    ctx.capacity.peak_days(demand)
+    ctx.capacity.over_commitment(demand, ctx.app.config['CAPACITY_LIMITS'])
+
+
+@benchmark('event_planner.outbox.read_changes[batch]', group='event_planner')
+def bench_outbox_read(ctx):
+    # 변경 피드 소비자가 배치 하나를 읽는 비용
+    with ctx.app.get_db_connection() as conn:
+        changes = ctx.outbox.read_changes(conn, 0, ctx.outbox.BATCH_SIZE, (ctx.outbox.ENTITY_EVENT,))
+        ctx.outbox.latest_changes(changes)
+
+
+def _unmigrated_events(ctx):
+    # 이벤트명 열 마이그레이션을 되돌려 백필 전체를 다시 측정
+    conn = ctx.migration_conn
+    latest = ctx.migrations.EVENT_MIGRATIONS[-1]
+    conn.execute('DELETE FROM schema_migrations WHERE version = ?', (latest.version,))
+    conn.execute('ALTER TABLE events DROP COLUMN event_name')
+    conn.commit()
+    return (ctx,)
+
+
+@benchmark('event_planner.migrations.backfill[events]', setup=_unmigrated_events, group='event_planner',
+           info=lambda ctx: {'rows': ctx.migration_conn.execute('SELECT COUNT(*) FROM events').fetchone()[0]})
+def bench_migration_backfill(ctx):
+    assert not ctx.migrations.migrate(ctx.migration_conn, ctx.migrations.EVENT_MIGRATIONS)
+
+
+@benchmark('event_planner.migrations.migrate[up-to-date]', group='event_planner')
+def bench_migration_noop(ctx):
+    # init_db가 매 실행마다 거치는 경로
+    ctx.migrations.migrate(ctx.migration_conn, ctx.migrations.EVENT_MIGRATIONS)
+
+
+def _synced_snapshot(ctx):
+    # 앞선 저장 벤치마크에서 바뀐 이벤트를 먼저 반영 (측정에서 제외)
+    ctx.analytics.refresh_snapshot(ctx.snapshot_dir, ctx.app.EVENT_DB_PATH, ctx.app.BUDGET_DB_PATH)
+    return (ctx,)
+
+
+@benchmark('event_planner.analytics.refresh[unchanged]', setup=_synced_snapshot, group='event_planner')
+def bench_analytics_refresh(ctx):
+    counts = ctx.analytics.refresh_snapshot(ctx.snapshot_dir, ctx.app.EVENT_DB_PATH, ctx.app.BUDGET_DB_PATH)
+    assert not counts['events']
+
+
+@benchmark('event_planner.analytics.query', group='event_planner')
+def bench_analytics_query(ctx):
+    ctx.analytics.run_query(ctx.snapshot_dir, ctx.app.ANALYTICS_DEFAULT_QUERY)
+
+
+@benchmark('event_planner.render_export_files', group='event_planner')
+def bench_render_export_files(ctx):
+    ctx.app.render_export_files(ctx.stored, lambda progress, message='': None)
+
+
+@benchmark('event_planner.event_from_dict', group='event_planner')
+def bench_event_from_dict(ctx):
+    ctx.app.event_from_dict(ctx.stored)
+
+
+@benchmark('event_planner.event_to_dict', group='event_planner')
+def bench_event_to_dict(ctx):
+    ctx.app.event_to_dict(ctx.event)
+
+
+@benchmark('event_planner.check_required_fields', group='event_planner')
+def bench_check_required_fields(ctx):
+    for step in range(3):
+        ctx.app.check_required_fields(step)
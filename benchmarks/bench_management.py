@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+from sqlalchemy import text
+
+from data import make_budget_rows, make_expense_rows, write_budget_workbook
+from harness import REPO_ROOT, benchmark, load_app_module
+
+sys.path.insert(0, os.path.join(REPO_ROOT, 'event_planner'))
+
+from price_index import install_price_index  # noqa: E402
+
+# management_Project 핫패스 벤치마크
+
+
+class Context:
+    def __init__(self, scale):
+        self.scale = scale
+        self.app = load_app_module('management_Project', 'app.py', 'management_app')
+        self.workdir = os.getcwd()
+        self.app.create_tables()
+
+        with self.app.engine.connect() as conn:
+            conn.execute(text("""
+                INSERT INTO budget_items (대분류, 항목명, 단가, 개수1, 단위1, 개수2, 단위2, 배정예산)
+                VALUES (:대분류, :항목명, :단가, :개수1, :단위1, :개수2, :단위2, :배정예산)
+            """), make_budget_rows(scale['budget_items']))
+            conn.execute(text("""
+                INSERT INTO expenses (budget_item_id, 지출금액, 지출일자, 협력사)
+                VALUES (:budget_item_id, :지출금액, :지출일자, :협력사)
+            """), make_expense_rows(scale['expenses'], scale['budget_items']))
+            conn.commit()
+            self.category = conn.execute(text("SELECT 대분류 FROM budget_items LIMIT 1")).scalar()
+
+        # 단가 색인 트리거 설치 (이후 저장 벤치마크는 트리거 비용 포함)
+        index_conn = sqlite3.connect(self.app.DATABASE)
+        try:
+            install_price_index(index_conn)
+        finally:
+            index_conn.close()
+        with self.app.engine.connect() as conn:
+            self.category_items = self.app.load_budget_with_balance(conn, self.category)
+
+        self.workbook = write_budget_workbook(os.path.join(self.workdir, 'upload.xlsx'), scale['excel_rows'])
+
+        # 한 번 병합해 둔 변환 결과 (이후 업로드 벤치마크는 같은 파일을 다시 올리는 경우)
+        # (다른 벤치마크의 대분류 행 수가 바뀌지 않도록 별도 대분류로)
+        self.upload_df = pd.DataFrame(make_budget_rows(scale['excel_rows'], seed=1))
+        self.upload_df['대분류'] = '업로드 ' + self.upload_df['대분류']
+        with self.app.engine.connect() as conn:
+            self.app.apply_merge(conn, self.app.plan_merge(conn, self.upload_df))
+            conn.commit()
+
+
+def build_context(scale):
+    return Context(scale)
+
+
+def _category_edit(ctx):
+    # 매 라운드 최신 버전을 읽어 모든 행의 단가를 수정한 편집본을 만든다
+    with ctx.app.engine.connect() as conn:
+        original = ctx.app.load_budget_with_balance(conn, ctx.category)
+    edited = original.copy()
+    edited['단가'] = edited['단가'] + 1
+    edited['배정예산'] = edited['단가'] * edited['개수1'] * edited['개수2']
+    return (ctx, original, edited)
+
+
+@benchmark('management.budget_input.save', setup=_category_edit, group='management')
+def bench_budget_save(ctx, original, edited):
+    conflicts = ctx.app.save_budget_category(ctx.category, original, edited)
+    assert not conflicts
+
+
+@benchmark('management.budget_input.load', group='management')
+def bench_budget_load(ctx):
+    with ctx.app.engine.connect() as conn:
+        ctx.app.load_budget_with_balance(conn)
+
+
+@benchmark('management.budget_grid.load_page[id]', group='management')
+def bench_grid_page(ctx):
+    # 전체 예산 항목 그리드의 기본 화면 (첫 페이지)
+    with ctx.app.engine.connect() as conn:
+        query = ctx.app.GridQuery()
+        ctx.app.count_rows(conn, query)
+        ctx.app.load_page(conn, query, 0, ctx.app.PAGE_SIZES[0])
+
+
+@benchmark('management.budget_grid.load_page[잔액,category]', group='management')
+def bench_grid_page_sorted(ctx):
+    with ctx.app.engine.connect() as conn:
+        query = ctx.app.GridQuery((ctx.category,), '', '잔액', True)
+        ctx.app.count_rows(conn, query)
+        ctx.app.load_page(conn, query, 1, ctx.app.PAGE_SIZES[0])
+
+
+@benchmark('management.budget_input.price_reference', group='management')
+def bench_price_reference(ctx):
+    with ctx.app.engine.connect() as conn:
+        ctx.app.load_price_stats(conn, 'item', ctx.category_items['항목명'])
+        ctx.app.load_price_stats(conn, 'category', [ctx.category])
+
+
+@benchmark('management.view_budget.aggregate', group='management')
+def bench_view_budget(ctx):
+    with ctx.app.engine.connect() as conn:
+        ctx.app.load_budget_summary(conn)
+
+
+@benchmark('management.upload.iter_records', group='management')
+def bench_upload_parse(ctx):
+    for _ in ctx.app.iter_records(ctx.workbook, '견적서'):
+        pass
+
+
+@benchmark('management.upload.preview_page', group='management')
+def bench_upload_preview(ctx):
+    ctx.app.read_page(ctx.workbook, '견적서', page=0)
+
+
+@benchmark('management.upload.merge[repeat]', group='management')
+def bench_upload_merge(ctx):
+    with ctx.app.engine.connect() as conn:
+        result = ctx.app.apply_merge(conn, ctx.app.plan_merge(conn, ctx.upload_df))
+        conn.commit()
+    assert not result['new']
@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+from collections import Counter
+
+from streamlit.testing.v1 import AppTest
+
+from data import _categories, make_event_data
+from harness import REPO_ROOT, benchmark
+
+sys.path.insert(0, os.path.join(REPO_ROOT, 'event_planner'))
+
+from models import event_from_dict  # noqa: E402
+
+# 메뉴 백엔드(component / native)별 용역 구성 요소 단계 재실행 비교
+# info에 화면 요소 수와 그중 커스텀 컴포넌트(iframe) 수를 기록
+
+EVENT_APP = os.path.join(REPO_ROOT, 'event_planner', 'main.py')
+BACKENDS = ('component', 'native')
+
+
+def _walk(node):
+    yield node
+    children = getattr(node, 'children', None)
+    if isinstance(children, dict):
+        for child in children.values():
+            yield from _walk(child)
+
+
+class Context:
+    def __init__(self, scale):
+        workdir = tempfile.mkdtemp(prefix='dnmd_bench_')
+        os.chdir(workdir)
+        os.environ['BUDGET_DB_PATH'] = os.path.join(workdir, 'budget.db')
+
+        # 위젯 기본값이 선택지에 있어야 하므로 항목은 실제 카탈로그 항목만 사용
+        catalog = _categories()
+        self.stored = make_event_data(scale['categories'], scale['items'], scale['deliveries'])
+        for category, component in self.stored['components'].items():
+            component['items'] = [item for item in component['items'] if item in catalog.get(category, [])]
+        self.stored['selected_categories'] = list(self.stored['components'])
+
+        self.apps = {backend: self._start(backend) for backend in BACKENDS}
+
+    def _start(self, backend):
+        os.environ['MENU_BACKEND'] = backend
+        at = AppTest.from_file(EVENT_APP, default_timeout=120)
+        at.session_state['step'] = 2
+        at.session_state['event_data'] = event_from_dict(self.stored)
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{backend}: {at.exception[0].message}")
+        return at
+
+    def element_counts(self, backend):
+        counts = Counter(node.type for node in _walk(self.apps[backend]._tree))
+        return {'elements': sum(counts.values()), 'components': counts['component_instance']}
+
+
+def build_context(scale):
+    return Context(scale)
+
+
+def _use(backend):
+    # main.py는 재실행마다 MENU_BACKEND를 다시 읽음
+    def setup(ctx):
+        os.environ['MENU_BACKEND'] = backend
+        return (ctx,)
+    return setup
+
+
+@benchmark('menus.service_components.rerun[component]', setup=_use('component'), group='menus',
+           info=lambda ctx: ctx.element_counts('component'))
+def bench_rerun_component(ctx):
+    ctx.apps['component'].run()
+
+
+@benchmark('menus.service_components.rerun[native]', setup=_use('native'), group='menus',
+           info=lambda ctx: ctx.element_counts('native'))
+def bench_rerun_native(ctx):
+    ctx.apps['native'].run()
@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+from datetime import date, datetime, time
+
+from data import make_event_data
+from harness import REPO_ROOT, benchmark
+
+sys.path.insert(0, os.path.join(REPO_ROOT, 'event_planner'))
+
+from serialization import decode_event, decode_legacy_json, encode_event  # noqa: E402
+
+# 이벤트 문서 직렬화 형식 비교: 이전 JSON 형식 vs msgpack vs msgpack+zstd (인코딩/디코딩 속도, 저장 크기)
+
+
+class LegacyJSONEncoder(json.JSONEncoder):
+    # 이전 save_event_data에서 사용하던 인코더
+    def default(self, obj):
+        if isinstance(obj, (date, datetime, time)):
+            return obj.isoformat()
+        return super().default(obj)
+
+
+def legacy_encode(event_data):
+    return json.dumps(event_data, ensure_ascii=False, cls=LegacyJSONEncoder)
+
+
+def legacy_top_level_decode(text):
+    # 이전 load_event_data의 복원 방식 (최상위 문자열만 날짜 변환 시도)
+    event_data = json.loads(text)
+    for key, value in event_data.items():
+        if isinstance(value, str):
+            try:
+                event_data[key] = datetime.fromisoformat(value).date()
+            except ValueError:
+                pass
+    return event_data
+
+
+class Context:
+    def __init__(self, scale):
+        self.event = make_event_data(scale['categories'], scale['items'], scale['deliveries'])
+        self.json_text = legacy_encode(self.event)
+        self.msgpack_blob = encode_event(self.event, compress=False)
+        self.zstd_blob = encode_event(self.event, compress=True)
+        assert decode_event(self.zstd_blob) == self.event
+
+
+def build_context(scale):
+    return Context(scale)
+
+
+def _sizes(ctx):
+    return {
+        'json_bytes': len(ctx.json_text.encode('utf-8')),
+        'msgpack_bytes': len(ctx.msgpack_blob),
+        'msgpack_zstd_bytes': len(ctx.zstd_blob),
+    }
+
+
+@benchmark('serialization.encode[json]', group='serialization', info=_sizes)
+def bench_encode_json(ctx):
+    legacy_encode(ctx.event)
+
+
+@benchmark('serialization.encode[msgpack]', group='serialization')
+def bench_encode_msgpack(ctx):
+    encode_event(ctx.event, compress=False)
+
+
+@benchmark('serialization.encode[msgpack+zstd]', group='serialization')
+def bench_encode_msgpack_zstd(ctx):
+    encode_event(ctx.event, compress=True)
+
+
+@benchmark('serialization.decode[json,top-level]', group='serialization')
+def bench_decode_json_top_level(ctx):
+    legacy_top_level_decode(ctx.json_text)
+
+
+@benchmark('serialization.decode[json,nested]', group='serialization')
+def bench_decode_json_nested(ctx):
+    decode_legacy_json(ctx.json_text)
+
+
+@benchmark('serialization.decode[msgpack]', group='serialization')
+def bench_decode_msgpack(ctx):
+    decode_event(ctx.msgpack_blob)
+
+
+@benchmark('serialization.decode[msgpack+zstd]', group='serialization')
+def bench_decode_msgpack_zstd(ctx):
+    decode_event(ctx.zstd_blob)
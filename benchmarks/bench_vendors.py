@@ -0,0 +1,45 @@
+import os
+import sqlite3
+import sys
+import tempfile
+
+from data import make_vendor_rows
+from harness import REPO_ROOT, benchmark
+
+sys.path.insert(0, os.path.join(REPO_ROOT, 'event_planner'))
+
+from vendor_directory import ensure_vendor_schema, lookup_vendors, register_vendor  # noqa: E402
+
+# 협력사 디렉토리 등록(중복 판정)과 입력 중 검색(typeahead) 벤치마크
+
+
+class Context:
+    def __init__(self, scale):
+        self.path = os.path.join(tempfile.mkdtemp(prefix='dnmd_bench_'), 'budget.db')
+        self.conn = sqlite3.connect(self.path)
+        ensure_vendor_schema(self.conn)
+        self.rows = make_vendor_rows(scale['vendors'])
+        with self.conn:
+            for row in self.rows:
+                register_vendor(self.conn, row['name'], row['phone'], row['manager'])
+        self.queries = [row['name'].replace('(주) ', '')[:n] for row in self.rows[:50] for n in (1, 2, 4)]
+        self.new_rows = make_vendor_rows(200, seed=1)
+
+
+def build_context(scale):
+    return Context(scale)
+
+
+@benchmark('vendors.lookup[typeahead x150]', group='vendors')
+def bench_lookup(ctx):
+    for query in ctx.queries:
+        lookup_vendors(ctx.conn, query)
+
+
+@benchmark('vendors.register[200, rollback]', group='vendors')
+def bench_register(ctx):
+    try:
+        for row in ctx.new_rows:
+            register_vendor(ctx.conn, row['name'], row['phone'], row['manager'])
+    finally:
+        ctx.conn.rollback()
@@ -0,0 +1,169 @@
+import json
+import os
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+# 벤치마크용 합성 데이터 생성기
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ITEM_OPTIONS_PATH = os.path.join(REPO_ROOT, 'event_planner', 'item_options.json')
+
+# 규모별 데이터 크기
+SCALES = {
+    'small': {'categories': 4, 'items': 4, 'deliveries': 2, 'events': 200,
+              'budget_items': 500, 'expenses': 5000, 'excel_rows': 2000, 'vendors': 2000},
+    'medium': {'categories': 8, 'items': 8, 'deliveries': 4, 'events': 1000,
+               'budget_items': 2000, 'expenses': 20000, 'excel_rows': 10000, 'vendors': 10000},
+    'large': {'categories': 13, 'items': 16, 'deliveries': 8, 'events': 5000,
+              'budget_items': 10000, 'expenses': 100000, 'excel_rows': 50000, 'vendors': 50000},
+}
+
+
+def _categories() -> Dict[str, List[str]]:
+    with open(ITEM_OPTIONS_PATH, 'r', encoding='utf-8') as file:
+        return json.load(file)['CATEGORIES']
+
+
+def make_event_data(n_categories: int, n_items: int, n_deliveries: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    catalog = _categories()
+    category_names = list(catalog)
+    start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 365))
+    end = start + timedelta(days=rng.randint(0, 5))
+
+    components = {}
+    for c in range(n_categories):
+        category = category_names[c % len(category_names)]
+        if category in components:
+            category = f"{category}_{c}"
+        base_items = catalog.get(category, catalog[category_names[c % len(category_names)]])
+        items = [base_items[i] if i < len(base_items) else f"항목_{i}" for i in range(n_items)]
+
+        component = {
+            'status': '확정',
+            'items': items,
+            'budget': rng.randint(1, 100) * 100000,
+            'shooting_start_date': start,
+            'shooting_end_date': end,
+            'cooperation_status': '선호하는 업체 있음',
+            'preferred_vendor': True,
+            'vendor_reason': '동일 과업 진행 경험',
+            'vendor_name': f"업체{rng.randint(1, 500)}",
+            'vendor_contact': f"010-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            'vendor_manager': '담당자',
+            'delivery_dates': [
+                {
+                    'status': '정해짐',
+                    'date': end + timedelta(days=d + 1),
+                    'items': {item: rng.randint(1, 10) for item in items},
+                }
+                for d in range(n_deliveries)
+            ],
+        }
+        for item in items:
+            component[f'{item}_quantity'] = rng.randint(1, 20)
+            component[f'{item}_unit'] = '개'
+            component[f'{item}_duration'] = rng.randint(1, 5)
+            component[f'{item}_duration_unit'] = '일'
+            component[f'{item}_details'] = f"{item} 세부사항 " * 3
+        components[category] = component
+
+    return {
+        'event_name': f"벤치마크 행사 {seed}",
+        'client_name': f"고객사{seed % 50}",
+        'manager_name': '홍길동',
+        'manager_email': 'pm@example.com',
+        'manager_position': '책임',
+        'manager_contact': '010-1234-5678',
+        'event_type': '오프라인 이벤트',
+        'contract_type': '입찰',
+        'contract_status': '확정',
+        'vat_included': True,
+        'contract_amount': rng.randint(10, 500) * 1000000,
+        'expected_profit_percentage': 12.5,
+        'expected_profit': rng.randint(1, 50) * 1000000,
+        'scale': rng.randint(50, 5000),
+        'start_date': start,
+        'end_date': end,
+        'setup_start': '전날 셋업',
+        'teardown': '당일 철수',
+        'setup_date': start - timedelta(days=1),
+        'teardown_date': end,
+        'venue_status': '확정',
+        'venue_type': '실내',
+        'venues': [{'name': f"행사장{rng.randint(1, 200)}", 'address': f"서울시 테스트구 {rng.randint(1, 99)}"}],
+        'selected_categories': list(components),
+        'components': components,
+    }
+
+
+def make_budget_rows(n_items: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    categories = list(_categories())
+    rows = []
+    for i in range(n_items):
+        unit_price = rng.randint(1, 500) * 1000
+        qty1, qty2 = rng.randint(1, 20), rng.randint(1, 5)
+        rows.append({
+            '대분류': categories[i % len(categories)],
+            '항목명': f"항목{i}",
+            '단가': unit_price,
+            '개수1': qty1,
+            '단위1': '개',
+            '개수2': qty2,
+            '단위2': '일',
+            '배정예산': unit_price * qty1 * qty2,
+        })
+    return rows
+
+
+def make_expense_rows(n_expenses: int, n_items: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    return [
+        {
+            'budget_item_id': rng.randint(1, n_items),
+            '지출금액': rng.randint(1, 1000) * 100,
+            '지출일자': str(start + timedelta(days=rng.randint(0, 365))),
+            '협력사': f"업체{rng.randint(1, 500)}",
+        }
+        for _ in range(n_expenses)
+    ]
+
+
+VENDOR_SYLLABLES = '가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주'
+VENDOR_SUFFIXES = ['', '기획', '미디어', '엔터테인먼트', '컴퍼니', '이벤트', '프로덕션', '렌탈']
+
+
+def make_vendor_rows(n_vendors: int, seed: int = 0) -> List[Dict[str, str]]:
+    # 법인 표기/띄어쓰기만 다른 중복 이름이 일부 섞인 협력사 목록
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_vendors):
+        base = ''.join(rng.choice(VENDOR_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        name = base + rng.choice(VENDOR_SUFFIXES)
+        if i % 10 == 0:
+            name = f"(주) {name}"
+        elif i % 10 == 1:
+            name = f"주식회사{name}"
+        rows.append({
+            'name': name,
+            'phone': f"010{rng.randint(1000, 9999)}{rng.randint(1000, 9999)}",
+            'manager': f"담당자{i % 100}",
+        })
+    return rows
+
+
+def write_budget_workbook(path: str, n_rows: int, seed: int = 0) -> str:
+    import openpyxl
+
+    rng = random.Random(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('견적서')
+    ws.append(['구분', '품목', '단가', '수량', '단위', '기간', '금액'])
+    for i in range(n_rows):
+        price, qty, days = rng.randint(1, 500) * 1000, rng.randint(1, 20), rng.randint(1, 5)
+        ws.append([f"분류{i % 13}", f"품목{i}", price, qty, '개', days, price * qty * days])
+    wb.save(path)
+    return path
@@ -0,0 +1,82 @@
+import gc
+import importlib.util
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 벤치마크 등록 및 측정 도구
+
+
+class Benchmark:
+    def __init__(self, name: str, func: Callable, setup: Optional[Callable] = None, group: str = '',
+                 info: Optional[Callable] = None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.group = group
+        self.info = info
+
+
+REGISTRY: List[Benchmark] = []
+
+
+def benchmark(name: str, setup: Optional[Callable] = None, group: str = '', info: Optional[Callable] = None):
+    # setup()이 있으면 매 라운드마다 호출하고 그 반환값을 func에 인자로 넘김 (측정 시간에서 제외)
+    # info(context)는 저장 크기 등 시간 외 지표를 dict로 돌려주며 결과의 'info'에 기록됨
+    def decorator(func):
+        REGISTRY.append(Benchmark(name, func, setup, group, info))
+        return func
+    return decorator
+
+
+def measure(bench: Benchmark, context: Any, min_time: float = 0.5, min_rounds: int = 3,
+            max_rounds: int = 1000) -> Dict[str, Any]:
+    timings = []
+    total = 0.0
+    gc_enabled = gc.isenabled()
+    while len(timings) < min_rounds or (total < min_time and len(timings) < max_rounds):
+        args = bench.setup(context) if bench.setup else (context,)
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            bench.func(*args)
+            elapsed = time.perf_counter() - started
+        finally:
+            if gc_enabled:
+                gc.enable()
+        timings.append(elapsed)
+        total += elapsed
+
+    result = {
+        'group': bench.group,
+        'rounds': len(timings),
+        'min': min(timings),
+        'max': max(timings),
+        'mean': statistics.fmean(timings),
+        'median': statistics.median(timings),
+        'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+    if bench.info:
+        result['info'] = bench.info(context)
+    return result
+
+
+def load_app_module(app_dir: str, module_file: str, module_name: str, workdir: Optional[str] = None):
+    # 앱 모듈은 import 시 현재 디렉토리에 DB/로그 파일을 만들기 때문에 임시 디렉토리에서 로드
+    workdir = workdir or tempfile.mkdtemp(prefix='dnmd_bench_')
+    os.chdir(workdir)
+    # event_planner는 저장 시 예산 관리 DB로 동기화하므로 저장소의 budget.db 대신 임시 디렉토리의 DB 사용
+    os.environ['BUDGET_DB_PATH'] = os.path.join(workdir, 'budget.db')
+    app_path = os.path.join(REPO_ROOT, app_dir)
+    if app_path not in sys.path:
+        sys.path.insert(0, app_path)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(app_path, module_file))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
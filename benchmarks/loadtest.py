@@ -0,0 +1,394 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+from data import make_budget_rows
+from harness import REPO_ROOT
+
+# Streamlit AppTest 기반 헤드리스 부하 테스트
+#   python benchmarks/loadtest.py --users 8 --iterations 3
+#
+# 가상 사용자마다 별도의 AppTest 세션으로 event_planner 마법사 흐름
+# (basic_info -> venue_info -> service_components -> generate_summary_excel)과
+# 예산 관리 메뉴 페이지를 실행하고, 재실행 지연 백분위수 / DB 쓰기 대기 / 세션별 메모리를 보고한다.
+#
+# AppTest는 프로세스 전역 Streamlit Runtime을 공유하므로 한 프로세스에서 여러 세션을 동시에 돌리면
+# 서로의 위젯/런타임 상태를 깨뜨림 -> 가상 사용자마다 별도 프로세스에서 실행하고 결과를 합친다.
+# 실패하거나 중단된 실행(앱 예외, 스크립트 스레드 오류, 타임아웃)은 지연 시간에 넣지 않고 오류로 기록한다.
+
+EVENT_APP = os.path.join(REPO_ROOT, 'event_planner', 'main.py')
+MANAGEMENT_DIR = os.path.join(REPO_ROOT, 'management_Project')
+
+# 예산 관리 앱은 메뉴가 option_menu 컴포넌트라 헤드리스로 선택할 수 없어 페이지 함수를 직접 호출하는 드라이버 사용
+BUDGET_DRIVER = f'''
+import sys
+import streamlit as st
+sys.path.insert(0, {MANAGEMENT_DIR!r})
+import app
+app.create_tables()
+getattr(app, st.session_state.get("loadtest_page", "budget_input"))()
+'''
+
+BUDGET_PAGES = ['budget_input', 'add_expense', 'view_budget', 'view_analysis']
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'ALTER', 'DROP', 'BEGIN')
+
+
+class DBStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.write_times = []
+        self.lock_errors = 0
+
+    def record(self, elapsed):
+        with self.lock:
+            self.write_times.append(elapsed)
+
+    def record_lock_error(self):
+        with self.lock:
+            self.lock_errors += 1
+
+
+db_stats = DBStats()
+
+
+def _timed(sql, func, *args):
+    is_write = sql.lstrip().upper().startswith(WRITE_PREFIXES)
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    except sqlite3.OperationalError as e:
+        if 'locked' in str(e):
+            db_stats.record_lock_error()
+        raise
+    finally:
+        if is_write:
+            db_stats.record(time.perf_counter() - started)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        return _timed(sql, super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return _timed(sql, super().executemany, sql, seq_of_parameters)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def commit(self):
+        return _timed('COMMIT', super().commit)
+
+
+def instrument_sqlite():
+    # 두 앱(sqlite3 직접 사용 / SQLAlchemy) 모두 sqlite3.connect를 거치므로 여기서 쓰기 시간을 측정
+    original_connect = sqlite3.connect
+
+    def connect(*args, **kwargs):
+        kwargs.setdefault('factory', InstrumentedConnection)
+        return original_connect(*args, **kwargs)
+
+    sqlite3.connect = connect
+    # SQLAlchemy(pysqlite)는 sqlite3.dbapi2.connect를 호출
+    sqlite3.dbapi2.connect = connect
+
+
+# at.exception에 잡히지 않는 스크립트 스레드 예외 (프로세스당 사용자 하나라 전역 목록으로 충분)
+thread_errors = []
+
+
+def record_thread_error(hook_args):
+    thread_errors.append(f"{hook_args.exc_type.__name__}: {hook_args.exc_value}")
+
+
+def deep_sizeof(obj, seen=None) -> int:
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_sizeof(getattr(obj, name), seen) for name in obj.__slots__ if hasattr(obj, name))
+    return size
+
+
+def session_state_size(at) -> int:
+    # 최신 Streamlit은 AppTest 전용 래퍼를, 이전 버전은 SafeSessionState를 돌려준다
+    to_dict = getattr(at.session_state, 'to_dict', None)
+    return deep_sizeof(dict(to_dict() if to_dict else at.session_state.filtered_state))
+
+
+class FailedRun(Exception):
+    pass
+
+
+class VirtualUser:
+    def __init__(self, user_id, timeout):
+        self.user_id = user_id
+        self.timeout = timeout
+        self.latencies = defaultdict(list)
+        self.exceptions = []
+        self.errors = []
+        self.state_sizes = []
+
+    def _run(self, at, label):
+        # 실패한 실행은 지연 시간에 넣지 않고 오류로 기록한 뒤 이번 시나리오를 중단
+        seen_thread_errors = len(thread_errors)
+        started = time.perf_counter()
+        try:
+            at.run(timeout=self.timeout)
+        except Exception as e:
+            self.errors.append(f"{label}: {type(e).__name__}: {e}")
+            raise FailedRun(label)
+        elapsed = time.perf_counter() - started
+        failures = [f"{label}: {e.message}" for e in at.exception]
+        self.exceptions.extend(failures)
+        failures += [f"{label}: {message}" for message in thread_errors[seen_thread_errors:]]
+        if failures:
+            self.errors.extend(failures)
+            raise FailedRun(label)
+        self.latencies[label].append(elapsed)
+
+    def event_wizard(self, iteration):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(EVENT_APP, default_timeout=self.timeout)
+        self._run(at, 'wizard.start')
+
+        at.text_input(key='event_name_basic').set_value(f"부하테스트 {self.user_id}-{iteration}")
+        at.text_input(key='client_name_basic').set_value(f"고객사{self.user_id}")
+        at.text_input(key='manager_name_basic').set_value('담당자')
+        at.text_input(key='manager_contact_basic').set_value('01012345678')
+        self._run(at, 'wizard.basic_info')
+
+        at.session_state.step = 1
+        self._run(at, 'wizard.venue_info')
+        if 'venue_name_0' in {widget.key for widget in at.text_input}:
+            at.text_input(key='venue_name_0').set_value('행사장')
+            at.text_input(key='venue_address_0').set_value('서울시')
+            at.number_input(key='scale_input_venue').set_value(100)
+            self._run(at, 'wizard.venue_info')
+
+        at.session_state.step = 2
+        self._run(at, 'wizard.service_components')
+        for checkbox in list(at.checkbox)[:3]:
+            checkbox.check()
+        self._run(at, 'wizard.service_components')
+        for multiselect in at.multiselect:
+            if multiselect.options:
+                multiselect.select(multiselect.options[0])
+        self._run(at, 'wizard.service_components')
+
+        at.session_state.step = 3
+        self._run(at, 'wizard.generate_summary_excel')
+        self.state_sizes.append(session_state_size(at))
+
+    def budget_pages(self, iteration):
+        from streamlit.testing.v1 import AppTest
+
+        for page in BUDGET_PAGES:
+            at = AppTest.from_string(BUDGET_DRIVER, default_timeout=self.timeout)
+            at.session_state.loadtest_page = page
+            self._run(at, f"budget.{page}")
+            if page == 'add_expense':
+                at.number_input[0].set_value(1000 + iteration)
+                at.button[0].click()
+                self._run(at, 'budget.add_expense.submit')
+            self.state_sizes.append(session_state_size(at))
+
+    def run(self, iterations, scenarios):
+        for iteration in range(iterations):
+            for name, scenario in (('wizard', self.event_wizard), ('budget', self.budget_pages)):
+                if name not in scenarios:
+                    continue
+                try:
+                    scenario(iteration)
+                except FailedRun:
+                    pass
+                except Exception as e:
+                    # 이전 실행이 기대한 화면을 그리지 못해 위젯을 찾지 못한 경우 등
+                    self.errors.append(f"{name}: {type(e).__name__}: {e}")
+        return self
+
+
+def run_user(user_id, args, barrier, results):
+    # 가상 사용자 프로세스 (spawn): 작업 디렉토리와 BUDGET_DB_PATH는 부모 프로세스에서 물려받음
+    instrument_sqlite()
+    threading.excepthook = record_thread_error
+    from streamlit.testing.v1 import AppTest  # noqa: F401  (import 시간은 측정에서 제외)
+
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if args.trace_memory:
+        tracemalloc.start()
+    try:
+        barrier.wait(timeout=args.timeout)
+    except threading.BrokenBarrierError:
+        pass
+    started = time.time()
+    user = VirtualUser(user_id, args.timeout).run(args.iterations, args.scenarios)
+    finished = time.time()
+    # ru_maxrss는 Linux에서 KB 단위
+    results.put({
+        'user_id': user_id,
+        'started': started,
+        'finished': finished,
+        'latencies': dict(user.latencies),
+        'exceptions': user.exceptions,
+        'errors': user.errors,
+        'state_sizes': user.state_sizes,
+        'write_times': db_stats.write_times,
+        'lock_errors': db_stats.lock_errors,
+        'rss_growth': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) * 1024,
+        'traced_peak': tracemalloc.get_traced_memory()[1] if args.trace_memory else None,
+    })
+
+
+def run_users(args):
+    # 사용자별 프로세스를 띄워 모두 준비되면 동시에 시작하고, 결과를 받지 못한 프로세스는 오류로 기록
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(args.users)
+    results = context.Queue()
+    processes = [context.Process(target=run_user, args=(user_id, args, barrier, results))
+                 for user_id in range(args.users)]
+    for process in processes:
+        process.start()
+
+    reports = {}
+    while len(reports) < len(processes):
+        try:
+            report = results.get(timeout=1)
+        except queue.Empty:
+            if any(process.is_alive() for process in processes):
+                continue
+            try:
+                report = results.get(timeout=1)
+            except queue.Empty:
+                break
+        reports[report['user_id']] = report
+    for process in processes:
+        process.join()
+
+    aborted = [f"user {user_id}: 결과 없이 종료됨 (exit code {process.exitcode})"
+               for user_id, process in enumerate(processes) if user_id not in reports]
+    return list(reports.values()), aborted
+
+
+def seed_budget_db():
+    sys.path.insert(0, MANAGEMENT_DIR)
+    import app
+    from sqlalchemy import text
+
+    app.create_tables()
+    with app.engine.connect() as conn:
+        conn.execute(text("""
+            INSERT INTO budget_items (대분류, 항목명, 단가, 개수1, 단위1, 개수2, 단위2, 배정예산)
+            VALUES (:대분류, :항목명, :단가, :개수1, :단위1, :개수2, :단위2, :배정예산)
+        """), make_budget_rows(200))
+        conn.commit()
+
+
+def percentiles(values):
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {'p50': value, 'p90': value, 'p99': value, 'max': value}
+    q = statistics.quantiles(values, n=100, method='inclusive')
+    return {'p50': q[49], 'p90': q[89], 'p99': q[98], 'max': max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DNMD Streamlit 부하 테스트")
+    parser.add_argument('--users', type=int, default=4, help="동시 가상 사용자 수")
+    parser.add_argument('--iterations', type=int, default=2, help="사용자별 반복 횟수")
+    parser.add_argument('--scenarios', nargs='+', default=['wizard', 'budget'], choices=['wizard', 'budget'])
+    parser.add_argument('--timeout', type=float, default=60, help="재실행 1회 타임아웃(초)")
+    parser.add_argument('--trace-memory', action='store_true', help="tracemalloc으로 메모리 추적 (느려짐)")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    # 앱이 현재 디렉토리에 DB/엑셀 파일을 만들기 때문에 임시 디렉토리에서 실행
+    os.chdir(tempfile.mkdtemp(prefix='dnmd_loadtest_'))
+    # 두 앱이 임시 디렉토리의 같은 budget.db를 쓰도록 (event_planner 기본값은 저장소의 budget.db)
+    os.environ['BUDGET_DB_PATH'] = os.path.abspath('budget.db')
+    if 'budget' in args.scenarios:
+        seed_budget_db()
+
+    users, aborted = run_users(args)
+    wall_time = (max(user['finished'] for user in users) - min(user['started'] for user in users)) if users else 0.0
+
+    latencies = defaultdict(list)
+    for user in users:
+        for label, values in user['latencies'].items():
+            latencies[label].extend(values)
+    all_latencies = [value for values in latencies.values() for value in values]
+    state_sizes = [size for user in users for size in user['state_sizes']]
+    exceptions = [e for user in users for e in user['exceptions']]
+    errors = [e for user in users for e in user['errors']] + aborted
+    write_times = [t for user in users for t in user['write_times']]
+    traced_peaks = [user['traced_peak'] for user in users if user['traced_peak'] is not None]
+
+    report = {
+        'users': args.users,
+        'iterations': args.iterations,
+        'wall_time': wall_time,
+        'reruns': len(all_latencies),
+        'reruns_per_second': len(all_latencies) / wall_time if wall_time else 0.0,
+        'rerun_latency': percentiles(all_latencies),
+        'rerun_latency_by_step': {label: percentiles(values) for label, values in sorted(latencies.items())},
+        'db_writes': len(write_times),
+        'db_write_wait': {**percentiles(write_times), 'total': sum(write_times)},
+        'db_lock_errors': sum(user['lock_errors'] for user in users),
+        'session_state_bytes': percentiles(state_sizes),
+        'rss_growth_per_user_bytes': statistics.mean(user['rss_growth'] for user in users) if users else 0.0,
+        'traced_memory_per_user_bytes': statistics.mean(traced_peaks) if traced_peaks else None,
+        'exceptions': exceptions[:20],
+        'exception_count': len(exceptions),
+        'errors': errors[:20],
+        'error_count': len(errors),
+    }
+
+    print(f"가상 사용자 {args.users}명 x {args.iterations}회, 재실행 {report['reruns']}회, {wall_time:.1f}초 "
+          f"({report['reruns_per_second']:.1f} rerun/s)")
+    print(f"{'단계':<36} {'p50(ms)':>9} {'p90(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9}")
+    for label, stats in [('전체', report['rerun_latency'])] + list(report['rerun_latency_by_step'].items()):
+        print(f"{label:<36} " + ' '.join(f"{stats[k] * 1000:9.1f}" for k in ('p50', 'p90', 'p99', 'max')))
+    wait = report['db_write_wait']
+    print(f"DB 쓰기 {report['db_writes']}회, 대기 p50 {wait['p50'] * 1000:.2f}ms / p99 {wait['p99'] * 1000:.2f}ms / "
+          f"합계 {wait['total']:.2f}s, lock 오류 {report['db_lock_errors']}회")
+    print(f"세션 상태 크기 p50 {report['session_state_bytes']['p50'] / 1024:.1f}KB, "
+          f"사용자당 RSS 증가 {report['rss_growth_per_user_bytes'] / 1024 / 1024:.1f}MB")
+    if report['traced_memory_per_user_bytes'] is not None:
+        print(f"사용자당 추적 메모리(peak) {report['traced_memory_per_user_bytes'] / 1024 / 1024:.1f}MB")
+    if errors:
+        print(f"실패한 실행 {len(errors)}건 (앱 예외 {len(exceptions)}건 포함, 처음 5건):")
+        for message in errors[:5]:
+            print(f"  {message}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
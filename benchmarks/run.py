@@ -0,0 +1,127 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from data import SCALES
+from harness import REGISTRY, REPO_ROOT, measure
+
+# 벤치마크 실행기
+#   python benchmarks/run.py --scale small                      # 실행 후 benchmarks/results/<commit>-<scale>.json 저장
+#   python benchmarks/run.py --compare base.json head.json      # 두 결과 비교 (회귀 시 exit code 1)
+#
+# 앱마다 모듈 이름이 겹칠 수 있어 스위트별로 별도 프로세스에서 실행한다.
+
+SUITES = ['bench_event_planner', 'bench_management', 'bench_serialization', 'bench_vendors', 'bench_menus']
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_suite(suite: str, scale_name: str, min_time: float, selected=None) -> dict:
+    module = importlib.import_module(suite)
+    context = module.build_context(SCALES[scale_name])
+    results = {}
+    for bench in REGISTRY:
+        if selected and not any(pattern in bench.name for pattern in selected):
+            continue
+        results[bench.name] = measure(bench, context, min_time=min_time)
+        info = ''.join(f"  {k}={v}" for k, v in results[bench.name].get('info', {}).items())
+        print(f"  {bench.name:<45} median {results[bench.name]['median'] * 1000:10.3f} ms{info}", file=sys.stderr)
+    return results
+
+
+def run_all(args) -> dict:
+    benchmarks = {}
+    for suite in args.suites:
+        print(f"[{suite}]", file=sys.stderr)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            worker_output = os.path.join(tmpdir, 'results.json')
+            cmd = [sys.executable, os.path.abspath(__file__), '--suite-worker', suite,
+                   '--scale', args.scale, '--min-time', str(args.min_time), '--output', worker_output]
+            for pattern in args.filter or []:
+                cmd += ['--filter', pattern]
+            subprocess.run(cmd, check=True)
+            with open(worker_output, 'r', encoding='utf-8') as file:
+                benchmarks.update(json.load(file))
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'scale': args.scale,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'benchmarks': benchmarks,
+    }
+
+
+def compare(base_path: str, head_path: str, threshold: float) -> int:
+    with open(base_path, 'r', encoding='utf-8') as file:
+        base = json.load(file)
+    with open(head_path, 'r', encoding='utf-8') as file:
+        head = json.load(file)
+
+    print(f"{'benchmark':<45} {'base(ms)':>10} {'head(ms)':>10} {'ratio':>7}")
+    regressions = 0
+    for name in sorted(set(base['benchmarks']) | set(head['benchmarks'])):
+        before = base['benchmarks'].get(name)
+        after = head['benchmarks'].get(name)
+        if not before or not after:
+            print(f"{name:<45} {'-' if not before else before['median'] * 1000:>10} "
+                  f"{'-' if not after else after['median'] * 1000:>10}")
+            continue
+        ratio = after['median'] / before['median'] if before['median'] else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  회귀'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = '  개선'
+        print(f"{name:<45} {before['median'] * 1000:10.3f} {after['median'] * 1000:10.3f} {ratio:7.2f}{flag}")
+
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DNMD 벤치마크")
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--min-time', type=float, default=0.5, help="벤치마크별 최소 측정 시간(초)")
+    parser.add_argument('--suites', nargs='+', default=SUITES, choices=SUITES)
+    parser.add_argument('--filter', action='append', help="이름에 포함된 벤치마크만 실행")
+    parser.add_argument('--output', help="결과 JSON 경로 (기본: benchmarks/results/<commit>-<scale>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'HEAD'), help="두 결과 JSON 비교")
+    parser.add_argument('--threshold', type=float, default=0.1, help="회귀로 판단할 중앙값 증가 비율")
+    parser.add_argument('--suite-worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(args.compare[0], args.compare[1], args.threshold))
+
+    if args.suite_worker:
+        results = run_suite(args.suite_worker, args.scale, args.min_time, args.filter)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file)
+        return
+
+    report = run_all(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['meta']['commit']}-{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
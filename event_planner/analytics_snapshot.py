@@ -0,0 +1,439 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from outbox import ENTITY_BUDGET_ITEM, ENTITY_EVENT, ENTITY_EXPENSE, OP_DELETE, latest_changes, latest_seq, read_changes
+from portfolio import event_month
+from serialization import decode_event
+
+try:
+    import duckdb
+except ImportError:  # 분석 쿼리(DuckDB)는 선택 사항. 스냅샷 생성은 pyarrow만 있으면 됨
+    duckdb = None
+
+# 분석용 컬럼 스냅샷 (Parquet + DuckDB)
+#
+# event_planner.db의 이벤트 문서와 budget.db의 예산 항목/지출을 평탄화해 데이터셋별 Parquet 파일로 저장한다.
+#   <snapshot_dir>/<dataset>/<파티션 열>=<값>/data.parquet (hive 파티션)
+# - 원본 DB에 변경 피드(outbox)가 있으면 마지막으로 반영한 seq 이후의 변경만 읽고, 없으면(또는 처음에는)
+#   원본 행별 변경 표시(events.updated_at, budget_items.version)를 _state.json의 기록과 비교한다
+#   (지출은 수정되지 않으므로 id만 비교). 새로 생겼거나 바뀌었거나 삭제된 행이 속한 파티션만 다시 쓴다
+# - SQLite는 읽기 전용으로 열고, 쿼리는 DuckDB가 Parquet 파일만 읽는다 (운영 DB에 잠금을 걸지 않음)
+# - 파티션 파일과 상태 파일은 임시 파일에 쓴 뒤 교체하므로 중간에 실패해도 다시 실행하면 맞춰짐
+
+STATE_FILE = '_state.json'
+DATA_FILE = 'data.parquet'
+BUDGET_BUCKET_ROWS = 10000
+
+EVENT_SCHEMA = pa.schema([
+    ('event_id', pa.int64()),
+    ('event_name', pa.string()),
+    ('client_name', pa.string()),
+    ('manager_name', pa.string()),
+    ('event_type', pa.string()),
+    ('contract_type', pa.string()),
+    ('contract_status', pa.string()),
+    ('vat_included', pa.bool_()),
+    ('contract_amount', pa.int64()),
+    ('additional_amount', pa.int64()),
+    ('expected_profit', pa.int64()),
+    ('scale', pa.int64()),
+    ('start_date', pa.date32()),
+    ('end_date', pa.date32()),
+    ('setup_date', pa.date32()),
+    ('teardown_date', pa.date32()),
+    ('venue_type', pa.string()),
+    ('venue_count', pa.int64()),
+    ('updated_at', pa.string()),
+])
+COMPONENT_SCHEMA = pa.schema([
+    ('event_id', pa.int64()),
+    ('category', pa.string()),
+    ('status', pa.string()),
+    ('budget', pa.int64()),
+    ('items', pa.list_(pa.string())),
+    ('cooperation_status', pa.string()),
+    ('vendor_name', pa.string()),
+])
+DELIVERY_SCHEMA = pa.schema([
+    ('event_id', pa.int64()),
+    ('category', pa.string()),
+    ('delivery_index', pa.int64()),
+    ('status', pa.string()),
+    ('date', pa.date32()),
+    ('start_date', pa.date32()),
+    ('end_date', pa.date32()),
+    ('item', pa.string()),
+    ('quantity', pa.int64()),
+])
+BUDGET_ITEM_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('대분류', pa.string()),
+    ('항목명', pa.string()),
+    ('단가', pa.int64()),
+    ('개수1', pa.int64()),
+    ('단위1', pa.string()),
+    ('개수2', pa.int64()),
+    ('단위2', pa.string()),
+    ('배정예산', pa.int64()),
+    ('version', pa.int64()),
+    ('source_key', pa.string()),
+])
+EXPENSE_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('budget_item_id', pa.int64()),
+    ('지출금액', pa.int64()),
+    ('지출일자', pa.string()),
+    ('협력사', pa.string()),
+])
+
+# 데이터셋 -> (스키마, 원본 행 키 열, 파티션 열)
+DATASETS = {
+    'events': (EVENT_SCHEMA, 'event_id', 'month'),
+    'components': (COMPONENT_SCHEMA, 'event_id', 'month'),
+    'deliveries': (DELIVERY_SCHEMA, 'event_id', 'month'),
+    'budget_items': (BUDGET_ITEM_SCHEMA, 'id', 'bucket'),
+    'expenses': (EXPENSE_SCHEMA, 'id', 'month'),
+}
+# 원본 -> 원본 행 하나에서 만들어지는 데이터셋
+SOURCES = {
+    'events': ('events', 'components', 'deliveries'),
+    'budget_items': ('budget_items',),
+    'expenses': ('expenses',),
+}
+# 원본 -> (outbox 엔티티, 변경 표시 열)
+SOURCE_CHANGES = {
+    'events': (ENTITY_EVENT, 'updated_at'),
+    'budget_items': (ENTITY_BUDGET_ITEM, 'version'),
+    'expenses': (ENTITY_EXPENSE, None),
+}
+OUTBOX_STATE = '_outbox'
+
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _date(value: Any) -> Optional[date]:
+    # 이전 JSON 형식에서 datetime으로 복원된 값도 date로 통일
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else None
+
+
+def _coerce(row: Dict[str, Any], schema: pa.Schema) -> Dict[str, Any]:
+    # 스키마의 정수/날짜/문자열 열을 변환 (예전 업로드로 실수가 저장된 행 등)
+    for field in schema:
+        if pa.types.is_integer(field.type):
+            row[field.name] = _int(row.get(field.name))
+        elif pa.types.is_date(field.type):
+            row[field.name] = _date(row.get(field.name))
+        elif pa.types.is_string(field.type) and row.get(field.name) is not None:
+            row[field.name] = str(row[field.name])
+    return row
+
+
+def flatten_event(event_id: int, document: Dict[str, Any], updated_at: str) -> Dict[str, List[Dict[str, Any]]]:
+    # 이벤트 문서 하나 -> 데이터셋별 행 목록
+    event = {name: document.get(name) for name in EVENT_SCHEMA.names}
+    event.update({
+        'event_id': event_id,
+        'vat_included': bool(document.get('vat_included')),
+        'venue_count': len(document.get('venues') or []),
+        'updated_at': updated_at,
+    })
+
+    components, deliveries = [], []
+    for category, component in (document.get('components') or {}).items():
+        components.append({
+            'event_id': event_id,
+            'category': category,
+            'status': component.get('status'),
+            'budget': component.get('budget'),
+            'items': [str(item) for item in component.get('items') or []],
+            'cooperation_status': component.get('cooperation_status'),
+            'vendor_name': component.get('vendor_name'),
+        })
+        for index, delivery in enumerate(component.get('delivery_dates') or []):
+            base = {
+                'event_id': event_id,
+                'category': category,
+                'delivery_index': index,
+                'status': delivery.get('status'),
+                'date': delivery.get('date'),
+                'start_date': delivery.get('start_date'),
+                'end_date': delivery.get('end_date'),
+            }
+            items = delivery.get('items') or {}
+            if not items:
+                deliveries.append({**base, 'item': None, 'quantity': None})
+            deliveries.extend({**base, 'item': item, 'quantity': quantity} for item, quantity in items.items())
+    return {
+        'events': [_coerce(event, EVENT_SCHEMA)],
+        'components': [_coerce(row, COMPONENT_SCHEMA) for row in components],
+        'deliveries': [_coerce(row, DELIVERY_SCHEMA) for row in deliveries],
+    }
+
+
+def _connect_readonly(path: str) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True, timeout=5)
+
+
+def _chunks(values: List[Any], size: int = 500) -> Iterable[List[Any]]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+Loaded = Dict[int, Tuple[str, str, Dict[str, List[Dict[str, Any]]]]]
+
+
+def _load_events(conn: sqlite3.Connection, keys: List[int]) -> Loaded:
+    # 이벤트 id -> (파티션 값, 변경 표시, 데이터셋별 행)
+    loaded = {}
+    for chunk in _chunks(keys):
+        rows = conn.execute(f"SELECT id, event_data, updated_at FROM events WHERE id IN ({','.join('?' * len(chunk))})",
+                            chunk)
+        for event_id, stored, updated_at in rows:
+            document = decode_event(stored)
+            loaded[event_id] = (event_month(document.get('start_date')), str(updated_at),
+                                flatten_event(event_id, document, str(updated_at)))
+    return loaded
+
+
+def _load_table(conn: sqlite3.Connection, dataset: str, keys: List[int],
+                partition: Callable[[Dict[str, Any]], str]) -> Loaded:
+    schema = DATASETS[dataset][0]
+    columns = schema.names
+    existing = set(_table_columns(conn, dataset))
+    select = ', '.join(column if column in existing else f'NULL AS {column}' for column in columns)
+    loaded = {}
+    for chunk in _chunks(keys):
+        rows = conn.execute(f"SELECT {select} FROM {dataset} WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        for values in rows:
+            row = _coerce(dict(zip(columns, values)), schema)
+            stamp_column = SOURCE_CHANGES[dataset][1]
+            stamp = row.get(stamp_column) if stamp_column else None
+            loaded[row['id']] = (partition(row), '' if stamp is None else str(stamp), {dataset: [row]})
+    return loaded
+
+
+def _expense_month(row: Dict[str, Any]) -> str:
+    value = str(row.get('지출일자') or '')
+    return value[:7] if len(value) >= 7 else event_month(None)
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _read_stamps(conn: sqlite3.Connection, source: str) -> Dict[str, str]:
+    # {행 키: 변경 표시} (블롭/본문은 읽지 않음. version 열이 없는 이전 스키마면 id만 비교)
+    stamp_column = SOURCE_CHANGES[source][1]
+    if stamp_column not in _table_columns(conn, source):
+        stamp_column = "''"
+    return {str(key): str(stamp) for key, stamp in conn.execute(f'SELECT id, {stamp_column} FROM {source}')}
+
+
+def _detect_changes(conn: sqlite3.Connection, source: str, known: Dict[str, list],
+                    after_seq: Optional[int]) -> Tuple[List[str], List[str], Optional[int]]:
+    # (바뀌거나 새로 생긴 키, 삭제된 키, 다음에 이어 읽을 outbox seq)
+    has_outbox = bool(_table_columns(conn, 'outbox'))
+    if has_outbox and after_seq is not None:
+        changes = {}
+        while True:
+            batch = read_changes(conn, after_seq, entities=(SOURCE_CHANGES[source][0],))
+            if not batch:
+                break
+            changes.update(latest_changes(batch))
+            after_seq = batch[-1].seq
+        changed = [str(entity_id) for (_, entity_id), change in changes.items() if change.op != OP_DELETE]
+        removed = [str(entity_id) for (_, entity_id), change in changes.items()
+                   if change.op == OP_DELETE and str(entity_id) in known]
+        return changed, removed, after_seq
+
+    # 처음에는 전체 변경 표시를 비교. 비교 도중의 변경은 다음 실행에서 다시 읽도록 seq를 먼저 읽음
+    next_seq = latest_seq(conn) if has_outbox else None
+    stamps = _read_stamps(conn, source)
+    changed = [key for key, stamp in stamps.items() if key not in known or known[key][1] != stamp]
+    removed = [key for key in known if key not in stamps]
+    return changed, removed, next_seq
+
+
+def _partition_dir(snapshot_dir: str, dataset: str, value: str) -> str:
+    return os.path.join(snapshot_dir, dataset, f"{DATASETS[dataset][2]}={value}")
+
+
+def _write_atomic(path: str, write: Callable[[str], None]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    write(temp_path)
+    os.replace(temp_path, path)
+
+
+def _rewrite_partition(snapshot_dir: str, dataset: str, value: str, drop_keys: set,
+                       rows: List[Dict[str, Any]]) -> None:
+    # 기존 파일에서 바뀐 원본 행을 빼고 새 행을 더해 다시 씀 (남는 행이 없으면 파티션 삭제)
+    schema, key_column, _ = DATASETS[dataset]
+    path = os.path.join(_partition_dir(snapshot_dir, dataset, value), DATA_FILE)
+    tables = []
+    if os.path.exists(path):
+        existing = pq.read_table(path)
+        keep = pc.invert(pc.is_in(existing[key_column], pa.array(sorted(drop_keys), pa.int64())))
+        tables.append(existing.filter(keep))
+    if rows:
+        tables.append(pa.Table.from_pylist(rows, schema=schema))
+    table = pa.concat_tables(tables) if tables else schema.empty_table()
+    if table.num_rows == 0:
+        if os.path.exists(path):
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+        return
+    _write_atomic(path, lambda temp_path: pq.write_table(table, temp_path))
+
+
+def refresh_snapshot(snapshot_dir: str, event_db: Optional[str] = None,
+                     budget_db: Optional[str] = None) -> Dict[str, int]:
+    # 바뀐 원본 행이 속한 파티션만 다시 씀. 원본별 다시 쓴 행 수를 반환
+    state_path = os.path.join(snapshot_dir, STATE_FILE)
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path, 'r', encoding='utf-8') as file:
+            state = json.load(file)
+
+    event_conn = _connect_readonly(event_db) if event_db and os.path.exists(event_db) else None
+    budget_conn = _connect_readonly(budget_db) if budget_db and os.path.exists(budget_db) else None
+    loaders = {
+        'events': lambda keys: _load_events(event_conn, keys),
+        'budget_items': lambda keys: _load_table(budget_conn, 'budget_items', keys,
+                                                 lambda row: str(row['id'] // BUDGET_BUCKET_ROWS)),
+        'expenses': lambda keys: _load_table(budget_conn, 'expenses', keys, _expense_month),
+    }
+    connections = {'events': event_conn, 'budget_items': budget_conn, 'expenses': budget_conn}
+    cursors = state.setdefault(OUTBOX_STATE, {})
+    changed_counts = {}
+    try:
+        for source, conn in connections.items():
+            if conn is None or not _table_columns(conn, source):
+                continue
+            # 이전 상태: {행 키: [파티션 값, 변경 표시]}
+            known = state.get(source, {})
+            changed, removed, next_seq = _detect_changes(conn, source, known, cursors.get(source))
+
+            loaded = loaders[source]([int(key) for key in changed]) if changed else {}
+            # 읽는 사이에 삭제된 행도 삭제로 처리
+            removed += [key for key in changed if int(key) not in loaded and key in known]
+            changed_counts[source] = len(loaded) + len(removed)
+            if loaded or removed:
+                touched = {int(key) for key in changed + removed}
+                partitions = {known[key][0] for key in changed + removed if key in known}
+                partitions.update(value for value, _, _ in loaded.values())
+                for dataset in SOURCES[source]:
+                    for value in partitions:
+                        rows = [row for row_value, _, frames in loaded.values() if row_value == value
+                                for row in frames[dataset]]
+                        _rewrite_partition(snapshot_dir, dataset, value, touched, rows)
+
+                known = {key: entry for key, entry in known.items() if key not in changed and key not in removed}
+                known.update({str(key): [value, stamp] for key, (value, stamp, _) in loaded.items()})
+                state[source] = known
+            elif cursors.get(source) == next_seq:
+                continue
+
+            if next_seq is None:
+                cursors.pop(source, None)
+            else:
+                cursors[source] = next_seq
+            _write_atomic(state_path, lambda temp_path: _dump_state(temp_path, state))
+    finally:
+        for conn in (event_conn, budget_conn):
+            if conn is not None:
+                conn.close()
+    return changed_counts
+
+
+def _dump_state(path: str, state: Dict[str, Any]) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(state, file, ensure_ascii=False)
+
+
+def connect_snapshot(snapshot_dir: str):
+    # 데이터셋별 뷰를 만든 DuckDB 메모리 연결 (스냅샷이 없는 데이터셋은 빈 테이블)
+    if duckdb is None:
+        raise RuntimeError("분석 쿼리에는 duckdb 패키지가 필요합니다. (pip install duckdb)")
+    conn = duckdb.connect()
+    for dataset, (schema, _, partition_column) in DATASETS.items():
+        dataset_dir = os.path.join(snapshot_dir, dataset)
+        has_files = os.path.isdir(dataset_dir) and any(
+            os.path.exists(os.path.join(dataset_dir, name, DATA_FILE)) for name in os.listdir(dataset_dir))
+        if has_files:
+            pattern = os.path.join(dataset_dir, '*', DATA_FILE).replace("'", "''")
+            conn.execute(f'''
+            CREATE VIEW {dataset} AS
+            SELECT * FROM read_parquet('{pattern}', hive_partitioning = true, hive_types_autocast = false)
+            ''')
+        else:
+            empty = schema.append(pa.field(partition_column, pa.string())).empty_table()
+            conn.register(dataset, empty)
+    # 입력한 SQL로 스냅샷 밖의 파일(다른 경로, 운영 SQLite DB)을 읽거나 쓰지 못하도록 잠금
+    conn.execute('SET allowed_directories = ?', [[os.path.abspath(snapshot_dir)]])
+    conn.execute('SET enable_external_access = false')
+    conn.execute('SET lock_configuration = true')
+    return conn
+
+
+def _read_only_statement(conn, sql: str) -> str:
+    # SELECT/WITH 한 문장만 허용
+    statements = conn.extract_statements(sql)
+    if len(statements) != 1:
+        raise ValueError("SQL 문장은 하나만 실행할 수 있습니다.")
+    statement = statements[0]
+    if statement.type != duckdb.StatementType.SELECT or \
+            not re.match(r'\s*\(*\s*(SELECT|WITH)\b', statement.query, re.IGNORECASE):
+        raise ValueError("조회(SELECT/WITH) 쿼리만 실행할 수 있습니다.")
+    return statement.query
+
+
+def run_query(snapshot_dir: str, sql: str) -> pd.DataFrame:
+    conn = connect_snapshot(snapshot_dir)
+    try:
+        return conn.execute(_read_only_statement(conn, sql)).fetchdf()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이벤트/예산 분석 스냅샷 (Parquet) 생성 및 DuckDB 쿼리")
+    parser.add_argument('--snapshot-dir', default='analytics_snapshot')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    refresh_parser = subparsers.add_parser('refresh', help="바뀐 행만 스냅샷에 반영")
+    refresh_parser.add_argument('--event-db', default='event_planner.db')
+    refresh_parser.add_argument('--budget-db', default='../management_Project/budget.db')
+    query_parser = subparsers.add_parser('query', help="스냅샷에 SQL 실행")
+    query_parser.add_argument('sql')
+    args = parser.parse_args()
+
+    if args.command == 'refresh':
+        started = time.perf_counter()
+        counts = refresh_snapshot(args.snapshot_dir, args.event_db, args.budget_db)
+        summary = ', '.join(f"{source} {count}건" for source, count in counts.items())
+        print(f"스냅샷 갱신 완료 ({summary}, {time.perf_counter() - started:.2f}초)")
+    else:
+        with pd.option_context('display.max_rows', 100, 'display.width', 200):
+            print(run_query(args.snapshot_dir, args.sql))
+
+
+if __name__ == '__main__':
+    main()
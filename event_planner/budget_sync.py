@@ -0,0 +1,166 @@
+import argparse
+import logging
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+from outbox import (BUDGET_TABLES, ENTITY_EVENT, EVENT_TABLES, OP_DELETE, install_outbox, latest_changes,
+                    set_offset, tail)
+from migrations import BUDGET_MIGRATIONS, STARTUP_SECONDS, migrate
+from serialization import decode_event
+
+# 이벤트 구성 요소(components)의 카테고리별 예산을 management_Project의 budget_items로 동기화
+#
+# - events 테이블의 트리거가 같은 트랜잭션에서 event_planner.db의 outbox(변경 피드)에 이벤트 변경을 기록
+# - 동기화는 마지막으로 처리한 seq 이후의 변경만 읽고, budget_items에 source_key 기준 upsert
+# - 처리한 seq(offset)는 budget.db에 budget_items 쓰기와 같은 트랜잭션으로 저장되어 재실행해도 안전
+# - 동기화 행(source_key가 있는 행)은 예산 관리 화면에서 읽기 전용
+
+SYNC_CONSUMER = 'event_budget_sync'
+BATCH_SIZE = 500
+BUDGET_COLUMNS = ['대분류', '항목명', '단가', '개수1', '단위1', '개수2', '단위2', '배정예산']
+# 동기화 행을 참조할 수 있는 테이블 (참조된 행은 카테고리가 빠져도 삭제하지 않음)
+REFERENCING_TABLES = ('expense_requests', 'expenses')
+
+
+def ensure_change_feed(conn: sqlite3.Connection) -> None:
+    # events 변경 트리거 설치 (이전 event_changes 피드는 seq를 유지한 채 outbox로 옮김)
+    install_outbox(conn, EVENT_TABLES)
+
+
+def ensure_budget_schema(conn: sqlite3.Connection) -> bool:
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'budget_items' not in tables:
+        return False
+
+    # budget.db 스키마 마이그레이션 (id 기본 키, version/source_key 열 등. 남은 백필은 다음 동기화에서 이어감)
+    migrate(conn, BUDGET_MIGRATIONS, max_seconds=STARTUP_SECONDS)
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(budget_items)')}
+    if not {'version', 'source_key'} <= columns:
+        # 예산 관리 앱이 아직 나머지 테이블을 만들지 않아 마이그레이션이 멈춘 경우
+        return False
+    # budget.db의 변경 피드 (sync_offsets도 여기서 생성)
+    install_outbox(conn, BUDGET_TABLES)
+    return True
+
+
+def event_key_prefix(event_id: int) -> str:
+    return f"event:{event_id}:"
+
+
+def project_event(event_id: int, event_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # 카테고리 하나당 budget_items 한 행 (source_key = event:<id>:<카테고리>)
+    event_name = event_data.get('event_name') or f"이벤트 {event_id}"
+    rows = []
+    for category, component in (event_data.get('components') or {}).items():
+        budget = int(component.get('budget') or 0)
+        rows.append({
+            'source_key': f"{event_key_prefix(event_id)}{category}",
+            '대분류': category,
+            '항목명': event_name,
+            '단가': budget,
+            '개수1': 1,
+            '단위1': '식',
+            '개수2': 1,
+            '단위2': '식',
+            '배정예산': budget,
+        })
+    return rows
+
+
+def _load_events(conn: sqlite3.Connection, event_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    placeholders = ','.join('?' * len(event_ids))
+    rows = conn.execute(f'SELECT id, event_data FROM events WHERE id IN ({placeholders})', event_ids)
+    return {row[0]: decode_event(row[1]) for row in rows}
+
+
+UPSERT_SQL = f'''
+INSERT INTO budget_items (source_key, {', '.join(BUDGET_COLUMNS)})
+VALUES (:source_key, {', '.join(':' + col for col in BUDGET_COLUMNS)})
+ON CONFLICT(source_key) DO UPDATE SET
+    {', '.join(f'{col} = excluded.{col}' for col in BUDGET_COLUMNS)},
+    version = budget_items.version + 1
+WHERE {' OR '.join(f'budget_items.{col} IS NOT excluded.{col}' for col in BUDGET_COLUMNS)}
+'''
+
+
+def _referenced_sql(conn: sqlite3.Connection) -> str:
+    # 지출/지출 요청이 참조하는 budget_items 행 조건 (테이블이 없으면 제외)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conditions = [f'EXISTS (SELECT 1 FROM {table} WHERE {table}.budget_item_id = budget_items.id)'
+                  for table in REFERENCING_TABLES if table in tables]
+    return ' OR '.join(conditions) or '0'
+
+
+def apply_projection(conn: sqlite3.Connection, event_id: int, rows: Iterable[Dict[str, Any]]) -> None:
+    rows = list(rows)
+    conn.executemany(UPSERT_SQL, rows)
+
+    # 이벤트에서 빠진 카테고리 행 삭제 (source_key 인덱스 범위 조회)
+    # 지출/지출 요청이 있는 행은 요청이 사라지지 않도록 지우지 않고 배정예산만 0으로
+    prefix = event_key_prefix(event_id)
+    keep = [row['source_key'] for row in rows]
+    placeholders = ','.join('?' * len(keep))
+    removed = f'''source_key >= ? AND source_key < ?
+        {f'AND source_key NOT IN ({placeholders})' if keep else ''}'''
+    params = [prefix, prefix[:-1] + ';'] + keep
+    referenced = _referenced_sql(conn)
+    conn.execute(f'''
+    UPDATE budget_items SET 단가 = 0, 배정예산 = 0, version = version + 1
+    WHERE {removed} AND ({referenced}) AND (단가 IS NOT 0 OR 배정예산 IS NOT 0)
+    ''', params)
+    conn.execute(f'DELETE FROM budget_items WHERE {removed} AND NOT ({referenced})', params)
+
+
+def sync_event_budgets(event_db: str, budget_db: str, batch_size: int = BATCH_SIZE,
+                       max_batches: Optional[int] = None) -> int:
+    # 처리한 변경 건수를 반환
+    if not os.path.exists(budget_db):
+        logging.warning(f"예산 DB를 찾을 수 없어 동기화를 건너뜁니다: {budget_db}")
+        return 0
+
+    processed = 0
+    event_conn = sqlite3.connect(event_db, timeout=5)
+    budget_conn = sqlite3.connect(budget_db, timeout=5)
+    try:
+        if not ensure_budget_schema(budget_conn):
+            logging.warning("budget_items 테이블이 없어 동기화를 건너뜁니다.")
+            return 0
+
+        ensure_change_feed(event_conn)
+        batches = 0
+        for changes in tail(event_conn, budget_conn, SYNC_CONSUMER, (ENTITY_EVENT,), batch_size):
+            # 같은 배치 안의 중복 변경은 최신 상태 한 번만 반영
+            latest = latest_changes(changes)
+            event_ids = sorted(event_id for _, event_id in latest)
+            events = _load_events(event_conn, [event_id for (_, event_id), change in latest.items()
+                                               if change.op != OP_DELETE])
+
+            with budget_conn:
+                for event_id in event_ids:
+                    event_data = events.get(event_id)
+                    apply_projection(budget_conn, event_id, project_event(event_id, event_data) if event_data else [])
+                set_offset(budget_conn, SYNC_CONSUMER, changes[-1].seq)
+
+            processed += len(changes)
+            batches += 1
+            if max_batches is not None and batches >= max_batches:
+                break
+    finally:
+        event_conn.close()
+        budget_conn.close()
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이벤트 카테고리 예산 -> budget_items 동기화")
+    parser.add_argument('--event-db', default='event_planner.db')
+    parser.add_argument('--budget-db', required=True)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    print(f"{sync_event_budgets(args.event_db, args.budget_db, args.batch_size)}건의 변경을 동기화했습니다.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+import argparse
+import json
+import math
+import os
+import sqlite3
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from serialization import decode_event
+
+# 인력/장비 수요 계획
+#
+# capacity_demand: 이벤트별로 인력/시스템/제작·렌탈 항목이 필요한 구간과 수량
+#   (start_day/end_day는 date.toordinal 정수, 양 끝 포함)
+# capacity_deltas: 모든 구간의 끝점을 (항목, 날짜)별로 합산한 값 (시작일에 +수량, 종료 다음 날에 -수량)
+#
+# save_event_data가 같은 트랜잭션에서 해당 이벤트의 이전 끝점을 빼고 새 끝점을 더한다.
+# 조회 시 기간 이전의 끝점은 항목별 한 행으로 합쳐 읽고, 차분 배열의 누적합으로 항목별 일별 수요를 계산한다.
+# (읽는 행 수가 이벤트 수가 아니라 항목 수 x 기간 일수에 비례)
+
+CAPACITY_CATEGORIES = ("섭외 / 인력", "시스템", "제작 / 렌탈")
+
+# 기간 단위별 일수 (시간 단위는 하루로 봄)
+DURATION_UNIT_DAYS = {'일': 1, '시간': 1, '주': 7, '월': 30, '개월': 30}
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config.json')
+
+
+def ensure_capacity_schema(conn: sqlite3.Connection) -> bool:
+    # 테이블을 새로 만들었으면 True (기존 이벤트로 채워야 함)
+    created = not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'capacity_demand'").fetchone()
+    conn.executescript('''
+    CREATE TABLE IF NOT EXISTS capacity_demand (
+        event_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        item TEXT NOT NULL,
+        start_day INTEGER NOT NULL,
+        end_day INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        PRIMARY KEY (event_id, category, item)
+    );
+    CREATE TABLE IF NOT EXISTS capacity_deltas (
+        category TEXT NOT NULL,
+        item TEXT NOT NULL,
+        day INTEGER NOT NULL,
+        delta INTEGER NOT NULL,
+        PRIMARY KEY (category, item, day)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_capacity_deltas_day ON capacity_deltas (day);
+    ''')
+    return created
+
+
+def event_period(document: Dict[str, Any]) -> Optional[Tuple[date, date]]:
+    # 셋업일~철수일 (없으면 시작일~종료일)
+    start = document.get('setup_date') or document.get('start_date')
+    end = document.get('teardown_date') or document.get('end_date') or start
+    if not isinstance(start, date) or not isinstance(end, date):
+        return None
+    return (start, end) if start <= end else (end, start)
+
+
+def item_period(period: Tuple[date, date], duration: Any, duration_unit: Any) -> Tuple[date, date]:
+    # 기간이 있으면 셋업일부터 기간만큼, 없거나 단위를 알 수 없으면 이벤트 기간 전체
+    unit_days = DURATION_UNIT_DAYS.get((duration_unit or '').strip())
+    try:
+        duration = float(duration or 0)
+    except (TypeError, ValueError):
+        duration = 0
+    if not unit_days or duration <= 0:
+        return period
+    return period[0], period[0] + timedelta(days=max(math.ceil(duration * unit_days), 1) - 1)
+
+
+def demand_rows(document: Dict[str, Any]) -> List[Tuple[str, str, int, int, int]]:
+    # (카테고리, 항목, 시작일, 종료일, 수량). 기타 항목은 입력한 이름으로 집계
+    period = event_period(document)
+    if period is None:
+        return []
+    rows = {}
+    for category in CAPACITY_CATEGORIES:
+        component = (document.get('components') or {}).get(category)
+        if not component:
+            continue
+        keys = [(item, item) for item in component.get('items') or [] if item != "기타"]
+        keys.extend((f"기타_{i + 1}", name) for i, name in enumerate(component.get('other_items') or []) if name)
+        for key, name in keys:
+            try:
+                quantity = int(component.get(f"{key}_quantity") or 0)
+            except (TypeError, ValueError):
+                continue
+            if quantity <= 0:
+                continue
+            start, end = item_period(period, component.get(f"{key}_duration"), component.get(f"{key}_duration_unit"))
+            previous = rows.get((category, name))
+            if previous:
+                # 같은 이름의 기타 항목은 구간을 합치고 수량을 더함
+                start, end = min(start, previous[0]), max(end, previous[1])
+                quantity += previous[2]
+            rows[(category, name)] = (start, end, quantity)
+    return [(category, name, start.toordinal(), end.toordinal(), quantity)
+            for (category, name), (start, end, quantity) in rows.items()]
+
+
+def _add_deltas(conn: sqlite3.Connection, rows: Sequence[Tuple[str, str, int, int, int]],
+                sign: int) -> List[Tuple[str, str, int]]:
+    # 바뀐 끝점의 키 목록을 반환
+    deltas: Dict[Tuple[str, str, int], int] = {}
+    for category, item, start_day, end_day, quantity in rows:
+        deltas[(category, item, start_day)] = deltas.get((category, item, start_day), 0) + sign * quantity
+        deltas[(category, item, end_day + 1)] = deltas.get((category, item, end_day + 1), 0) - sign * quantity
+    conn.executemany('''
+    INSERT INTO capacity_deltas (category, item, day, delta) VALUES (?, ?, ?, ?)
+    ON CONFLICT(category, item, day) DO UPDATE SET delta = delta + excluded.delta
+    ''', [(*key, delta) for key, delta in deltas.items() if delta])
+    return list(deltas)
+
+
+def refresh_event_demand(conn: sqlite3.Connection, event_id: int, document: Dict[str, Any]) -> None:
+    # 이전 구간의 끝점을 빼고 새 구간의 끝점을 더함 (호출하는 쪽의 트랜잭션 안에서 실행)
+    old = conn.execute('''
+    SELECT category, item, start_day, end_day, quantity FROM capacity_demand WHERE event_id = ?
+    ''', (event_id,)).fetchall()
+    new = demand_rows(document)
+    if sorted(old) == sorted(new):
+        return
+    changed = _add_deltas(conn, old, -1) + _add_deltas(conn, new, 1)
+    conn.executemany('DELETE FROM capacity_deltas WHERE category = ? AND item = ? AND day = ? AND delta = 0',
+                     changed)
+    conn.execute('DELETE FROM capacity_demand WHERE event_id = ?', (event_id,))
+    conn.executemany('''
+    INSERT INTO capacity_demand (event_id, category, item, start_day, end_day, quantity)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(event_id, *row) for row in new])
+
+
+def rebuild_demand(conn: sqlite3.Connection) -> int:
+    # 전체 이벤트로부터 수요 테이블을 다시 만듦. 처리한 이벤트 수를 반환
+    with conn:
+        conn.execute('DELETE FROM capacity_demand')
+        conn.execute('DELETE FROM capacity_deltas')
+        count = 0
+        for event_id, stored in conn.execute('SELECT id, event_data FROM events').fetchall():
+            refresh_event_demand(conn, event_id, decode_event(stored))
+            count += 1
+    return count
+
+
+def daily_demand(conn: sqlite3.Connection, start: date, end: date,
+                 categories: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    # 행: 날짜, 열: (카테고리, 항목), 값: 그날 필요한 수량 합계
+    if start > end:
+        start, end = end, start
+    start_day, end_day = start.toordinal(), end.toordinal()
+    # 기간 시작 이전의 끝점은 기간 시작일로 모아 합산 (종료일 이후 끝점은 필요 없음)
+    query = '''
+    SELECT category, item, MAX(day, ?) - ? AS offset, SUM(delta) AS delta FROM capacity_deltas
+    WHERE day <= ?
+    '''
+    params: List[Any] = [start_day, start_day, end_day]
+    if categories:
+        query += f" AND category IN ({', '.join('?' * len(categories))})"
+        params.extend(categories)
+    query += ' GROUP BY category, item, offset HAVING SUM(delta) != 0'
+    events = pd.read_sql_query(query, conn, params=params)
+
+    days = pd.date_range(start, end, freq='D')
+    if events.empty:
+        return pd.DataFrame(index=days, columns=pd.MultiIndex.from_tuples([], names=['category', 'item']),
+                            dtype='int64')
+
+    codes, columns = pd.MultiIndex.from_frame(events[['category', 'item']]).factorize()
+    diff = np.zeros((end_day - start_day + 1, len(columns)), dtype=np.int64)
+    np.add.at(diff, (events['offset'].to_numpy(), codes), events['delta'].to_numpy(dtype=np.int64))
+    demand = np.cumsum(diff, axis=0)
+    return pd.DataFrame(demand, index=days, columns=columns.set_names(['category', 'item']))
+
+
+def peak_days(demand: pd.DataFrame) -> pd.DataFrame:
+    # 항목별 최대 수요와 그 날짜 (처음 도달한 날)
+    if demand.empty or not len(demand.columns):
+        return pd.DataFrame(columns=['category', 'item', 'peak', 'peak_day'])
+    values = demand.to_numpy()
+    positions = values.argmax(axis=0)
+    result = pd.DataFrame({
+        'category': demand.columns.get_level_values('category'),
+        'item': demand.columns.get_level_values('item'),
+        'peak': values[positions, np.arange(values.shape[1])],
+        'peak_day': demand.index[positions].date,
+    })
+    return result.sort_values('peak', ascending=False, ignore_index=True)
+
+
+def over_commitment(demand: pd.DataFrame, limits: Dict[str, int]) -> pd.DataFrame:
+    # 보유 한도(항목명 -> 수량)를 넘는 항목별 초과 일수, 첫 초과일, 최대 초과량
+    columns = ['category', 'item', 'limit', 'days_over', 'first_day', 'max_excess']
+    items = demand.columns.get_level_values('item') if len(demand.columns) else []
+    selected = [i for i, item in enumerate(items) if item in limits]
+    if demand.empty or not selected:
+        return pd.DataFrame(columns=columns)
+
+    values = demand.to_numpy()[:, selected]
+    limit = np.array([limits[items[i]] for i in selected], dtype=np.int64)
+    excess = values - limit
+    over = excess > 0
+    flagged = over.any(axis=0)
+    if not flagged.any():
+        return pd.DataFrame(columns=columns)
+    result = pd.DataFrame({
+        'category': demand.columns.get_level_values('category')[selected],
+        'item': [items[i] for i in selected],
+        'limit': limit,
+        'days_over': over.sum(axis=0),
+        'first_day': demand.index[over.argmax(axis=0)].date,
+        'max_excess': excess.max(axis=0),
+    })[flagged]
+    return result.sort_values(['max_excess', 'days_over'], ascending=False, ignore_index=True)
+
+
+def load_limits(config_path: str = CONFIG_PATH) -> Dict[str, int]:
+    with open(config_path, 'r', encoding='utf-8') as file:
+        return {item: int(limit) for item, limit in json.load(file).get('CAPACITY_LIMITS', {}).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인력/장비 일별 수요 및 한도 초과 확인")
+    parser.add_argument('--event-db', default='event_planner.db')
+    parser.add_argument('--start', type=date.fromisoformat, default=date.today())
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--rebuild', action='store_true', help="이벤트 문서로부터 수요 테이블을 다시 만듦")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.event_db)
+    try:
+        if ensure_capacity_schema(conn) or args.rebuild:
+            print(f"{rebuild_demand(conn)}개 이벤트로 수요 테이블을 다시 만들었습니다.")
+        demand = daily_demand(conn, args.start, args.start + timedelta(days=args.days - 1))
+    finally:
+        conn.close()
+
+    print(peak_days(demand).head(20).to_string(index=False))
+    over = over_commitment(demand, load_limits())
+    if over.empty:
+        print("한도를 초과하는 항목이 없습니다.")
+    else:
+        print(over.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
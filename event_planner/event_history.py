@@ -0,0 +1,255 @@
+import argparse
+import copy
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from serialization import decode_event, encode_event
+
+# 이벤트 버전 이력 (append-only)
+#
+# - 저장할 때마다 직전 버전과의 차이(delta)만 event_versions에 추가
+# - CHECKPOINT_INTERVAL 버전마다 전체 문서(full)를 저장하여 복원 시 적용할 delta 수를 제한
+# - 보존 정책: 최근 KEEP_VERSIONS 버전은 모두 유지하고, 그 이전은 delta를 지우고 체크포인트만 남김
+#
+# delta 형식: {'set': [[경로, 값], ...], 'del': [경로, ...]}
+#   경로는 dict 키 목록이며, 리스트와 스칼라 값은 통째로 교체한다.
+
+CHECKPOINT_INTERVAL = 10
+KEEP_VERSIONS = 50
+KEEP_CHECKPOINTS = 10
+
+KIND_FULL = 'full'
+KIND_DELTA = 'delta'
+
+Path = Tuple[str, ...]
+
+
+def ensure_history_schema(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS event_versions (
+        event_id INTEGER NOT NULL,
+        version INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        payload BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (event_id, version)
+    )
+    ''')
+
+
+def _same(a: Any, b: Any) -> bool:
+    # True == 1 처럼 타입이 달라도 같다고 보는 경우를 구분
+    return type(a) is type(b) and a == b
+
+
+def diff_documents(old: Dict[str, Any], new: Dict[str, Any], prefix: Path = ()) -> Dict[str, list]:
+    delta = {'set': [], 'del': []}
+    _diff_into(old, new, prefix, delta)
+    return delta
+
+
+def _diff_into(old: Dict[str, Any], new: Dict[str, Any], prefix: Path, delta: Dict[str, list]) -> None:
+    for key, value in new.items():
+        path = prefix + (key,)
+        if key not in old:
+            delta['set'].append([list(path), value])
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            _diff_into(old[key], value, path, delta)
+        elif not _same(old[key], value):
+            delta['set'].append([list(path), value])
+    for key in old:
+        if key not in new:
+            delta['del'].append(list(prefix + (key,)))
+
+
+def apply_delta(document: Dict[str, Any], delta: Dict[str, list]) -> Dict[str, Any]:
+    # document를 직접 수정하므로 호출하는 쪽에서 소유한 사본을 넘겨야 함
+    for path, value in delta['set']:
+        target = document
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = value
+    for path in delta['del']:
+        target = document
+        for key in path[:-1]:
+            target = target.get(key)
+            if target is None:
+                break
+        else:
+            target.pop(path[-1], None)
+    return document
+
+
+def _latest_version(conn: sqlite3.Connection, event_id: int) -> int:
+    row = conn.execute('SELECT MAX(version) FROM event_versions WHERE event_id = ?', (event_id,)).fetchone()
+    return row[0] or 0
+
+
+def _replay(conn: sqlite3.Connection, event_id: int, start: int, end: int,
+            document: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    # start~end 구간의 버전을 순서대로 적용 (full이면 문서를 교체)
+    rows = conn.execute('''
+    SELECT kind, payload FROM event_versions
+    WHERE event_id = ? AND version BETWEEN ? AND ?
+    ORDER BY version
+    ''', (event_id, start, end))
+    for kind, payload in rows:
+        body = decode_event(payload)
+        document = body if kind == KIND_FULL else apply_delta(document, body)
+    return document
+
+
+def get_version(conn: sqlite3.Connection, event_id: int, version: int) -> Optional[Dict[str, Any]]:
+    checkpoint = conn.execute('''
+    SELECT MAX(version) FROM event_versions
+    WHERE event_id = ? AND version <= ? AND kind = ?
+    ''', (event_id, version, KIND_FULL)).fetchone()[0]
+    if checkpoint is None:
+        return None
+    exists = conn.execute('SELECT 1 FROM event_versions WHERE event_id = ? AND version = ?',
+                          (event_id, version)).fetchone()
+    if not exists:
+        return None
+    return _replay(conn, event_id, checkpoint, version)
+
+
+def record_version(cursor: sqlite3.Cursor, event_id: int, document: Dict[str, Any], compress: bool = True) -> int:
+    # 새 버전 번호를 반환 (변경이 없으면 새 버전을 만들지 않고 최신 버전 번호를 반환)
+    conn = cursor.connection
+    latest = _latest_version(conn, event_id)
+    version = latest + 1
+
+    # 체크포인트 차례여도 직전 버전과 같으면 새 버전을 만들지 않음
+    if latest:
+        delta = diff_documents(get_version(conn, event_id, latest), document)
+        if not delta['set'] and not delta['del']:
+            return latest
+
+    if latest == 0 or version % CHECKPOINT_INTERVAL == 1:
+        cursor.execute('INSERT INTO event_versions (event_id, version, kind, payload) VALUES (?, ?, ?, ?)',
+                       (event_id, version, KIND_FULL, encode_event(document, compress=compress)))
+        # 체크포인트를 만들 때마다 보존 정책 적용
+        compact_history(conn, event_id)
+        return version
+
+    cursor.execute('INSERT INTO event_versions (event_id, version, kind, payload) VALUES (?, ?, ?, ?)',
+                   (event_id, version, KIND_DELTA, encode_event(delta, compress=False)))
+    return version
+
+
+def list_versions(conn: sqlite3.Connection, event_id: int) -> List[Tuple[int, str, str, int]]:
+    # (버전, 종류, 생성 시각, 저장 크기)
+    return conn.execute('''
+    SELECT version, kind, created_at, LENGTH(payload) FROM event_versions
+    WHERE event_id = ? ORDER BY version
+    ''', (event_id,)).fetchall()
+
+
+def _flatten_changes(delta: Dict[str, list], old: Dict[str, Any]) -> List[Tuple[Path, Any, Any]]:
+    def lookup(path):
+        target = old
+        for key in path:
+            if not isinstance(target, dict) or key not in target:
+                return None
+            target = target[key]
+        return target
+
+    changes = [(tuple(path), lookup(path), value) for path, value in delta['set']]
+    changes.extend((tuple(path), lookup(path), None) for path in delta['del'])
+    return sorted(changes, key=lambda change: change[0])
+
+
+def diff_versions(conn: sqlite3.Connection, event_id: int, from_version: int,
+                  to_version: int) -> List[Tuple[Path, Any, Any]]:
+    # (경로, 이전 값, 새 값) 목록. from_version을 복원한 뒤 to_version까지 이어서 적용하므로
+    # 두 버전을 각각 체크포인트부터 복원하지 않음
+    if from_version > to_version:
+        from_version, to_version = to_version, from_version
+        reverse = True
+    else:
+        reverse = False
+
+    for version in (from_version, to_version):
+        if not conn.execute('SELECT 1 FROM event_versions WHERE event_id = ? AND version = ?',
+                            (event_id, version)).fetchone():
+            raise ValueError(f"이벤트 {event_id}의 버전 {version}을(를) 찾을 수 없습니다.")
+
+    old = get_version(conn, event_id, from_version)
+    new = _replay(conn, event_id, from_version + 1, to_version, copy.deepcopy(old))
+
+    changes = _flatten_changes(diff_documents(old, new), old)
+    if reverse:
+        changes = [(path, after, before) for path, before, after in changes]
+    return changes
+
+
+def compact_history(conn: sqlite3.Connection, event_id: int, keep_versions: int = KEEP_VERSIONS,
+                    keep_checkpoints: int = KEEP_CHECKPOINTS) -> int:
+    # 보존 구간 이전의 delta를 지우고 오래된 체크포인트를 keep_checkpoints개로 줄임. 삭제한 행 수를 반환
+    latest = _latest_version(conn, event_id)
+    window_start = latest - keep_versions + 1
+    if window_start <= 1:
+        return 0
+
+    # 보존 구간의 첫 버전을 복원하는 데 필요한 체크포인트
+    base = conn.execute('''
+    SELECT MAX(version) FROM event_versions
+    WHERE event_id = ? AND version <= ? AND kind = ?
+    ''', (event_id, window_start, KIND_FULL)).fetchone()[0]
+    if base is None:
+        return 0
+
+    deleted = conn.execute('''
+    DELETE FROM event_versions WHERE event_id = ? AND version < ? AND kind = ?
+    ''', (event_id, base, KIND_DELTA)).rowcount
+    deleted += conn.execute('''
+    DELETE FROM event_versions
+    WHERE event_id = ? AND version < ? AND kind = ? AND version NOT IN (
+        SELECT version FROM event_versions
+        WHERE event_id = ? AND version < ? AND kind = ?
+        ORDER BY version DESC LIMIT ?
+    )
+    ''', (event_id, base, KIND_FULL, event_id, base, KIND_FULL, keep_checkpoints)).rowcount
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이벤트 버전 이력 조회/정리")
+    parser.add_argument('--event-db', default='event_planner.db')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = subparsers.add_parser('list', help="버전 목록")
+    list_parser.add_argument('event_id', type=int)
+
+    diff_parser = subparsers.add_parser('diff', help="두 버전 비교")
+    diff_parser.add_argument('event_id', type=int)
+    diff_parser.add_argument('from_version', type=int)
+    diff_parser.add_argument('to_version', type=int)
+
+    compact_parser = subparsers.add_parser('compact', help="보존 정책 적용")
+    compact_parser.add_argument('--keep-versions', type=int, default=KEEP_VERSIONS)
+    compact_parser.add_argument('--keep-checkpoints', type=int, default=KEEP_CHECKPOINTS)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.event_db)
+    try:
+        ensure_history_schema(conn)
+        if args.command == 'list':
+            for version, kind, created_at, size in list_versions(conn, args.event_id):
+                print(f"v{version}\t{kind}\t{created_at}\t{size}B")
+        elif args.command == 'diff':
+            for path, before, after in diff_versions(conn, args.event_id, args.from_version, args.to_version):
+                print(f"{'.'.join(path)}: {before!r} -> {after!r}")
+        elif args.command == 'compact':
+            event_ids = [row[0] for row in conn.execute('SELECT DISTINCT event_id FROM event_versions')]
+            with conn:
+                deleted = sum(compact_history(conn, event_id, args.keep_versions, args.keep_checkpoints)
+                              for event_id in event_ids)
+            conn.execute('VACUUM')
+            print(f"{deleted}개 버전을 정리했습니다.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
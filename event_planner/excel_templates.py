@@ -0,0 +1,169 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import openpyxl
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.merge import MergedCellRange
+
+# 선언형 엑셀 문서 템플릿
+#
+# 문서는 블록(위에서 아래로 쌓이는 행 묶음) 목록으로 선언하고, compile_template()이 모듈 로드 시
+# 한 번 렌더 계획으로 바꾼다.
+# - 블록의 각 칸(Slot)은 열 위치, 병합 너비, 스타일을 가지며 rows(ctx)가 행마다 칸 값을 돌려줌
+#   (rows가 None을 내면 빈 행)
+# - 스타일은 통합 문서마다 NamedStyle로 한 번 등록하고 셀에는 이름만 지정 (셀마다 글꼴/정렬 객체를 만들지 않음)
+# - 병합은 모아 두었다가 마지막에 범위만 등록 (병합 셀 객체와 테두리 복원 과정 생략)
+
+Context = Dict[str, Any]
+Value = Union[Any, Callable[[Context], Any]]
+
+
+@dataclass(slots=True)
+class CellStyle:
+    name: str
+    font: Optional[Font] = None
+    alignment: Optional[Alignment] = None
+    fill: Optional[PatternFill] = None
+
+
+TITLE = CellStyle('dnmd_title', Font(bold=True, size=14), Alignment(horizontal='center', vertical='center'))
+LARGE_TITLE = CellStyle('dnmd_large_title', Font(bold=True, size=16))
+TEXT = CellStyle('dnmd_text', alignment=Alignment(horizontal='left'))
+LABEL = CellStyle('dnmd_label', alignment=Alignment(horizontal='left', vertical='center'))
+SECTION = CellStyle('dnmd_section', Font(bold=True), Alignment(horizontal='left', vertical='center'))
+BOLD = CellStyle('dnmd_bold', Font(bold=True))
+HEADER = CellStyle('dnmd_header', Font(bold=True), Alignment(horizontal='center', vertical='center'),
+                   PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid"))
+
+
+@dataclass(slots=True)
+class Slot:
+    column: int
+    span: int = 1
+    style: Optional[CellStyle] = None
+
+
+@dataclass(slots=True)
+class Block:
+    slots: Tuple[Slot, ...]
+    # 고정된 행 목록 또는 ctx를 받아 행 목록을 돌려주는 함수
+    rows: Union[Sequence[Optional[Sequence[Any]]], Callable[[Context], Iterable[Optional[Sequence[Any]]]]]
+
+
+@dataclass(slots=True)
+class Template:
+    sheet_title: Value
+    blocks: Sequence[Union[Block, Sequence[Block]]]
+    column_widths: Dict[str, float] = field(default_factory=dict)
+    auto_size: Sequence[str] = ()
+
+
+def _resolve(value: Value, ctx: Context) -> Any:
+    return value(ctx) if callable(value) else value
+
+
+# 블록 생성 함수
+
+def text(value: Value, style: Optional[CellStyle] = TEXT, span: int = 8) -> Block:
+    # 한 행을 span 열만큼 병합하여 값을 씀
+    return Block((Slot(1, span, style),), lambda ctx: [(_resolve(value, ctx),)])
+
+
+def blank(count: int = 1) -> Block:
+    return Block((), [None] * count)
+
+
+def grid(rows: Callable[[Context], Iterable[Sequence[Any]]], columns: int = 4, span: int = 2,
+         style: Optional[CellStyle] = LABEL) -> Block:
+    # (항목, 값, 항목, 값) 형태의 정보 표. 칸마다 span 열씩 병합
+    return Block(tuple(Slot(1 + i * span, span, style) for i in range(columns)), rows)
+
+
+def pairs(rows: Callable[[Context], Iterable[Optional[Sequence[Any]]]],
+          style: Optional[CellStyle] = None) -> Block:
+    return Block((Slot(1, 1, style), Slot(2)), rows)
+
+
+def lines(rows: Callable[[Context], Iterable[Any]], style: Optional[CellStyle] = None, span: int = 8) -> Block:
+    return Block((Slot(1, span, style),), lambda ctx: ((line,) for line in rows(ctx)))
+
+
+def table(headers: Sequence[str], rows: Callable[[Context], Iterable[Sequence[Any]]],
+          header_style: CellStyle = HEADER) -> List[Block]:
+    return [
+        Block(tuple(Slot(i + 1, 1, header_style) for i in range(len(headers))), [tuple(headers)]),
+        Block(tuple(Slot(i + 1) for i in range(len(headers))), rows),
+    ]
+
+
+# 컴파일/렌더링
+
+@dataclass(slots=True)
+class CompiledTemplate:
+    sheet_title: Value
+    # 블록별 ((열, 병합 시작 열 문자, 병합 끝 열 문자, 스타일 이름), ...)와 행 목록
+    blocks: List[Tuple[Tuple[Tuple[int, Optional[str], Optional[str], Optional[str]], ...], Any]]
+    styles: List[CellStyle]
+    column_widths: Dict[str, float]
+    auto_size: Sequence[str]
+
+    def render(self, filename: str, **ctx: Any) -> None:
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = _resolve(self.sheet_title, ctx)
+        for style in self.styles:
+            # 글꼴을 지정하지 않은 스타일은 일반 셀과 같은 기본 글꼴 사용
+            named = NamedStyle(name=style.name, font=style.font or DEFAULT_FONT)
+            if style.alignment is not None:
+                named.alignment = style.alignment
+            if style.fill is not None:
+                named.fill = style.fill
+            wb.add_named_style(named)
+
+        merges = []
+        row = 1
+        for slots, rows in self.blocks:
+            for values in (rows(ctx) if callable(rows) else rows):
+                if values is not None:
+                    for (column, merge_start, merge_end, style), value in zip(slots, values):
+                        cell = ws.cell(row=row, column=column, value=value)
+                        if style:
+                            cell.style = style
+                        if merge_start:
+                            merges.append(f"{merge_start}{row}:{merge_end}{row}")
+                row += 1
+
+        for coord in merges:
+            ws.merged_cells.add(MergedCellRange(ws, coord))
+        for column, width in self.column_widths.items():
+            ws.column_dimensions[column].width = width
+        for column in self.auto_size:
+            ws.column_dimensions[column].auto_size = True
+        wb.save(filename)
+
+
+def compile_template(template: Template) -> CompiledTemplate:
+    blocks, styles = [], {}
+    flat = []
+    for block in template.blocks:
+        flat.extend(block if isinstance(block, (list, tuple)) else [block])
+
+    for block in flat:
+        slots = []
+        for slot in block.slots:
+            if slot.style is not None:
+                known = styles.setdefault(slot.style.name, slot.style)
+                if known is not slot.style:
+                    raise ValueError(f"같은 이름의 다른 스타일이 있습니다: {slot.style.name}")
+            if slot.span > 1:
+                merge = (get_column_letter(slot.column), get_column_letter(slot.column + slot.span - 1))
+            else:
+                merge = (None, None)
+            slots.append((slot.column, *merge, slot.style.name if slot.style else None))
+        rows = block.rows if callable(block.rows) else [tuple(r) if r is not None else None for r in block.rows]
+        blocks.append((tuple(slots), rows))
+
+    return CompiledTemplate(template.sheet_title, blocks, list(styles.values()), dict(template.column_widths),
+                            tuple(template.auto_size))
@@ -0,0 +1,281 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from serialization import decode_event, encode_event
+
+# 엑셀 내보내기 작업 큐
+#
+# - 작업은 export_jobs 테이블에 쌓이고, 같은 프로세스의 워커 스레드가 하나씩 가져가 처리
+# - 진행률/메시지는 워커가 DB에 기록하므로 화면을 벗어났다 돌아와도 같은 작업을 이어서 조회
+# - 결과 파일은 export_files에 RESULT_TTL 동안 보관 후 삭제
+# - 같은 문서에 대한 작업(job_key 동일)은 대기/실행 중이거나 보관 중인 결과가 있으면 새로 만들지 않음
+#
+# render(document, report)는 [(버튼 라벨, 파일명, 바이트), ...]를 반환하고,
+# 중간 진행 상황을 report(진행률 0~1, 메시지)로 알린다.
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+RESULT_TTL = 24 * 3600
+# 워커가 이 시간 동안 진행 상황을 갱신하지 않으면 중단된 것으로 보고 다시 대기열에 넣음
+STALE_AFTER = 300
+MAX_ATTEMPTS = 3
+PURGE_INTERVAL = 600
+
+ExportFile = Tuple[str, str, bytes]
+Renderer = Callable[[Dict[str, Any], Callable[[float, str], None]], List[ExportFile]]
+
+
+def ensure_export_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript('''
+    CREATE TABLE IF NOT EXISTS export_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_key TEXT NOT NULL,
+        event_id INTEGER,
+        payload BLOB NOT NULL,
+        status TEXT NOT NULL,
+        progress REAL NOT NULL DEFAULT 0,
+        message TEXT NOT NULL DEFAULT '',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        finished_at REAL,
+        expires_at REAL
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_export_jobs_active
+        ON export_jobs (job_key) WHERE status IN ('queued', 'running');
+    CREATE INDEX IF NOT EXISTS idx_export_jobs_status ON export_jobs (status, id);
+    CREATE INDEX IF NOT EXISTS idx_export_jobs_event ON export_jobs (event_id, id);
+    CREATE TABLE IF NOT EXISTS export_files (
+        job_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        label TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (job_id, position)
+    );
+    ''')
+
+
+def job_key(document: Dict[str, Any]) -> str:
+    return hashlib.sha256(encode_event(document, compress=False)).hexdigest()
+
+
+def _reusable_job(conn: sqlite3.Connection, key: str, now: float, include_failed: bool) -> Optional[int]:
+    statuses = [STATUS_QUEUED, STATUS_RUNNING, STATUS_DONE] + ([STATUS_FAILED] if include_failed else [])
+    row = conn.execute(f'''
+    SELECT id FROM export_jobs
+    WHERE job_key = ? AND status IN ({','.join('?' * len(statuses))})
+      AND (expires_at IS NULL OR expires_at > ?)
+    ORDER BY id DESC LIMIT 1
+    ''', (key, *statuses, now)).fetchone()
+    return row[0] if row else None
+
+
+def submit_export(conn: sqlite3.Connection, document: Dict[str, Any], event_id: Optional[int] = None,
+                  retry: bool = False) -> int:
+    # 작업 id를 반환. 같은 문서의 작업이 이미 있으면 그 id를 반환
+    # (retry=True면 실패한 작업은 재사용하지 않고 새로 등록)
+    key = job_key(document)
+    now = time.time()
+    existing = _reusable_job(conn, key, now, include_failed=not retry)
+    if existing:
+        return existing
+
+    cursor = conn.execute('''
+    INSERT OR IGNORE INTO export_jobs (job_key, event_id, payload, status, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', (key, event_id, encode_event(document), STATUS_QUEUED, now, now))
+    conn.commit()
+    if cursor.rowcount:
+        return cursor.lastrowid
+    # 동시에 제출된 같은 작업이 먼저 등록됨
+    return _reusable_job(conn, key, now, include_failed=False)
+
+
+def _job_from_row(row: Tuple) -> Dict[str, Any]:
+    keys = ('id', 'event_id', 'status', 'progress', 'message', 'attempts', 'created_at', 'finished_at', 'expires_at')
+    return dict(zip(keys, row))
+
+
+def get_job(conn: sqlite3.Connection, job_id: int) -> Optional[Dict[str, Any]]:
+    row = conn.execute('''
+    SELECT id, event_id, status, progress, message, attempts, created_at, finished_at, expires_at
+    FROM export_jobs WHERE id = ?
+    ''', (job_id,)).fetchone()
+    return _job_from_row(row) if row else None
+
+
+def get_job_files(conn: sqlite3.Connection, job_id: int) -> List[ExportFile]:
+    return conn.execute('''
+    SELECT label, filename, data FROM export_files WHERE job_id = ? ORDER BY position
+    ''', (job_id,)).fetchall()
+
+
+def list_event_exports(conn: sqlite3.Connection, event_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+    # 보관 중인 완료 작업 (최근 순)
+    rows = conn.execute('''
+    SELECT id, event_id, status, progress, message, attempts, created_at, finished_at, expires_at
+    FROM export_jobs WHERE event_id = ? AND status = ? AND expires_at > ?
+    ORDER BY id DESC LIMIT ?
+    ''', (event_id, STATUS_DONE, time.time(), limit)).fetchall()
+    return [_job_from_row(row) for row in rows]
+
+
+def claim_job(conn: sqlite3.Connection, max_attempts: int = MAX_ATTEMPTS,
+              stale_after: float = STALE_AFTER) -> Optional[Tuple[int, Dict[str, Any]]]:
+    # 대기 중인 작업 하나를 실행 중으로 바꾸고 (작업 id, 문서)를 반환
+    now = time.time()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # 중단된 워커의 작업을 회수
+        conn.execute('''
+        UPDATE export_jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+            message = CASE WHEN attempts >= ? THEN '작업이 중단되었습니다.' ELSE message END,
+            finished_at = CASE WHEN attempts >= ? THEN ? ELSE finished_at END,
+            expires_at = CASE WHEN attempts >= ? THEN ? ELSE expires_at END,
+            updated_at = ?
+        WHERE status = ? AND updated_at < ?
+        ''', (max_attempts, STATUS_FAILED, STATUS_QUEUED, max_attempts, max_attempts, now,
+              max_attempts, now + RESULT_TTL, now, STATUS_RUNNING, now - stale_after))
+        row = conn.execute('SELECT id, payload FROM export_jobs WHERE status = ? ORDER BY id LIMIT 1',
+                           (STATUS_QUEUED,)).fetchone()
+        if row:
+            conn.execute('''
+            UPDATE export_jobs SET status = ?, attempts = attempts + 1, progress = 0, message = '', updated_at = ?
+            WHERE id = ?
+            ''', (STATUS_RUNNING, now, row[0]))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if not row:
+        return None
+    return row[0], decode_event(row[1])
+
+
+def report_progress(conn: sqlite3.Connection, job_id: int, progress: float, message: str = '') -> None:
+    conn.execute('UPDATE export_jobs SET progress = ?, message = ?, updated_at = ? WHERE id = ?',
+                 (min(max(progress, 0.0), 1.0), message, time.time(), job_id))
+    conn.commit()
+
+
+def complete_job(conn: sqlite3.Connection, job_id: int, files: List[ExportFile], ttl: float = RESULT_TTL) -> None:
+    now = time.time()
+    with conn:
+        conn.execute('DELETE FROM export_files WHERE job_id = ?', (job_id,))
+        conn.executemany('INSERT INTO export_files (job_id, position, label, filename, data) VALUES (?, ?, ?, ?, ?)',
+                         [(job_id, position, label, filename, data)
+                          for position, (label, filename, data) in enumerate(files)])
+        conn.execute('''
+        UPDATE export_jobs SET status = ?, progress = 1, message = '', updated_at = ?, finished_at = ?, expires_at = ?
+        WHERE id = ?
+        ''', (STATUS_DONE, now, now, now + ttl, job_id))
+
+
+def fail_job(conn: sqlite3.Connection, job_id: int, message: str, ttl: float = RESULT_TTL) -> None:
+    # 실패한 작업도 TTL 동안 남겨 두어 같은 문서로 다시 제출해도 곧바로 재실행되지 않게 함
+    now = time.time()
+    with conn:
+        conn.execute('''
+        UPDATE export_jobs SET status = ?, message = ?, updated_at = ?, finished_at = ?, expires_at = ?
+        WHERE id = ?
+        ''', (STATUS_FAILED, message, now, now, now + ttl, job_id))
+
+
+def purge_expired(conn: sqlite3.Connection, now: Optional[float] = None) -> int:
+    # 보관 기간이 지난 작업과 결과 파일 삭제. 삭제한 작업 수를 반환
+    now = now or time.time()
+    with conn:
+        conn.execute('''
+        DELETE FROM export_files WHERE job_id IN (SELECT id FROM export_jobs WHERE expires_at <= ?)
+        ''', (now,))
+        return conn.execute('DELETE FROM export_jobs WHERE expires_at <= ?', (now,)).rowcount
+
+
+def run_job(conn: sqlite3.Connection, job_id: int, document: Dict[str, Any], render: Renderer,
+            ttl: float = RESULT_TTL) -> bool:
+    try:
+        files = render(document, lambda progress, message='': report_progress(conn, job_id, progress, message))
+    except Exception as e:
+        logging.error(f"Export job {job_id} failed: {str(e)}", exc_info=True)
+        fail_job(conn, job_id, str(e), ttl)
+        return False
+    complete_job(conn, job_id, files, ttl)
+    return True
+
+
+class ExportWorkerPool:
+    # 데몬 스레드 워커. 각 워커는 자기 DB 연결을 사용하고, 작업이 없으면 notify()나 poll_interval까지 대기
+    def __init__(self, db_path: str, render: Renderer, workers: int = 2, ttl: float = RESULT_TTL,
+                 poll_interval: float = 2.0):
+        self.db_path = db_path
+        self.render = render
+        self.workers = workers
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self._wake = threading.Condition()
+        self._pending = 0
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._last_purge = 0.0
+
+    def start(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            ensure_export_schema(conn)
+        finally:
+            conn.close()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'export-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self) -> None:
+        with self._wake:
+            self._pending += 1
+            self._wake.notify()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopped.set()
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _wait(self) -> None:
+        with self._wake:
+            if not self._pending and not self._stopped.is_set():
+                self._wake.wait(self.poll_interval)
+            self._pending = max(self._pending - 1, 0)
+
+    def _purge_if_due(self, conn: sqlite3.Connection) -> None:
+        now = time.time()
+        if now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        purge_expired(conn, now)
+
+    def _run(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            while not self._stopped.is_set():
+                try:
+                    self._purge_if_due(conn)
+                    claimed = claim_job(conn)
+                except sqlite3.Error as e:
+                    logging.error(f"Export worker error: {str(e)}")
+                    claimed = None
+                if claimed is None:
+                    self._wait()
+                    continue
+                run_job(conn, *claimed, self.render, self.ttl)
+        finally:
+            conn.close()
@@ -1,19 +1,35 @@
 import streamlit as st
-from streamlit_option_menu import option_menu
 from datetime import date, timedelta, datetime
 import json
 import pandas as pd
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
 import os
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import logging
-import re
-from openpyxl.utils.dataframe import dataframe_to_rows
 import sqlite3
+import tempfile
+import time
 from contextlib import contextmanager
 from functools import lru_cache
 
+from budget_sync import ensure_change_feed, sync_event_budgets
+from serialization import encode_event, decode_event
+from event_history import ensure_history_schema, get_version, record_version
+from portfolio import (ensure_portfolio_schema, backfill_if_empty, refresh_event_rollup, query_totals,
+                       query_category_budgets, dimension_values)
+from vendor_directory import format_phone_number, lookup_vendors, sync_vendors
+from price_index import install_price_index, suggest_unit_price
+import excel_templates
+import menus
+from session_gc import collect_garbage, state_report
+from venue_bookings import ensure_booking_schema, find_conflicts, rebuild_bookings, refresh_event_bookings
+from capacity import (ensure_capacity_schema, rebuild_demand, refresh_event_demand, daily_demand, peak_days,
+                      over_commitment, CAPACITY_CATEGORIES)
+from export_jobs import (ExportWorkerPool, ensure_export_schema, submit_export, job_key, get_job, get_job_files,
+                         list_event_exports, STATUS_DONE, STATUS_FAILED)
+from analytics_snapshot import refresh_snapshot, run_query, DATASETS
+from migrations import EVENT_MIGRATIONS, migrate
+from models import Event, Component, Delivery, Item, Venue, event_from_dict, event_to_dict
+
 # Logging 설정
 logging.basicConfig(filename='app.log', level=logging.ERROR)
 
@@ -52,14 +68,22 @@ config = load_json_file(CONFIG_PATH)
 
 event_options = EventOptions(item_options)
 
+# 세션 상태 정리 시 항목별 위젯 키를 구분하기 위한 전체 항목명
+ALL_ITEMS = frozenset(item for items in event_options.CATEGORIES.values() for item in items)
+
+# 이벤트 DB 및 예산 관리(management_Project) DB 경로
+EVENT_DB_PATH = 'event_planner.db'
+BUDGET_DB_PATH = os.getenv('BUDGET_DB_PATH') or os.path.join(os.path.dirname(__file__), config['BUDGET_DB_PATH'])
+# 분석 스냅샷(Parquet) 디렉토리 (이벤트 DB와 같은 위치)
+ANALYTICS_SNAPSHOT_DIR = config['ANALYTICS_SNAPSHOT_DIR']
+
+# 메뉴 렌더링 방식 ('component' 또는 'native')
+menus.set_backend(os.getenv('MENU_BACKEND') or config['MENU_BACKEND'])
+
 # Helper functions
 def format_currency(amount: float) -> str:
     return f"{amount:,.0f}"
 
-def format_phone_number(number: str) -> str:
-    pattern = r'(\d{3})(\d{3,4})(\d{4})'
-    return re.sub(pattern, r'\1-\2-\3', number)
-
 # 단계별 사용자 가이드 추가 함수
 def display_guide(guide_text: str) -> None:
     with st.expander("사용자 가이드", expanded=False):
@@ -68,7 +92,7 @@ def display_guide(guide_text: str) -> None:
 # 데이터베이스 연결 최적화
 @contextmanager
 def get_db_connection():
-    conn = sqlite3.connect('event_planner.db', check_same_thread=False)
+    conn = sqlite3.connect(EVENT_DB_PATH, check_same_thread=False)
     try:
         yield conn
     finally:
@@ -86,62 +110,138 @@ def init_db():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         ''')
+        ensure_change_feed(conn)
+        ensure_history_schema(conn)
+        ensure_portfolio_schema(conn)
+        ensure_export_schema(conn)
+        bookings_created = ensure_booking_schema(conn)
+        demand_created = ensure_capacity_schema(conn)
         conn.commit()
-
-# JSON 인코더 클래스
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (date, datetime)):
-            return obj.isoformat()
-        return super().default(obj)
+        # 스키마 마이그레이션은 정해진 시간만 진행하고, 남은 백필은 다음 실행에서 이어감
+        remaining = migrate(conn, EVENT_MIGRATIONS, max_seconds=config['MIGRATION_STARTUP_SECONDS'])
+        if remaining:
+            logging.info(f"마이그레이션 진행 중: {', '.join(f'{m.name} {m.done}/{m.total}' for m in remaining)}")
+        backfill_if_empty(conn)
+        if bookings_created:
+            rebuild_bookings(conn)
+        if demand_created:
+            rebuild_demand(conn)
 
 # 이벤트 데이터 저장 함수
-def save_event_data(event_data: Dict[str, Any]) -> None:
+def save_event_data(event: Event) -> None:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            event_id = event_data.get('id')
-            event_data_json = json.dumps(event_data, ensure_ascii=False, cls=CustomJSONEncoder)
+            event_id = event.id
+            document = event_to_dict(event)
+            compress = config['EVENT_COMPRESSION'] == 'zstd'
+            event_data_blob = encode_event(document, compress=compress)
             if event_id:
                 cursor.execute('''
-                UPDATE events SET event_data = ?, updated_at = CURRENT_TIMESTAMP
+                UPDATE events SET event_data = ?, event_name = ?, updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
-                ''', (event_data_json, event_id))
+                ''', (event_data_blob, document.get('event_name', 'Unnamed Event'), event_id))
             else:
                 cursor.execute('''
-                INSERT INTO events (event_data) VALUES (?)
-                ''', (event_data_json,))
-                event_data['id'] = cursor.lastrowid
+                INSERT INTO events (event_data, event_name) VALUES (?, ?)
+                ''', (event_data_blob, document.get('event_name', 'Unnamed Event')))
+                event.id = cursor.lastrowid
+            record_version(cursor, event.id, document, compress=compress)
+            refresh_event_rollup(conn, event.id, document)
+            refresh_event_bookings(conn, event.id, document)
+            refresh_event_demand(conn, event.id, document)
             conn.commit()
+        load_event_data.cache_clear()
     except Exception as e:
         logging.error(f"Error saving event data: {str(e)}")
-        logging.error(f"Event data: {event_data}")
+        logging.error(f"Event data: {event}")
         raise
 
+    # 카테고리 예산을 예산 관리 DB로 동기화 (실패해도 저장은 유지)
+    try:
+        sync_event_budgets(EVENT_DB_PATH, BUDGET_DB_PATH)
+    except Exception as e:
+        logging.error(f"Error syncing event budgets: {str(e)}")
+
+    try:
+        sync_vendors(EVENT_DB_PATH, BUDGET_DB_PATH)
+    except Exception as e:
+        logging.error(f"Error syncing vendors: {str(e)}")
+
+# 협력사 디렉토리 검색 (예산 관리 DB가 없으면 빈 목록)
+def search_vendors(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    if not query or not os.path.exists(BUDGET_DB_PATH):
+        return []
+    conn = sqlite3.connect(BUDGET_DB_PATH, timeout=5)
+    try:
+        return lookup_vendors(conn, query, limit)
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+# 과거 단가 색인 설치 (프로세스마다 한 번. 예산 관리 DB가 없으면 False)
+@st.cache_resource
+def price_index_ready() -> bool:
+    if not os.path.exists(BUDGET_DB_PATH):
+        return False
+    conn = sqlite3.connect(BUDGET_DB_PATH, timeout=5)
+    try:
+        return install_price_index(conn)
+    except sqlite3.OperationalError as e:
+        logging.error(f"Error installing price index: {str(e)}")
+        return False
+    finally:
+        conn.close()
+
+# 항목명(없으면 대분류)의 과거 단가 분포. 항목 입력마다 조회하므로 잠시 캐시
+@st.cache_data(ttl=60)
+def suggest_item_price(item: str, category: str) -> Optional[Dict[str, Any]]:
+    if not item or not price_index_ready():
+        return None
+    conn = sqlite3.connect(BUDGET_DB_PATH, timeout=5)
+    try:
+        return suggest_unit_price(conn, item, category)
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
 # 이벤트 데이터 로드 함수
 @lru_cache(maxsize=32)
-def load_event_data(event_id: int) -> Dict[str, Any]:
+def load_event_data(event_id: int) -> Optional[Event]:
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('SELECT event_data FROM events WHERE id = ?', (event_id,))
         result = cursor.fetchone()
         if result:
-            event_data = json.loads(result[0])
-            for key, value in event_data.items():
-                if isinstance(value, str):
-                    try:
-                        event_data[key] = datetime.fromisoformat(value).date()
-                    except ValueError:
-                        pass
-            return event_data
-        return {}
+            event = event_from_dict(decode_event(result[0]))
+            event.id = event_id
+            return event
+        return None
+
+# 지정한 버전으로 복원 (복원도 새 버전으로 저장되어 이력은 그대로 유지)
+def restore_event_version(event_id: int, version: int) -> Event:
+    with get_db_connection() as conn:
+        document = get_version(conn, event_id, version)
+    if document is None:
+        raise ValueError(f"이벤트 {event_id}의 버전 {version}을(를) 찾을 수 없습니다.")
+    event = event_from_dict(document)
+    event.id = event_id
+    save_event_data(event)
+    return event
 
 # 모든 이벤트 가져오기 함수
 def get_all_events() -> List[Tuple[int, str, str]]:
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT id, event_data, created_at FROM events ORDER BY created_at DESC')
-        return [(row[0], json.loads(row[1]).get('event_name', 'Unnamed Event'), row[2]) for row in cursor.fetchall()]
+        # 이벤트명 열이 아직 백필되지 않은 행만 문서를 디코딩
+        cursor.execute('''
+        SELECT id, event_name, created_at, CASE WHEN event_name IS NULL THEN event_data END
+        FROM events ORDER BY created_at DESC
+        ''')
+        return [(row[0], row[1] if row[1] is not None else decode_event(row[3]).get('event_name', 'Unnamed Event'), row[2])
+                for row in cursor.fetchall()]
 
 # 앱 시작 시 데이터베이스 초기화
 init_db()
@@ -163,23 +263,23 @@ def basic_info() -> None:
     handle_event_type(event_data)
     handle_budget_info(event_data)
 
-    if event_data['event_type'] == "온라인 콘텐츠":
+    if event_data.event_type == "온라인 콘텐츠":
         handle_online_content(event_data)
-    elif event_data['event_type'] == "오프라인 이벤트":
+    elif event_data.event_type == "오프라인 이벤트":
         handle_offline_event(event_data)
 
-def handle_general_info(event_data: Dict[str, Any]) -> None:
-    st.write(f"현재 예상 참여 관객 수: {event_data.get('scale', 0)}명")
+def handle_general_info(event_data: Event) -> None:
+    st.write(f"현재 예상 참여 관객 수: {event_data.scale}명")
 
     col1, col2 = st.columns(2)
     with col1:
-        event_data['event_name'] = st.text_input("용역명", value=event_data.get('event_name', ''), key="event_name_basic", autocomplete="off")
-        event_data['client_name'] = st.text_input("클라이언트명", value=event_data.get('client_name', ''), key="client_name_basic")
+        event_data.event_name = st.text_input("용역명", value=event_data.event_name, key="event_name_basic", autocomplete="off")
+        event_data.client_name = st.text_input("클라이언트명", value=event_data.client_name, key="client_name_basic")
     with col2:
-        event_data['manager_name'] = st.text_input("담당 PM", value=event_data.get('manager_name', ''), key="manager_name_basic")
-        event_data['manager_email'] = st.text_input("담당 PM 이메일", value=event_data.get('manager_email', ''), key="manager_email_basic")
+        event_data.manager_name = st.text_input("담당 PM", value=event_data.manager_name, key="manager_name_basic")
+        event_data.manager_email = st.text_input("담당 PM 이메일", value=event_data.manager_email, key="manager_email_basic")
 
-    event_data['manager_position'] = render_option_menu(
+    event_data.manager_position = render_option_menu(
         "담당자 직급",
         options=["선임", "책임", "수석"],
         key="manager_position"
@@ -187,261 +287,269 @@ def handle_general_info(event_data: Dict[str, Any]) -> None:
 
     manager_contact = st.text_input(
         "담당자 연락처",
-        value=event_data.get('manager_contact', ''),
+        value=event_data.manager_contact,
         help="숫자만 입력해주세요 (예: 01012345678)",
         key="manager_contact_basic"
     )
     if manager_contact:
         manager_contact = ''.join(filter(str.isdigit, manager_contact))
-        event_data['manager_contact'] = format_phone_number(manager_contact)
+        event_data.manager_contact = format_phone_number(manager_contact)
 
-    st.write(f"입력된 연락처: {event_data.get('manager_contact', '')}")
+    st.write(f"입력된 연락처: {event_data.manager_contact}")
 
 def render_option_menu(label: str, options: List[str], key: str) -> str:
     icons = ["🔹" for _ in options]
-    selected = option_menu(
+    selected = menus.menu(
         label, options,
         icons=icons,
         menu_icon="cast",
         default_index=0,
         orientation="horizontal",
-        styles={
-            "container": {"padding": "5px", "background-color": "#f0f0f0"},
-            "icon": {"color": "#ff6347", "font-size": "20px"},
-            "nav-link": {"font-size": "18px", "text-align": "center", "margin":"0px", "--hover-color": "#ffcccc", "--icon-color": "#ff6347"},
-            "nav-link-selected": {"background-color": "#ff6347", "color": "white", "--icon-color": "white"},
-        },
+        style='option',
         key=key
     )
     return selected
 
-def handle_event_type(event_data: Dict[str, Any]) -> None:
+def handle_event_type(event_data: Event) -> None:
     col1, col2 = st.columns(2)
     with col1:
-        event_data['event_type'] = render_option_menu(
+        event_data.event_type = render_option_menu(
             "용역 유형",
             event_options.EVENT_TYPES,
             "event_type"
         )
     with col2:
-        event_data['contract_type'] = render_option_menu(
+        event_data.contract_type = render_option_menu(
             "용역 종류",
             event_options.CONTRACT_TYPES,
             "contract_type"
         )
 
     # 온라인 이벤트 설정
-    if event_data['event_type'] == "온라인 콘텐츠":
-        event_data['scale'] = 999
-        if 'venues' not in event_data:
-            event_data['venues'] = [{}]
-        event_data['venues'][0]['name'] = "온라인"
-        event_data['venues'][0]['address'] = "온라인"
-
-def handle_budget_info(event_data: Dict[str, Any]) -> None:
+    if event_data.event_type == "온라인 콘텐츠":
+        event_data.scale = 999
+        if not event_data.venues:
+            event_data.venues = [Venue()]
+        event_data.venues[0].name = "온라인"
+        event_data.venues[0].address = "온라인"
+
+def handle_budget_info(event_data: Event) -> None:
     st.header("예산 정보")
 
     col1, col2 = st.columns(2)
     with col1:
-        event_data['contract_status'] = render_option_menu(
+        event_data.contract_status = render_option_menu(
             "계약 금액 상태",
             config['CONTRACT_STATUS_OPTIONS'],
             "contract_status"
         )
     with col2:
         vat_options = config['VAT_OPTIONS']
-        vat_included = option_menu(
+        vat_included = menus.menu(
             "부가세 포함 여부",
             options=vat_options,
             icons=['check-circle', 'x-circle'],
             menu_icon="coin",
             default_index=0,
             orientation="horizontal",
-            styles={
-                "container": {"padding": "0!important", "background-color": "#FFF9C4"},
-                "icon": {"color": "#FBC02D", "font-size": "16px"},
-                "nav-link": {"font-size": "14px", "text-align": "center", "margin":"0px", "--hover-color": "#FFF59D", "--icon-color": "#FBC02D"},
-                "nav-link-selected": {"background-color": "#FBC02D", "color": "white", "--icon-color": "white"},
-            },
+            style='vat',
             key="vat_included"
         )
-        event_data['vat_included'] = (vat_included == vat_options[0])
+        event_data.vat_included = (vat_included == vat_options[0])
 
-    event_data['contract_amount'] = st.number_input(
+    event_data.contract_amount = st.number_input(
         "총 계약 금액 (원)",
         min_value=0,
-        value=event_data.get('contract_amount', 0),
+        value=event_data.contract_amount,
         key="contract_amount",
         format="%d"
     )
 
     display_budget_details(event_data)
 
-    if event_data['contract_status'] == "추가 예정":
+    if event_data.contract_status == "추가 예정":
         handle_additional_amount(event_data)
 
     handle_profit_info(event_data)
 
-def display_budget_details(event_data: Dict[str, Any]) -> None:
-    if event_data['vat_included']:
-        original_amount = round(event_data['contract_amount'] / 1.1)
-        vat_amount = round(event_data['contract_amount'] - original_amount)
+def display_budget_details(event_data: Event) -> None:
+    if event_data.vat_included:
+        original_amount = round(event_data.contract_amount / 1.1)
+        vat_amount = round(event_data.contract_amount - original_amount)
     else:
-        original_amount = event_data['contract_amount']
+        original_amount = event_data.contract_amount
         vat_amount = round(original_amount * 0.1)
 
-    st.write(f"입력된 계약 금액: {format_currency(event_data['contract_amount'])} 원")
+    st.write(f"입력된 계약 금액: {format_currency(event_data.contract_amount)} 원")
     st.write(f"원금: {format_currency(original_amount)} 원")
     st.write(f"부가세: {format_currency(vat_amount)} 원")
 
-def handle_additional_amount(event_data: Dict[str, Any]) -> None:
-    event_data['additional_amount'] = st.number_input(
+def handle_additional_amount(event_data: Event) -> None:
+    event_data.additional_amount = st.number_input(
         "추가 예정 금액 (원)",
         min_value=0,
-        value=event_data.get('additional_amount', 0),
+        value=event_data.additional_amount,
         key="additional_amount",
         format="%d"
     )
-    st.write(f"입력된 추가 예정 액: {format_currency(event_data['additional_amount'])} 원")
+    st.write(f"입력된 추가 예정 액: {format_currency(event_data.additional_amount)} 원")
 
-def handle_profit_info(event_data: Dict[str, Any]) -> None:
-    event_data['expected_profit_percentage'] = st.number_input(
+def handle_profit_info(event_data: Event) -> None:
+    event_data.expected_profit_percentage = st.number_input(
         "예상 수익률 (%)",
         min_value=0.0,
         max_value=100.0,
-        value=event_data.get('expected_profit_percentage', 0.0),
+        value=event_data.expected_profit_percentage,
         format="%.2f",
         step=0.01,
         key="expected_profit_percentage"
     )
 
-    total_amount = event_data['contract_amount'] + event_data.get('additional_amount', 0)
-    original_amount = round(total_amount / 1.1) if event_data['vat_included'] else total_amount
-    expected_profit = round(original_amount * (event_data['expected_profit_percentage'] / 100))
+    total_amount = event_data.contract_amount + event_data.additional_amount
+    original_amount = round(total_amount / 1.1) if event_data.vat_included else total_amount
+    expected_profit = round(original_amount * (event_data.expected_profit_percentage / 100))
 
-    event_data['expected_profit'] = expected_profit
+    event_data.expected_profit = expected_profit
 
     st.write(f"예상 수익 금액: {format_currency(expected_profit)} 원")
 
-    total_category_budget = sum(component.get('budget', 0) for component in event_data.get('components', {}).values())
-    if total_category_budget > event_data['contract_amount']:
-        st.warning(f"주의: 카테고리별 예산 총액({format_currency(total_category_budget)} 원)이 총 계약 금액({format_currency(event_data['contract_amount'])} 원)을 초과합니다.")
+    total_category_budget = sum(component.budget for component in event_data.components.values())
+    if total_category_budget > event_data.contract_amount:
+        st.warning(f"주의: 카테고리별 예산 총액({format_currency(total_category_budget)} 원)이 총 계약 금액({format_currency(event_data.contract_amount)} 원)을 초과합니다.")
 
-def handle_online_content(event_data: Dict[str, Any]) -> None:
+def handle_online_content(event_data: Event) -> None:
     st.subheader("온라인 콘텐츠 정보")
     
     col1, col2 = st.columns(2)
     with col1:
-        event_data['start_date'] = st.date_input("콘텐츠 제작 시작일", 
-                                   value=event_data.get('start_date', date.today()), 
+        event_data.start_date = st.date_input("콘텐츠 제작 시작일", 
+                                   value=event_data.start_date or date.today(), 
                                    key="online_start_date")
     with col2:
-        event_data['end_date'] = st.date_input("콘텐츠 제작 종료일",
-                                 value=max(event_data.get('end_date', event_data['start_date']), event_data['start_date']),
-                                 min_value=event_data['start_date'],
+        event_data.end_date = st.date_input("콘텐츠 제작 종료일",
+                                 value=max(event_data.end_date or event_data.start_date, event_data.start_date),
+                                 min_value=event_data.start_date,
                                  key="online_end_date")
 
-    event_data['online_platform'] = st.text_input(
+    event_data.online_platform = st.text_input(
         "사용할 온라인 플랫폼",
-        value=event_data.get('online_platform', ''),
+        value=event_data.online_platform,
         help="예: YouTube, Zoom, Twitch 등",
         key="online_platform"
     )
     
-    event_data['streaming_method'] = render_option_menu(
+    event_data.streaming_method = render_option_menu(
         "스트리밍 방식",
         ["라이브", "녹화 후 업로드", "혼합"],
         "streaming_method"
     )
     
-    if event_data['streaming_method'] in ["라이브", "혼합"]:
-        event_data['streaming_date'] = st.date_input(
+    if event_data.streaming_method in ["라이브", "혼합"]:
+        event_data.streaming_date = st.date_input(
             "스트리밍 날짜",
-            value=event_data.get('streaming_date', date.today()),
+            value=event_data.streaming_date or date.today(),
             key="streaming_date"
         )
-        event_data['streaming_time'] = st.time_input(
+        event_data.streaming_time = st.time_input(
             "스트리밍 시작 시간",
-            value=event_data.get('streaming_time', datetime.now().time()),
+            value=event_data.streaming_time or datetime.now().time(),
             key="streaming_time"
         )
     
-    if event_data['streaming_method'] in ["녹화 후 업로드", "혼합"]:
-        event_data['recording_location'] = st.text_input(
+    if event_data.streaming_method in ["녹화 후 업로드", "혼합"]:
+        event_data.recording_location = st.text_input(
             "녹화 장소",
-            value=event_data.get('recording_location', ''),
+            value=event_data.recording_location,
             key="recording_location"
         )
-        event_data['upload_date'] = st.date_input(
+        event_data.upload_date = st.date_input(
             "업로드 예정일",
-            value=event_data.get('upload_date', date.today()),
+            value=event_data.upload_date or date.today(),
             key="upload_date"
         )
     
-    event_data['expected_duration'] = st.number_input(
+    event_data.expected_duration = st.number_input(
         "예상 콘텐츠 길이 (분)",
         min_value=1,
-        value=event_data.get('expected_duration', 60),
+        value=event_data.expected_duration,
         key="expected_duration"
     )
     
-    event_data['content_description'] = st.text_area(
+    event_data.content_description = st.text_area(
         "콘텐츠 간단 설명",
-        value=event_data.get('content_description', ''),
+        value=event_data.content_description,
         key="content_description"
     )
 
-    duration = (event_data['end_date'] - event_data['start_date']).days
+    duration = (event_data.end_date - event_data.start_date).days
     months, days = divmod(duration, 30)
     st.write(f"콘텐츠 제작 기간: {months}개월 {days}일")
 
-def handle_offline_event(event_data: Dict[str, Any]) -> None:
+def handle_offline_event(event_data: Event) -> None:
     st.subheader("오프라인 이벤트 정보")
 
     col1, col2 = st.columns(2)
 
     with col1:
         start_date = st.date_input("시작 날짜",
-                                   value=event_data.get('start_date', date.today()),
+                                   value=event_data.start_date or date.today(),
                                    key="start_date")
 
     with col2:
         end_date = st.date_input("종료 날짜",
-                                 value=event_data.get('end_date', start_date),
+                                 value=event_data.end_date or start_date,
                                  min_value=start_date,
                                  key="end_date")
 
-    event_data['start_date'] = start_date
-    event_data['end_date'] = end_date
+    event_data.start_date = start_date
+    event_data.end_date = end_date
 
     col3, col4 = st.columns(2)
 
     with col3:
-        event_data['setup_start'] = render_option_menu("셋업 시작일", config['SETUP_OPTIONS'], "setup_start")
+        event_data.setup_start = render_option_menu("셋업 시작일", config['SETUP_OPTIONS'], "setup_start")
 
     with col4:
-        event_data['teardown'] = render_option_menu("철수 마감일", config['TEARDOWN_OPTIONS'], "teardown")
+        event_data.teardown = render_option_menu("철수 마감일", config['TEARDOWN_OPTIONS'], "teardown")
 
-    if event_data['setup_start'] == config['SETUP_OPTIONS'][0]:
-        event_data['setup_date'] = start_date - timedelta(days=1)
+    if event_data.setup_start == config['SETUP_OPTIONS'][0]:
+        event_data.setup_date = start_date - timedelta(days=1)
     else:
-        event_data['setup_date'] = start_date
+        event_data.setup_date = start_date
 
-    if event_data['teardown'] == config['TEARDOWN_OPTIONS'][0]:
-        event_data['teardown_date'] = end_date
+    if event_data.teardown == config['TEARDOWN_OPTIONS'][0]:
+        event_data.teardown_date = end_date
     else:
-        event_data['teardown_date'] = end_date + timedelta(days=1)
+        event_data.teardown_date = end_date + timedelta(days=1)
 
-    st.write(f"셋업 시작일: {event_data['setup_date']}")
-    st.write(f"철수 마감일: {event_data['teardown_date']}")
+    st.write(f"셋업 시작일: {event_data.setup_date}")
+    st.write(f"철수 마감일: {event_data.teardown_date}")
 
-    if event_data['setup_date'] > start_date:
+    if event_data.setup_date > start_date:
         st.error("셋업 시작일은 이벤트 시작일보다 늦을 수 없습니다.")
     if end_date < start_date:
         st.error("이벤트 종료일은 시작일보다 빠를 수 없습니다.")
-    if event_data['teardown_date'] < end_date:
+    if event_data.teardown_date < end_date:
         st.error("철수 마감일은 이벤트 종료일보다 빠를 수 없습니다.")
 
+    display_venue_conflicts(event_data)
+
+# 같은 장소를 겹치는 기간(셋업~철수)에 쓰는 다른 이벤트 경고
+def display_venue_conflicts(event_data: Event) -> None:
+    if event_data.event_type != "오프라인 이벤트" or event_data.venue_type == "온라인":
+        return
+    venues = [(venue.name, venue.address) for venue in event_data.venues if venue.name or venue.address]
+    start = event_data.setup_date or event_data.start_date
+    end = event_data.teardown_date or event_data.end_date or start
+    if not venues or start is None:
+        return
+    with get_db_connection() as conn:
+        conflicts = find_conflicts(conn, venues, start, end, exclude_event_id=event_data.id)
+    for conflict in conflicts:
+        venue_label = "장소명" if conflict['kind'] == 'name' else "주소"
+        st.warning(f"주의: {venue_label} '{conflict['venue']}'은(는) '{conflict['event_name']}' "
+                   f"이벤트가 {conflict['start']} ~ {conflict['end']} 기간에 사용 중입니다.")
+
 def venue_info() -> None:
     event_data = st.session_state.event_data
     st.header("장소 정보")
@@ -454,47 +562,45 @@ def venue_info() -> None:
     """
     display_guide(guide_text)
 
-    if event_data['event_type'] == "온라인 콘텐츠":
+    if event_data.event_type == "온라인 콘텐츠":
         handle_online_content_location(event_data)
     else:
         handle_offline_event_venue(event_data)
 
-def handle_offline_event_venue(event_data: Dict[str, Any]) -> None:
-    event_data['venue_status'] = render_option_menu(
+def handle_offline_event_venue(event_data: Event) -> None:
+    event_data.venue_status = render_option_menu(
         "장소 확정 상태",
         event_options.STATUS_OPTIONS,
         "venue_status"
     )
 
     venue_type_options = ["실내", "실외", "혼합", "온라인"]
-    event_data['venue_type'] = render_option_menu(
+    event_data.venue_type = render_option_menu(
         "희망하는 장소 유형",
         venue_type_options,
         "venue_type"
     )
 
-    if event_data['venue_type'] == "온라인":
+    if event_data.venue_type == "온라인":
         st.info("온라인 이벤트는 물리적 장소 정보가 필요하지 않습니다.")
-        event_data['scale'] = 999  # 온라인 이벤트의 경우 scale을 999로 설정
-        event_data['venues'] = [{'name': '온라인', 'address': '온라인'}]  # 온라인 이벤트의 경우 장소명과 주소를 '온라인'으로 설정
+        event_data.scale = 999  # 온라인 이벤트의 경우 scale을 999로 설정
+        event_data.venues = [Venue('온라인', '온라인')]  # 온라인 이벤트의 경우 장소명과 주소를 '온라인'으로 설정
     else:
-        event_data['scale'] = st.number_input(
+        event_data.scale = st.number_input(
             "예상 참여 관객 수",
             min_value=0,
-            value=event_data.get('scale', 0),
+            value=event_data.scale,
             step=1,
             format="%d",
             key="scale_input_venue"
         )
 
-        if event_data['venue_status'] == "알 수 없는 상태":
+        if event_data.venue_status == "알 수 없는 상태":
             handle_unknown_venue_status(event_data)
         else:
-            if 'venues' not in event_data:
-                event_data['venues'] = [{'name': '', 'address': ''}]
             handle_known_venue_status(event_data)
 
-def handle_unknown_venue_status(event_data: Dict[str, Any]) -> None:
+def handle_unknown_venue_status(event_data: Event) -> None:
     major_regions = [
         "서울", "부산", "인천", "대구", "대전", "광주", "울산", "세종",
         "경기도", "강원도", "충청북도", "충청남도", "전라북도", "전라남도", "경상북도", "경상남도", "제주도"
@@ -508,104 +614,105 @@ def handle_unknown_venue_status(event_data: Dict[str, Any]) -> None:
         }
         return f"{region_emojis.get(region, '📍')} {region}"
 
-    event_data['desired_region'] = st.selectbox(
+    event_data.desired_region = st.selectbox(
         "희망하는 지역",
         options=major_regions,
-        index=major_regions.index(event_data.get('desired_region', major_regions[0])),
+        index=major_regions.index(event_data.desired_region or major_regions[0]),
         format_func=format_region,
         key="desired_region_selectbox"
     )
 
-    event_data['specific_location'] = st.text_input("세부 지역 (선택사항)", value=event_data.get('specific_location', ''), key="specific_location")
-    event_data['desired_capacity'] = st.number_input("희망하는 수용 인원", min_value=0, value=int(event_data.get('desired_capacity', 0)), key="desired_capacity")
+    event_data.specific_location = st.text_input("세부 지역 (선택사항)", value=event_data.specific_location, key="specific_location")
+    event_data.desired_capacity = st.number_input("희망하는 수용 인원", min_value=0, value=int(event_data.desired_capacity), key="desired_capacity")
 
     handle_venue_facilities(event_data)
     handle_venue_budget(event_data)
 
-def handle_known_venue_status(event_data: Dict[str, Any]) -> None:
-    if 'venues' not in event_data or not event_data['venues']:
-        event_data['venues'] = [{'name': '', 'address': ''}]
+def handle_known_venue_status(event_data: Event) -> None:
+    if not event_data.venues:
+        event_data.venues = [Venue()]
 
-    for i, venue in enumerate(event_data['venues']):
+    for i, venue in enumerate(event_data.venues):
         st.subheader(f"장소 {i+1}")
         col1, col2 = st.columns(2)
         with col1:
-            venue['name'] = st.text_input("장소명", value=venue.get('name', ''), key=f"venue_name_{i}")
+            venue.name = st.text_input("장소명", value=venue.name, key=f"venue_name_{i}")
         with col2:
-            venue['address'] = st.text_input("주소", value=venue.get('address', ''), key=f"venue_address_{i}")
+            venue.address = st.text_input("주소", value=venue.address, key=f"venue_address_{i}")
 
         if i > 0 and st.button(f"장소 {i+1} 삭제", key=f"delete_venue_{i}"):
-            event_data['venues'].pop(i)
+            event_data.venues.pop(i)
             st.experimental_rerun()
 
     if st.button("장소 추가"):
-        event_data['venues'].append({'name': '', 'address': ''})
+        event_data.venues.append(Venue())
         st.experimental_rerun()
 
+    display_venue_conflicts(event_data)
     handle_venue_facilities(event_data)
     handle_venue_budget(event_data)
 
-def handle_venue_facilities(event_data: Dict[str, Any]) -> None:
-    if event_data['venue_type'] in ["실내", "혼합"]:
+def handle_venue_facilities(event_data: Event) -> None:
+    if event_data.venue_type in ["실내", "혼합"]:
         facility_options = ["음향 시설", "조명 시설", "LED 시설", "빔프로젝트 시설", "주차", "Wifi", "기타"]
-        event_data['facilities'] = st.multiselect("행사장 자체 보유 시설", facility_options, default=event_data.get('facilities', []), key="facilities")
+        event_data.facilities = st.multiselect("행사장 자체 보유 시설", facility_options, default=event_data.facilities, key="facilities")
 
-        if "기타" in event_data['facilities']:
-            event_data['other_facilities'] = st.text_input("기타 시설 입력", key="other_facility_input")
+        if "기타" in event_data.facilities:
+            event_data.other_facilities = st.text_input("기타 시설 입력", key="other_facility_input")
 
-def handle_venue_budget(event_data: Dict[str, Any]) -> None:
-    event_data['venue_budget'] = st.number_input("장소 대관 비용 예산 (원)", min_value=0, value=int(event_data.get('venue_budget', 0)), key="venue_budget", format="%d")
+def handle_venue_budget(event_data: Event) -> None:
+    event_data.venue_budget = st.number_input("장소 대관 비용 예산 (원)", min_value=0, value=int(event_data.venue_budget), key="venue_budget", format="%d")
 
-def handle_online_content_location(event_data: Dict[str, Any]) -> None:
+def handle_online_content_location(event_data: Event) -> None:
     st.subheader("온라인 콘텐츠 정보")
     
-    event_data['online_platform'] = st.text_input(
+    event_data.online_platform = st.text_input(
         "사용할 온라인 플랫폼",
-        value=event_data.get('online_platform', ''),
+        value=event_data.online_platform,
         help="예: YouTube, Zoom, Twitch 등",
         key="online_platform"
     )
     
-    event_data['streaming_method'] = render_option_menu(
+    event_data.streaming_method = render_option_menu(
         "스트리밍 방식",
         ["라이브", "녹화 후 업로드", "혼합"],
         "streaming_method"
     )
     
-    if event_data['streaming_method'] in ["라이브", "혼합"]:
-        event_data['streaming_date'] = st.date_input(
+    if event_data.streaming_method in ["라이브", "혼합"]:
+        event_data.streaming_date = st.date_input(
             "스트리밍 날짜",
-            value=event_data.get('streaming_date', date.today()),
+            value=event_data.streaming_date or date.today(),
             key="streaming_date"
         )
-        event_data['streaming_time'] = st.time_input(
+        event_data.streaming_time = st.time_input(
             "스트리밍 시작 시간",
-            value=event_data.get('streaming_time', datetime.now().time()),
+            value=event_data.streaming_time or datetime.now().time(),
             key="streaming_time"
         )
     
-    if event_data['streaming_method'] in ["녹화 후 업로드", "혼합"]:
-        event_data['recording_location'] = st.text_input(
+    if event_data.streaming_method in ["녹화 후 업로드", "혼합"]:
+        event_data.recording_location = st.text_input(
             "녹화 장소",
-            value=event_data.get('recording_location', ''),
+            value=event_data.recording_location,
             key="recording_location"
         )
-        event_data['upload_date'] = st.date_input(
+        event_data.upload_date = st.date_input(
             "업로드 예정일",
-            value=event_data.get('upload_date', date.today()),
+            value=event_data.upload_date or date.today(),
             key="upload_date"
         )
     
-    event_data['expected_duration'] = st.number_input(
+    event_data.expected_duration = st.number_input(
         "예상 콘텐츠 길이 (분)",
         min_value=1,
-        value=event_data.get('expected_duration', 60),
+        value=event_data.expected_duration,
         key="expected_duration"
     )
     
-    event_data['content_description'] = st.text_area(
+    event_data.content_description = st.text_area(
         "콘텐츠 간단 설명",
-        value=event_data.get('content_description', ''),
+        value=event_data.content_description,
         key="content_description"
     )
 
@@ -614,23 +721,21 @@ def service_components() -> None:
     st.header("용역 구성 요소")
 
     selected_categories = select_categories_with_icons(event_data)
-    event_data['selected_categories'] = selected_categories
+    event_data.selected_categories = selected_categories
 
-    event_data['components'] = event_data.get('components', {})
     for category in selected_categories:
         handle_category(category, event_data)
 
-    event_data['components'] = {k: v for k, v in event_data['components'].items() if k in selected_categories}
+    event_data.components = {k: v for k, v in event_data.components.items() if k in selected_categories}
 
-def select_categories_with_icons(event_data: Dict[str, Any]) -> List[str]:
+def select_categories_with_icons(event_data: Event) -> List[str]:
     categories = list(event_options.CATEGORIES.keys())
-    default_categories = event_data.get('selected_categories', [])
-    default_categories = [cat for cat in default_categories if cat in categories]
+    default_categories = [cat for cat in event_data.selected_categories if cat in categories]
 
-    if event_data.get('event_type') == "온라인 콘텐츠" and "미디어" not in default_categories:
+    if event_data.event_type == "온라인 콘텐츠" and "미디어" not in default_categories:
         default_categories.append("미디어")
         st.info("온라인 콘텐츠 프로젝트를 위해 '미디어' 카테고리가 자동으로 추가되었습니다.")
-    elif event_data.get('venue_type') == "온라인" and "미디어" not in default_categories:
+    elif event_data.venue_type == "온라인" and "미디어" not in default_categories:
         default_categories.append("미디어")
         st.info("온라인 이벤트를 위해 '미디어' 카테고리가 자동으로 추가되었습니다.")
 
@@ -648,24 +753,24 @@ def select_categories_with_icons(event_data: Dict[str, Any]) -> List[str]:
 
     return selected_categories
 
-def handle_category(category: str, event_data: Dict[str, Any]) -> None:
+def handle_category(category: str, event_data: Event) -> None:
     st.subheader(category)
-    component = event_data['components'].get(category, {})
+    component = event_data.components.get(category) or Component()
 
-    component['status'] = render_option_menu(
+    component.status = render_option_menu(
         f"{category} 진행 상황",
         event_options.STATUS_OPTIONS,
         f"{category}_status"
     )
 
-    component['items'] = st.multiselect(
+    component.items = st.multiselect(
         f"{category} 항목 선택",
         event_options.CATEGORIES.get(category, []) + ["기타"],
-        default=component.get('items', []),
+        default=component.items,
         key=f"{category}_items"
     )
 
-    component['budget'] = st.number_input(f"{category} 예산 (원)", min_value=0, value=component.get('budget', 0), key=f"{category}_budget")
+    component.budget = st.number_input(f"{category} 예산 (원)", min_value=0, value=component.budget, key=f"{category}_budget")
 
     shooting_date_status = render_option_menu(
         "촬영일이 정해졌나요?",
@@ -677,30 +782,28 @@ def handle_category(category: str, event_data: Dict[str, Any]) -> None:
 
     col1, col2 = st.columns(2)
     with col1:
-        component['shooting_start_date'] = st.date_input(
+        component.shooting_start_date = st.date_input(
             "촬영 시작일",
             min_value=date.today(),
             key=f"{category}_shooting_start_date"
         )
     with col2:
-        component['shooting_end_date'] = st.date_input(
+        component.shooting_end_date = st.date_input(
             "촬영 마감일",
-            min_value=component['shooting_start_date'],
+            min_value=component.shooting_start_date,
             key=f"{category}_shooting_end_date"
         )
 
-    component['delivery_dates'] = component.get('delivery_dates', [{}])
-    
-    for idx, delivery in enumerate(component['delivery_dates']):
+    for idx, delivery in enumerate(component.delivery_dates):
         st.subheader(f"납품일 {idx + 1}")
         
-        delivery['status'] = render_option_menu(
+        delivery.status = render_option_menu(
             "납품일이 정해졌나요?",
             ["정해짐", "미정"],
             f"{category}_delivery_status_{idx}"
         )
 
-        if delivery['status'] == "정해짐":
+        if delivery.status == "정해짐":
             delivery_type = render_option_menu(
                 "납품 방식을 선택해주세요",
                 ["기간", "지정일"],
@@ -710,90 +813,90 @@ def handle_category(category: str, event_data: Dict[str, Any]) -> None:
             if delivery_type == "기간":
                 col1, col2 = st.columns(2)
                 with col1:
-                    delivery['start_date'] = st.date_input(
+                    delivery.start_date = st.date_input(
                         "납품 시작일",
-                        min_value=component['shooting_start_date'],
+                        min_value=component.shooting_start_date,
                         key=f"{category}_delivery_start_date_{idx}"
                     )
                 with col2:
-                    delivery['end_date'] = st.date_input(
+                    delivery.end_date = st.date_input(
                         "납품 마감일",
-                        min_value=delivery['start_date'],
+                        min_value=delivery.start_date,
                         key=f"{category}_delivery_end_date_{idx}"
                     )
             else:
-                delivery['date'] = st.date_input(
+                delivery.date = st.date_input(
                     "납품일을 선택해주세요",
-                    min_value=component['shooting_start_date'],
+                    min_value=component.shooting_start_date,
                     key=f"{category}_delivery_date_{idx}"
                 )
         else:
-            delivery['date'] = None
+            delivery.date = None
 
-        delivery['items'] = {}
-        for item in component['items']:
+        delivery.items = {}
+        for item in component.items:
             quantity = st.number_input(
                 f"{item} 납품 수량",
                 min_value=0,
-                value=delivery['items'].get(item, 0),
+                value=delivery.items.get(item, 0),
                 key=f"{category}_delivery_item_{idx}_{item}"
             )
             if quantity > 0:
-                delivery['items'][item] = quantity
+                delivery.items[item] = quantity
 
-    if len(component['delivery_dates']) > 1 and st.button("납품일 삭제", key=f"{category}_remove_delivery_date"):
-        component['delivery_dates'].pop()
+    if len(component.delivery_dates) > 1 and st.button("납품일 삭제", key=f"{category}_remove_delivery_date"):
+        component.delivery_dates.pop()
 
     if st.button("납품일 추가", key=f"{category}_add_delivery_date"):
-        component['delivery_dates'].append({})
+        component.delivery_dates.append(Delivery())
 
     if category == "미디어":
-        component['reference_links'] = component.get('reference_links', [''])
-        for i, link in enumerate(component['reference_links']):
-            component['reference_links'][i] = st.text_input(f"레퍼런스 링크 {i+1} (필수)", value=link, key=f"{category}_reference_link_{i}")
+        for i, link in enumerate(component.reference_links):
+            component.reference_links[i] = st.text_input(f"레퍼런스 링크 {i+1} (필수)", value=link, key=f"{category}_reference_link_{i}")
         
         if st.button("레퍼런스 링크 추가", key=f"{category}_add_reference_link"):
-            component['reference_links'].append('')
+            component.reference_links.append('')
 
-        if len(component['reference_links']) > 1 and st.button("레퍼런스 링크 삭제", key=f"{category}_remove_reference_link"):
-            component['reference_links'].pop()
+        if len(component.reference_links) > 1 and st.button("레퍼런스 링크 삭제", key=f"{category}_remove_reference_link"):
+            component.reference_links.pop()
 
     cooperation_options = ["협력사 매칭 필요", "선호하는 업체 있음"]
-    component['cooperation_status'] = render_option_menu(
+    component.cooperation_status = render_option_menu(
         "협력사 상태",
         cooperation_options,
         f"{category}_cooperation_status"
     )
 
-    if component['cooperation_status'] == "선호하는 업체 있음":
+    if component.cooperation_status == "선호하는 업체 있음":
         handle_preferred_vendor(component, category)
     else:
-        component['preferred_vendor'] = False
-        component['vendor_reason'] = ''
-        component['vendor_name'] = ''
-        component['vendor_contact'] = ''
-        component['vendor_manager'] = ''
+        component.preferred_vendor = False
+        component.vendor_reason = ''
+        component.vendor_name = ''
+        component.vendor_contact = ''
+        component.vendor_manager = ''
 
-    for item in component['items']:
+    for item in component.items:
         if item == "기타":
             handle_other_items(component, category)
         else:
-            handle_item_details(item, component)
+            handle_item_details(item, component, category=category)
 
-    total_quantities = {item: 0 for item in component['items']}
-    for delivery in component['delivery_dates']:
-        for item, quantity in delivery['items'].items():
+    total_quantities = {item: 0 for item in component.items}
+    for delivery in component.delivery_dates:
+        for item, quantity in delivery.items.items():
             total_quantities[item] += quantity
 
     st.subheader("항목별 총 수량 검토")
-    for item in component['items']:
+    for item in component.items:
         col1, col2, col3 = st.columns(3)
         with col1:
             st.write(f"{item}:")
         with col2:
             st.write(f"총 납품 수량: {total_quantities[item]}")
         with col3:
-            expected_quantity = component.get(f'{item}_quantity', 0)
+            detail = component.item_details.get(item)
+            expected_quantity = detail.quantity if detail else 0
             st.write(f"예상 수량: {expected_quantity}")
         
         if total_quantities[item] != expected_quantity:
@@ -801,66 +904,80 @@ def handle_category(category: str, event_data: Dict[str, Any]) -> None:
         else:
             st.success(f"{item}의 총 납품 수량과 예상 수량이 일치합니다.")
 
-    event_data['components'][category] = component
+    event_data.components[category] = component
 
-def handle_preferred_vendor(component: Dict[str, Any], category: str) -> None:
-    component['vendor_reason'] = render_option_menu(
+def handle_preferred_vendor(component: Component, category: str) -> None:
+    component.vendor_reason = render_option_menu(
         "선호하는 이유를 선택해주세요:",
         config['VENDOR_REASON_OPTIONS'],
         f"{category}_vendor_reason"
     )
-    component['vendor_name'] = st.text_input("선호 업체 상호명", value=component.get('vendor_name', ''), key=f"{category}_vendor_name")
-    component['vendor_contact'] = st.text_input("선호 업체 연락처", value=component.get('vendor_contact', ''), key=f"{category}_vendor_contact")
-    component['vendor_manager'] = st.text_input("선호 업체 담당자명", value=component.get('vendor_manager', ''), key=f"{category}_vendor_manager")
-
-def handle_item_details(item: str, component: Dict[str, Any], item_name: str = None) -> None:
-    quantity_key = f'{item}_quantity'
-    unit_key = f'{item}_unit'
-    duration_key = f'{item}_duration'
-    duration_unit_key = f'{item}_duration_unit'
-    details_key = f'{item}_details'
-
+    component.vendor_name = st.text_input("선호 업체 상호명", value=component.vendor_name, key=f"{category}_vendor_name")
+
+    # 등록된 업체 중 비슷한 이름이 있으면 선택해서 연락처/담당자를 채움
+    matches = search_vendors(component.vendor_name)
+    if matches:
+        labels = ["직접 입력"] + [f"{v['name']} ({v['phone'] or '연락처 없음'})" for v in matches]
+        choice = st.selectbox("등록된 업체", range(len(labels)), format_func=labels.__getitem__, key=f"{category}_vendor_match")
+        if choice:
+            vendor = matches[choice - 1]
+            component.vendor_name = vendor['name']
+            if st.session_state.get(f"{category}_vendor_applied") != vendor['id']:
+                st.session_state[f"{category}_vendor_applied"] = vendor['id']
+                st.session_state[f"{category}_vendor_contact"] = vendor['phone']
+                st.session_state[f"{category}_vendor_manager"] = vendor['manager']
+
+    component.vendor_contact = st.text_input("선호 업체 연락처", value=component.vendor_contact, key=f"{category}_vendor_contact")
+    component.vendor_manager = st.text_input("선호 업체 담당자명", value=component.vendor_manager, key=f"{category}_vendor_manager")
+
+def handle_item_details(item: str, component: Component, item_name: str = None, category: str = None) -> None:
+    detail = component.item(item)
     display_name = item_name if item_name else item
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        component[quantity_key] = st.number_input(f"{display_name} 수량", min_value=0, value=component.get(quantity_key, 0), key=quantity_key)
+        detail.quantity = st.number_input(f"{display_name} 수량", min_value=0, value=detail.quantity, key=f'{item}_quantity')
 
     with col2:
-        component[unit_key] = st.text_input(f"{display_name} 단위", value=component.get(unit_key, '개'), key=unit_key)
+        detail.unit = st.text_input(f"{display_name} 단위", value=detail.unit, key=f'{item}_unit')
 
     with col3:
-        component[duration_key] = st.number_input(f"{display_name} 기간", min_value=0, value=component.get(duration_key, 0), key=duration_key)
+        detail.duration = st.number_input(f"{display_name} 기간", min_value=0, value=detail.duration, key=f'{item}_duration')
 
     with col4:
-        component[duration_unit_key] = st.text_input(f"{display_name} 기간 단위", value=component.get(duration_unit_key, '개월'), key=duration_unit_key)
+        detail.duration_unit = st.text_input(f"{display_name} 기간 단위", value=detail.duration_unit, key=f'{item}_duration_unit')
 
-    component[details_key] = st.text_area(f"{display_name} 세부사항", value=component.get(details_key, ''), key=details_key)
+    suggestion = suggest_item_price(display_name, category or '')
+    if suggestion:
+        basis = "같은 항목" if suggestion['scope'] == 'item' else f"'{category}' 대분류"
+        estimate = suggestion['p50'] * detail.quantity * max(detail.duration, 1)
+        st.caption(f"과거 단가({basis} {suggestion['count']:,}건): 중앙값 {format_currency(suggestion['p50'])} 원 "
+                   f"(25~75%: {format_currency(suggestion['p25'])} ~ {format_currency(suggestion['p75'])} 원) · "
+                   f"예상 금액(수량 × 기간) {format_currency(estimate)} 원")
 
-def handle_other_items(component: Dict[str, Any], category: str) -> None:
-    if 'other_items' not in component:
-        component['other_items'] = []
+    detail.details = st.text_area(f"{display_name} 세부사항", value=detail.details, key=f'{item}_details')
 
+def handle_other_items(component: Component, category: str) -> None:
     rerun_needed = False  # rerun이 필요한지 여부를 추적
 
-    for i, other_item in enumerate(component['other_items']):
+    for i, other_item in enumerate(component.other_items):
         col1, col2 = st.columns([3, 1])
         with col1:
             new_value = st.text_input(f"{category} 기타 항목 {i+1}", value=other_item, key=f"{category}_other_item_{i}")
-            component['other_items'][i] = new_value
+            component.other_items[i] = new_value
         with col2:
             if st.button(f"삭제 {i+1}", key=f"{category}_delete_other_item_{i}"):
-                component['other_items'].pop(i)
+                component.other_items.pop(i)
                 rerun_needed = True  # rerun이 필요함을 표시
 
     if st.button(f"{category} 기타 항목 추가", key=f"{category}_add_other_item"):
-        component['other_items'].append('')
+        component.other_items.append('')
         rerun_needed = True  # rerun이 필요함을 표시
 
-    for i, other_item in enumerate(component['other_items']):
+    for i, other_item in enumerate(component.other_items):
         if other_item:  # 빈 문자열이 아닌 경우에만 처리
-            handle_item_details(f"기타_{i+1}", component, item_name=other_item)
+            handle_item_details(f"기타_{i+1}", component, item_name=other_item, category=category)
 
     if rerun_needed:
         st.experimental_rerun()  # rerun이 필요한 경우에만 호출
@@ -876,323 +993,386 @@ def safe_operation(func):
             return None
     return wrapper
 
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# 엑셀 생성 진행 중일 때 다시 실행하기까지 기다리는 시간 (초)
+EXPORT_POLL_SECONDS = 1
+
+# 내보내기 워커가 실행하는 엑셀 생성 (Streamlit 화면 요소를 사용하지 않음)
+def render_export_files(document: Dict[str, Any], report) -> List[Tuple[str, str, bytes]]:
+    event_data = event_from_dict(document)
+    event_name = event_data.event_name or '무제'
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    targets = [("전체 행사 요약 정의서", f"이벤트_기획_정의서_{event_name}_{timestamp}.xlsx", None)]
+    targets.extend((f"{category} 발주요청서", f"발주요청서_{category}_{event_name}_{timestamp}.xlsx", category)
+                   for category in event_data.components)
+
+    files = []
+    with tempfile.TemporaryDirectory(prefix='dnmd_export_') as workdir:
+        for i, (label, filename, category) in enumerate(targets):
+            report(i / len(targets), f"{label} 생성 중")
+            path = os.path.join(workdir, filename)
+            # 템플릿을 직접 렌더링해 오류가 그대로 작업 실패 메시지로 기록되도록 함 (safe_operation 거치지 않음)
+            if category is None:
+                SUMMARY_TEMPLATE.render(path, event=event_data)
+            else:
+                CATEGORY_TEMPLATE.render(path, event=event_data, category=category,
+                                         component=event_data.components[category])
+            with open(path, "rb") as file:
+                files.append((label, filename, file.read()))
+    return files
+
+# 서버 프로세스당 하나의 워커 풀
+@st.cache_resource
+def get_export_pool() -> ExportWorkerPool:
+    pool = ExportWorkerPool(EVENT_DB_PATH, render_export_files, workers=config['EXPORT_WORKERS'],
+                            ttl=config['EXPORT_RESULT_TTL_HOURS'] * 3600)
+    pool.start()
+    return pool
+
+def display_export_downloads(conn, job_id: int, key_prefix: str) -> None:
+    for i, (label, filename, data) in enumerate(get_job_files(conn, job_id)):
+        st.download_button(label=f"{label} 다운로드", data=data, file_name=filename, mime=XLSX_MIME,
+                           key=f"{key_prefix}_{job_id}_{i}")
+
 @safe_operation
 def generate_summary_excel() -> None:
     event_data = st.session_state.event_data
-    event_name = event_data.get('event_name', '무제')
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    summary_filename = f"이벤트_기획_정의서_{event_name}_{timestamp}.xlsx"
 
-    try:
-        create_excel_summary(event_data, summary_filename)
-        st.success(f"엑셀 정의서가 성공적으로 생성되었습니다: {summary_filename}")
-
-        with open(summary_filename, "rb") as file:
-            st.download_button(label="전체 행사 요약 정의서 다운로드", data=file, file_name=summary_filename, mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-
-        for category, component in event_data.get('components', {}).items():
-            category_filename = f"발주요청서_{category}_{event_name}_{timestamp}.xlsx"
-            create_category_excel(event_data, category, component, category_filename)
-            try:
-                with open(category_filename, "rb") as file:
-                    st.download_button(label=f"{category} 발주요청서 다운로드", data=file, file_name=category_filename, mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", key=f"download_{category}")
-            except FileNotFoundError:
-                st.error(f"{category_filename} 파일을 찾을 수 없습니다.")
+    # 엑셀 생성은 워커가 처리하고, 같은 내용이면 이전에 만든 결과를 그대로 사용
+    # 저장/제출은 문서가 바뀌었을 때만 하고, 진행 상황을 확인하는 재실행에서는 작업 상태만 읽음
+    retry = st.session_state.pop('export_retry', False)
+    submitted = st.session_state.get('export_job')
+    if retry or not submitted or submitted[0] != job_key(event_to_dict(event_data)):
+        save_event_data(event_data)
+        document = event_to_dict(event_data)
+        with get_db_connection() as conn:
+            st.session_state.export_job = (job_key(document), submit_export(conn, document, event_data.id, retry=retry))
+        get_export_pool().notify()
+    job_id = st.session_state.export_job[1]
 
-    except Exception as e:
-        st.error(f"엑셀 파일 생성 중 오류가 발생했습니다: {str(e)}")
-        st.error("오류 상세 정보:")
-        st.exception(e)
+    with get_db_connection() as conn:
+        # 실행마다 상태를 한 번만 그림 (진행 중이면 아래에서 잠시 후 다시 실행)
+        job = get_job(conn, job_id)
+        if job is None:
+            # 보관 기간이 지나 정리된 작업이면 다시 제출
+            del st.session_state.export_job
+            st.rerun()
+        finished = job['status'] in (STATUS_DONE, STATUS_FAILED)
+        if job['status'] == STATUS_DONE:
+            st.success("엑셀 정의서가 생성되었습니다.")
+            display_export_downloads(conn, job_id, "download")
+        elif job['status'] == STATUS_FAILED:
+            st.error(f"엑셀 파일 생성 중 오류가 발생했습니다: {job['message']}")
+            if st.button("다시 시도", key="export_retry_button"):
+                st.session_state.export_retry = True
+                st.rerun()
+        else:
+            st.progress(job['progress'], text=job['message'] or "엑셀 생성 대기 중")
+            st.info("엑셀 파일을 생성하고 있습니다. 다른 단계로 이동했다가 돌아와도 이어서 확인할 수 있습니다.")
+
+        previous = [j for j in list_event_exports(conn, event_data.id) if j['id'] != job_id]
+        if previous:
+            with st.expander("이전에 생성한 정의서"):
+                for j in previous:
+                    st.caption(datetime.fromtimestamp(j['finished_at']).strftime('%Y-%m-%d %H:%M:%S'))
+                    display_export_downloads(conn, j['id'], "previous")
+
+    # 스크립트 스레드를 오래 붙잡지 않도록 짧게 쉬고 다시 실행해 진행 상황을 갱신
+    if not finished:
+        time.sleep(EXPORT_POLL_SECONDS)
+        st.rerun()
+
+# 엑셀 문서 템플릿 (레이아웃은 excel_templates의 블록으로 선언하고 모듈 로드 시 한 번 컴파일)
+RECIPIENT_TEXT = '◎ 받는 곳 : ㈜디노마드 / 서울시 영등포구 여의대로 108 파크원타워 2, 21층'
+REQUEST_TEXT = '아래 사항에 대하여 귀사의 견적을 요청하오니 견적서를 제출하여 주시기 바라며,\n견적서 제출 후 계약을 진행하여 주시기 바랍니다.'
+
+def document_header(title) -> List[excel_templates.Block]:
+    return [
+        excel_templates.text(title, excel_templates.TITLE),
+        excel_templates.blank(),
+        excel_templates.text(RECIPIENT_TEXT),
+        excel_templates.blank(),
+        excel_templates.text(REQUEST_TEXT),
+        excel_templates.blank(),
+    ]
 
-@safe_operation
-def create_excel_summary(event_data: Dict[str, Any], filename: str) -> None:
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "전체 용역 정의서"
-
-    # 제목
-    ws.merge_cells('A1:H1')
-    ws['A1'] = '전체 용역 정의서'
-    ws['A1'].font = Font(bold=True, size=14)
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-
-    # 받는 곳
-    ws.merge_cells('A3:H3')
-    ws['A3'] = '◎ 받는 곳 : ㈜디노마드 / 서울시 영등포구 여의대로 108 파크원타워 2, 21층'
-    ws['A3'].alignment = Alignment(horizontal='left')
-
-    # 발주 요청 사항
-    ws.merge_cells('A5:H5')
-    ws['A5'] = '아래 사항에 대하여 귀사의 견적을 요청하오니 견적서를 제출하여 주시기 바라며,\n견적서 제출 후 계약을 진행하여 주시기 바랍니다.'
-    ws['A5'].alignment = Alignment(horizontal='left')
-
-    # 프로젝트 정보
-    project_info = [
-        ('프로젝트명', event_data.get('event_name', ''), '용역유형', event_data.get('event_type', '')),
-        ('고객사', event_data.get('client_name', ''), '담당 PM', f"{event_data.get('manager_name', '')} ({event_data.get('manager_position', '')})"),
-        ('담당 PM 연락처', event_data.get('manager_contact', ''), '용역 종류', event_data.get('contract_type', '')),
-        ('예상 참여 관객 수', str(event_data.get('scale', '')), '셋업 시작', str(event_data.get('setup_date', ''))),
-        ('철수 마감', str(event_data.get('teardown_date', '')), '용역 시작일', str(event_data.get('start_date', ''))),
-        ('용역 마감일', str(event_data.get('end_date', '')), '총 계약 금액', f"{format_currency(event_data.get('contract_amount', 0))} 원"),
-        ('수익률 / 수익 금액', f"{event_data.get('expected_profit_percentage', 0)}% / {format_currency(event_data.get('expected_profit', 0))} 원", '부가세 포함 여부', '포함' if event_data.get('vat_included', False) else '미포함'),
+def project_info_rows(event_data: Event, detailed: bool) -> List[Tuple[str, str, str, str]]:
+    # detailed: 전체 정의서용 (부가세 여부와 이벤트 유형별 장소/플랫폼 정보 포함)
+    rows = [
+        ('프로젝트명', event_data.event_name, '용역유형', event_data.event_type),
+        ('고객사', event_data.client_name, '담당 PM', f"{event_data.manager_name} ({event_data.manager_position})"),
+        ('담당 PM 연락처', event_data.manager_contact, '용역 종류', event_data.contract_type),
+        ('예상 참여 관객 수', str(event_data.scale), '셋업 시작', str(event_data.setup_date or '')),
+        ('철수 마감', str(event_data.teardown_date or ''), '용역 시작일', str(event_data.start_date or '')),
+        ('용역 마감일', str(event_data.end_date or ''), '총 계약 금액', f"{format_currency(event_data.contract_amount)} 원"),
+        ('수익률 / 수익 금액', f"{event_data.expected_profit_percentage}% / {format_currency(event_data.expected_profit)} 원",
+         *(('부가세 포함 여부', '포함' if event_data.vat_included else '미포함') if detailed else ('', ''))),
     ]
+    if not detailed:
+        return rows
 
     # 이벤트 유형에 따른 추가 정보
-    if event_data.get('event_type') == "오프라인 이벤트":
-        project_info.extend([
-            ('장소', ', '.join([v.get('name', '') for v in event_data.get('venues', [])]), '장소 상태', event_data.get('venue_status', '')),
-            ('주소', ', '.join([v.get('address', '') for v in event_data.get('venues', [])]), '', '')
+    if event_data.event_type == "오프라인 이벤트":
+        rows.extend([
+            ('장소', ', '.join([v.name for v in event_data.venues]), '장소 상태', event_data.venue_status),
+            ('주소', ', '.join([v.address for v in event_data.venues]), '', '')
         ])
-    elif event_data.get('event_type') == "온라인 콘텐츠":
-        project_info.extend([
-            ('플랫폼', event_data.get('online_platform', ''), '스트리밍 방식', event_data.get('streaming_method', '')),
-            ('촬영 로케이션', event_data.get('location_name', ''), '로케이션 상태', event_data.get('location_status', ''))
+    elif event_data.event_type == "온라인 콘텐츠":
+        rows.extend([
+            ('플랫폼', event_data.online_platform, '스트리밍 방식', event_data.streaming_method),
+            ('촬영 로케이션', event_data.location_name, '로케이션 상태', event_data.location_status)
         ])
+    return rows
+
+def summary_item_rows(ctx) -> List[list]:
+    rows = []
+    for category, component in ctx['event'].components.items():
+        for item in component.items:
+            detail = component.item_details.get(item) or Item()
+            rows.append([len(rows) + 1, category, item, detail.details, detail.quantity, detail.unit,
+                         detail.duration, detail.duration_unit, component.budget, component.vendor_name,
+                         component.vendor_contact, ''])
+    return rows
+
+def media_delivery_rows(ctx) -> List[Optional[tuple]]:
+    rows = []
+    for idx, delivery in enumerate(ctx['media'].delivery_dates, 1):
+        rows.append((f"납품일 {idx}", str(delivery.date) if delivery.date else '미정'))
+        rows.append(("항목", "수량"))
+        rows.extend(delivery.items.items())
+        rows.append(None)
+    return rows
+
+def shooting_line(component: Component) -> str:
+    if component.shooting_date:
+        return f"촬영일: {component.shooting_date}"
+    return f"촬영 가능 기간: {component.shooting_start_date} ~ {component.shooting_end_date}"
+
+def category_delivery_lines(ctx) -> List[str]:
+    lines = []
+    for delivery in ctx['component'].delivery_dates:
+        if delivery.status == "정해짐" and delivery.date:
+            lines.append(f"납품일: {delivery.date}")
+        elif delivery.status == "정해짐":
+            lines.append(f"납품 기간: {delivery.start_date} ~ {delivery.end_date}")
+        else:
+            lines.append("납품일: 미정")
+        lines.append("납품 항목:")
+        lines.extend(f"- {item}: {quantity}개" for item, quantity in delivery.items.items())
+    return lines
+
+def category_item_rows(ctx) -> List[list]:
+    component = ctx['component']
+    rows = []
+    for item in component.items:
+        detail = component.item_details.get(item) or Item()
+        rows.append([len(rows) + 1, item, detail.details, detail.quantity, detail.unit,
+                     detail.duration, detail.duration_unit, ''])
+    return rows
+
+SUMMARY_TEMPLATE = excel_templates.compile_template(excel_templates.Template(
+    sheet_title="전체 용역 정의서",
+    blocks=[
+        *document_header('전체 용역 정의서'),
+        excel_templates.grid(lambda ctx: project_info_rows(ctx['event'], detailed=True)),
+        excel_templates.table(['번호', '카테고리', '아이템명', '상세 설명', '수량', '단위', '기간', '기간 단위', '예산', '협력사', '협력사 연락처', '비고'],
+                              summary_item_rows),
+    ],
+    column_widths={col: 20 for col in 'ABCDEFGHIJKL'},
+))
+
+MEDIA_TEMPLATE = excel_templates.compile_template(excel_templates.Template(
+    sheet_title="미디어 발주 요약",
+    blocks=[
+        excel_templates.text("미디어 발주 요약서", excel_templates.LARGE_TITLE, span=7),
+        excel_templates.blank(),
+        excel_templates.pairs(lambda ctx: [
+            ('프로젝트명', ctx['event'].event_name),
+            ('클라이언트', ctx['event'].client_name),
+            ('담당 PM', ctx['event'].manager_name),
+            ('연락처', ctx['event'].manager_contact),
+        ]),
+        excel_templates.blank(),
+        excel_templates.text("촬영 정보", excel_templates.BOLD, span=1),
+        excel_templates.pairs(lambda ctx: [
+            ("촬영일", str(ctx['media'].shooting_date)) if ctx['media'].shooting_date else
+            ("촬영 기간", f"{ctx['media'].shooting_start_date or ''} ~ {ctx['media'].shooting_end_date or ''}")
+        ]),
+        excel_templates.blank(),
+        excel_templates.text("납품 정보", excel_templates.BOLD, span=1),
+        excel_templates.pairs(media_delivery_rows),
+    ],
+    column_widths={col: 20 for col in 'ABCDEFG'},
+))
+
+CATEGORY_TEMPLATE = excel_templates.compile_template(excel_templates.Template(
+    sheet_title=lambda ctx: sanitize_sheet_title(ctx['category']),
+    blocks=[
+        *document_header(lambda ctx: f"{ctx['category']} 발주요청서"),
+        excel_templates.grid(lambda ctx: project_info_rows(ctx['event'], detailed=False)),
+        excel_templates.blank(),
+        excel_templates.text('촬영일 정보', excel_templates.SECTION),
+        excel_templates.text(lambda ctx: shooting_line(ctx['component']), None),
+        excel_templates.blank(),
+        excel_templates.text('납품일 정보', excel_templates.SECTION),
+        excel_templates.lines(category_delivery_lines),
+        excel_templates.blank(),
+        excel_templates.table(['번호', '아이템명', '상세 설명', '수량', '단위', '기간', '기간 단위', '비고'],
+                              category_item_rows),
+    ],
+    auto_size='ABCDEFGH',
+))
 
-    row = 7
-    for item in project_info:
-        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-        ws['A' + str(row)] = item[0]
-        ws['A' + str(row)].alignment = Alignment(horizontal='left', vertical='center')
-
-        ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=4)
-        ws['C' + str(row)] = item[1]
-        ws['C' + str(row)].alignment = Alignment(horizontal='left', vertical='center')
-
-        ws.merge_cells(start_row=row, start_column=5, end_row=row, end_column=6)
-        ws['E' + str(row)] = item[2]
-        ws['E' + str(row)].alignment = Alignment(horizontal='left', vertical='center')
-
-        ws.merge_cells(start_row=row, start_column=7, end_row=row, end_column=8)
-        ws['G' + str(row)] = item[3]
-        ws['G' + str(row)].alignment = Alignment(horizontal='left', vertical='center')
-
-        row += 1
-
-    # 구성 요소 헤더
-    headers = ['번호', '카테고리', '아이템명', '상세 설명', '수량', '단위', '기간', '기간 단위', '예산', '협력사', '협력사 연락처', '비고']
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col_num)
-        cell.value = header
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-
-    # 아이템 목록
-    item_number = 1
-    for category, component in event_data.get('components', {}).items():
-        for item in component.get('items', []):
-            ws.append([
-                item_number,
-                category,
-                item,
-                component.get(f'{item}_details', ''),
-                component.get(f'{item}_quantity', 0),
-                component.get(f'{item}_unit', '개'),
-                component.get(f'{item}_duration', 0),
-                component.get(f'{item}_duration_unit', '개월'),
-                component.get('budget', 0),
-                component.get('vendor_name', ''),
-                component.get('vendor_contact', ''),
-                ''
-            ])
-            item_number += 1
-
-    # 열 너비 설정
-    for col in ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L']:
-        ws.column_dimensions[col].width = 20
-
-    wb.save(filename)
-
-def create_media_summary(event_data: Dict[str, Any], filename: str) -> None:
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "미디어 발주 요약"
-
-    # 기본 정보
-    ws['A1'] = "미디어 발주 요약서"
-    ws['A1'].font = Font(size=16, bold=True)
-    ws.merge_cells('A1:G1')
-
-    basic_info = [
-        ('프로젝트명', event_data.get('event_name', '')),
-        ('클라이언트', event_data.get('client_name', '')),
-        ('담당 PM', event_data.get('manager_name', '')),
-        ('연락처', event_data.get('manager_contact', ''))
-    ]
+@safe_operation
+def create_excel_summary(event_data: Event, filename: str) -> None:
+    SUMMARY_TEMPLATE.render(filename, event=event_data)
 
-    for row, (key, value) in enumerate(basic_info, start=3):
-        ws[f'A{row}'] = key
-        ws[f'B{row}'] = value
+def create_media_summary(event_data: Event, filename: str) -> None:
+    media_component = event_data.components.get('Media') or Component(delivery_dates=[])
+    MEDIA_TEMPLATE.render(filename, event=event_data, media=media_component)
 
-    # 미디어 정보
-    media_component = event_data.get('components', {}).get('Media', {})
-    
-    row = 8
-    ws[f'A{row}'] = "촬영 정보"
-    ws[f'A{row}'].font = Font(bold=True)
-    row += 1
-
-    if media_component.get('shooting_date'):
-        ws[f'A{row}'] = "촬영일"
-        ws[f'B{row}'] = str(media_component['shooting_date'])
+@safe_operation
+def create_category_excel(event_data: Event, category: str, component: Component, filename: str) -> None:
+    CATEGORY_TEMPLATE.render(filename, event=event_data, category=category, component=component)
+
+def sanitize_sheet_title(title: str) -> str:
+    invalid_chars = ['\\', '/', '*', '[', ']', ':', '?']
+    for char in invalid_chars:
+        title = title.replace(char, '')
+    return title
+
+# 포트폴리오 대시보드 (이벤트 문서 대신 집계 테이블만 조회)
+def portfolio_dashboard() -> None:
+    st.header("포트폴리오")
+
+    group_labels = {'client_name': '고객사', 'month': '월', 'event_type': '용역 유형'}
+
+    with get_db_connection() as conn:
+        clients = dimension_values(conn, 'client_name')
+        if not clients:
+            st.info("저장된 이벤트가 없습니다.")
+            return
+        months = dimension_values(conn, 'month')
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            selected_clients = st.multiselect("고객사", clients, key="portfolio_clients")
+        with col2:
+            selected_types = st.multiselect("용역 유형", dimension_values(conn, 'event_type'), key="portfolio_event_types")
+        with col3:
+            month_range = st.select_slider("기간", options=months, value=(months[0], months[-1]), key="portfolio_months") if len(months) > 1 else None
+
+        group_by = st.radio("집계 기준", list(group_labels), format_func=group_labels.get, horizontal=True, key="portfolio_group_by")
+
+        totals = query_totals(conn, group_by, selected_clients, selected_types, month_range)
+        budgets = query_category_budgets(conn, group_by, selected_clients, selected_types, month_range)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("이벤트 수", f"{int(totals['event_count'].sum()):,}")
+    col2.metric("총 계약 금액", f"{format_currency(totals['contract_amount'].sum())} 원")
+    col3.metric("총 예상 수익", f"{format_currency(totals['expected_profit'].sum())} 원")
+
+    totals = totals.rename(columns={group_by: group_labels[group_by], 'event_count': '이벤트 수',
+                                    'contract_amount': '계약 금액', 'expected_profit': '예상 수익'})
+    st.dataframe(
+        totals,
+        column_config={
+            "계약 금액": st.column_config.NumberColumn(format="₩%d"),
+            "예상 수익": st.column_config.NumberColumn(format="₩%d"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    st.bar_chart(totals.set_index(group_labels[group_by])[['계약 금액', '예상 수익']])
+
+    st.subheader("카테고리별 예산")
+    if budgets.empty:
+        st.info("카테고리 예산이 없습니다.")
     else:
-        ws[f'A{row}'] = "촬영 기간"
-        ws[f'B{row}'] = f"{media_component.get('shooting_start_date', '')} ~ {media_component.get('shooting_end_date', '')}"
-    
-    row += 2
-    ws[f'A{row}'] = "납품 정보"
-    ws[f'A{row}'].font = Font(bold=True)
-    row += 1
-
-    for idx, delivery in enumerate(media_component.get('delivery_dates', []), 1):
-        ws[f'A{row}'] = f"납품일 {idx}"
-        ws[f'B{row}'] = str(delivery['date']) if delivery['date'] else '미정'
-        row += 1
-        
-        ws[f'A{row}'] = "항목"
-        ws[f'B{row}'] = "수량"
-        row += 1
-        
-        for item, quantity in delivery['items'].items():
-            ws[f'A{row}'] = item
-            ws[f'B{row}'] = quantity
-            row += 1
-        
-        row += 1
+        st.dataframe(budgets, use_container_width=True)
 
-    # 스타일 적용
-    for col in ['A', 'B', 'C', 'D', 'E', 'F', 'G']:
-        ws.column_dimensions[col].width = 20
+# 인력/장비 일별 수요와 보유 한도 초과 확인
+def capacity_planner() -> None:
+    st.header("인력/장비 수요")
 
-    wb.save(filename)
+    col1, col2 = st.columns(2)
+    with col1:
+        period = st.date_input("기간", value=(date.today(), date.today() + timedelta(days=89)), key="capacity_period")
+    with col2:
+        categories = st.multiselect("카테고리", CAPACITY_CATEGORIES, default=list(CAPACITY_CATEGORIES), key="capacity_categories")
 
-@safe_operation
-def create_category_excel(event_data: Dict[str, Any], category: str, component: Dict[str, Any], filename: str) -> None:
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = sanitize_sheet_title(category)
-
-    # 제목
-    ws.merge_cells('A1:H1')
-    ws['A1'] = f'{category} 발주요청서'
-    ws['A1'].font = Font(bold=True, size=14)
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-
-    # 받는 곳
-    ws.merge_cells('A3:H3')
-    ws['A3'] = '◎ 받는 곳 : ㈜디노마드 / 서울시 영등포구 여의대로 108 파크원타워 2, 21층'
-    ws['A3'].alignment = Alignment(horizontal='left')
-
-    # 발주 요청 사항
-    ws.merge_cells('A5:H5')
-    ws['A5'] = '아래 사항에 대하여 귀사의 견적을 요청하오니 견적서를 제출하여 주시기 바라며,\n견적서 제출 후 계약을 진행하여 주시기 바랍니다.'
-    ws['A5'].alignment = Alignment(horizontal='left')
-
-# 프로젝트 정보
-    project_info = [
-        ('프로젝트명', event_data.get('event_name', ''), '용역유형', event_data.get('event_type', '')),
-        ('고객사', event_data.get('client_name', ''), '담당 PM', f"{event_data.get('manager_name', '')} ({event_data.get('manager_position', '')})"),
-        ('담당 PM 연락처', event_data.get('manager_contact', ''), '용역 종류', event_data.get('contract_type', '')),
-        ('예상 참여 관객 수', str(event_data.get('scale', '')), '셋업 시작', str(event_data.get('setup_date', ''))),
-        ('철수 마감', str(event_data.get('teardown_date', '')), '용역 시작일', str(event_data.get('start_date', ''))),
-        ('용역 마감일', str(event_data.get('end_date', '')), '총 계약 금액', f"{format_currency(event_data.get('contract_amount', 0))} 원"),
-        ('수익률 / 수익 금액', f"{event_data.get('expected_profit_percentage', 0)}% / {format_currency(event_data.get('expected_profit', 0))} 원", '', ''),
-    ]
+    if not isinstance(period, tuple) or len(period) != 2 or not categories:
+        st.info("기간(시작일과 종료일)과 카테고리를 선택하세요.")
+        return
 
-    row = 7
-    for item in project_info:
-        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-        ws['A' + str(row)] = item[0]
-        ws['A' + str(row)].alignment = Alignment(horizontal='left', vertical='center')
-
-        ws.merge_cells(start_row=row, start_column=3, end_row=row, end_column=4)
-        ws['C' + str(row)] = item[1]
-        ws['C' + str(row)].alignment = Alignment(horizontal='left', vertical='center')
-
-        ws.merge_cells(start_row=row, start_column=5, end_row=row, end_column=6)
-        ws['E' + str(row)] = item[2]
-        ws['E' + str(row)].alignment = Alignment(horizontal='left', vertical='center')
-
-        ws.merge_cells(start_row=row, start_column=7, end_row=row, end_column=8)
-        ws['G' + str(row)] = item[3]
-        ws['G' + str(row)].alignment = Alignment(horizontal='left', vertical='center')
-
-        row += 1
-
-    # 촬영일 정보
-    row += 1
-    ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=8)
-    ws['A' + str(row)] = '촬영일 정보'
-    ws['A' + str(row)].font = Font(bold=True)
-    ws['A' + str(row)].alignment = Alignment(horizontal='left', vertical='center')
-
-    row += 1
-    if 'shooting_date' in component:
-        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=8)
-        ws['A' + str(row)] = f"촬영일: {component['shooting_date']}"
+    with get_db_connection() as conn:
+        demand = daily_demand(conn, period[0], period[1], categories)
+    if demand.columns.empty:
+        st.info("선택한 기간에 필요한 인력/장비가 없습니다.")
+        return
+
+    limits = config['CAPACITY_LIMITS']
+    over = over_commitment(demand, limits)
+    peaks = peak_days(demand)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("필요 항목 수", f"{len(demand.columns):,}")
+    col2.metric("한도 초과 항목", f"{len(over):,}")
+    col3.metric("최대 수요일", str(demand.sum(axis=1).idxmax().date()))
+
+    st.subheader("보유 한도 초과")
+    if over.empty:
+        st.success("보유 한도를 초과하는 항목이 없습니다.")
     else:
-        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=8)
-        ws['A' + str(row)] = f"촬영 가능 기간: {component['shooting_start_date']} ~ {component['shooting_end_date']}"
-
-    # 납품일 정보
-    row += 2
-    ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=8)
-    ws['A' + str(row)] = '납품일 정보'
-    ws['A' + str(row)].font = Font(bold=True)
-    ws['A' + str(row)].alignment = Alignment(horizontal='left', vertical='center')
-
-    for delivery in component.get('delivery_dates', []):
-        row += 1
-        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=8)
-        if delivery['status'] == "정해짐":
-            ws['A' + str(row)] = f"납품일: {delivery['date']}"
-        else:
-            ws['A' + str(row)] = "납품일: 미정"
-
-        row += 1
-        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=8)
-        ws['A' + str(row)] = "납품 항목:"
-        for item, quantity in delivery['items'].items():
-            row += 1
-            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=8)
-            ws['A' + str(row)] = f"- {item}: {quantity}개"
-
-    # 아이템 목록
-    row += 2
-    headers = ['번호', '아이템명', '상세 설명', '수량', '단위', '기간', '기간 단위', '비고']
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col_num)
-        cell.value = header
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-
-    item_number = 1
-    for item in component.get('items', []):
-        row += 1
-        ws.append([
-            item_number,
-            item,
-            component.get(f'{item}_details', ''),
-            component.get(f'{item}_quantity', 0),
-            component.get(f'{item}_unit', '개'),
-            component.get(f'{item}_duration', 0),
-            component.get(f'{item}_duration_unit', '개월'),
-            ''
-        ])
-        item_number += 1
+        st.dataframe(
+            over.rename(columns={'category': '카테고리', 'item': '항목', 'limit': '보유 한도', 'days_over': '초과 일수',
+                                 'first_day': '첫 초과일', 'max_excess': '최대 초과 수량'}),
+            hide_index=True,
+            use_container_width=True
+        )
 
-    for col in ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']:
-        ws.column_dimensions[col].auto_size = True
+    st.subheader("항목별 최대 수요")
+    peaks['limit'] = peaks['item'].map(limits)
+    st.dataframe(
+        peaks.rename(columns={'category': '카테고리', 'item': '항목', 'peak': '최대 수요', 'peak_day': '최대 수요일',
+                              'limit': '보유 한도'}),
+        hide_index=True,
+        use_container_width=True
+    )
 
-    wb.save(filename)
+    items = demand.columns.get_level_values('item')
+    default_items = list(dict.fromkeys(list(over['item']) or list(peaks['item'][:5])))
+    selected_items = st.multiselect("일별 수요 차트", sorted(set(items)), default=default_items, key="capacity_chart_items")
+    if selected_items:
+        st.line_chart(demand.T.groupby(level='item').sum().T[selected_items])
 
-def sanitize_sheet_title(title: str) -> str:
-    invalid_chars = ['\\', '/', '*', '[', ']', ':', '?']
-    for char in invalid_chars:
-        title = title.replace(char, '')
-    return title
+# 이벤트/예산 분석 스냅샷에 SQL 실행 (운영 DB 대신 Parquet 스냅샷을 DuckDB로 조회)
+ANALYTICS_DEFAULT_QUERY = """SELECT e.month, c.category, COUNT(*) AS events, SUM(c.budget) AS budget
+FROM components c JOIN events e USING (event_id)
+GROUP BY ALL ORDER BY e.month, c.category"""
+
+def analytics_console() -> None:
+    st.header("분석 쿼리")
+    st.caption(f"테이블: {', '.join(DATASETS)} · 조회(SELECT/WITH) 쿼리만 실행할 수 있습니다.")
+
+    if st.button("스냅샷 갱신", key="analytics_refresh"):
+        try:
+            counts = refresh_snapshot(ANALYTICS_SNAPSHOT_DIR, EVENT_DB_PATH, BUDGET_DB_PATH)
+            st.success("스냅샷을 갱신했습니다. (" + ", ".join(f"{source} {count}건" for source, count in counts.items()) + ")")
+        except Exception as e:
+            logging.error(f"Error refreshing analytics snapshot: {str(e)}")
+            st.error(f"스냅샷 갱신 중 오류가 발생했습니다: {str(e)}")
+
+    sql = st.text_area("SQL", value=ANALYTICS_DEFAULT_QUERY, height=150, key="analytics_sql")
+    if st.button("실행", key="analytics_run") and sql.strip():
+        started = time.perf_counter()
+        try:
+            result = run_query(ANALYTICS_SNAPSHOT_DIR, sql)
+        except Exception as e:
+            st.error(f"쿼리 실행 중 오류가 발생했습니다: {str(e)}")
+            return
+        st.caption(f"{len(result):,}행 · {(time.perf_counter() - started) * 1000:.0f} ms")
+        st.dataframe(result, hide_index=True, use_container_width=True)
 
 def check_required_fields(step):
     event_data = st.session_state.event_data
@@ -1201,36 +1381,36 @@ def check_required_fields(step):
     if step == 0:  # 기본 정보
         required_fields = ['event_name', 'client_name', 'manager_name', 'manager_contact', 'event_type', 'contract_type']
         for field in required_fields:
-            if not event_data.get(field):
+            if not getattr(event_data, field):
                 missing_fields.append(field)
 
     elif step == 1:  # 장소 정보
-        if event_data.get('event_type') != "온라인 콘텐츠":
-            if not event_data.get('venue_status'):
+        if event_data.event_type != "온라인 콘텐츠":
+            if not event_data.venue_status:
                 missing_fields.append('venue_status')
-            if not event_data.get('venue_type'):
+            if not event_data.venue_type:
                 missing_fields.append('venue_type')
-            if event_data.get('venue_type') != "온라인":
-                if not event_data.get('scale'):
+            if event_data.venue_type != "온라인":
+                if not event_data.scale:
                     missing_fields.append('scale')
-                for i, venue in enumerate(event_data.get('venues', [])):
-                    if not venue.get('name'):
+                for i, venue in enumerate(event_data.venues):
+                    if not venue.name:
                         missing_fields.append(f'venues[{i}].name')
-                    if not venue.get('address'):
+                    if not venue.address:
                         missing_fields.append(f'venues[{i}].address')
 
     elif step == 2:  # 용역 구성 요소
-        if not event_data.get('selected_categories'):
+        if not event_data.selected_categories:
             missing_fields.append('selected_categories')
         else:
-            for category in event_data.get('selected_categories', []):
-                if category not in event_data.get('components', {}):
+            for category in event_data.selected_categories:
+                if category not in event_data.components:
                     missing_fields.append(f'components.{category}')
                 else:
-                    component = event_data['components'][category]
-                    if not component.get('status'):
+                    component = event_data.components[category]
+                    if not component.status:
                         missing_fields.append(f'components.{category}.status')
-                    if not component.get('items'):
+                    if not component.items:
                         missing_fields.append(f'components.{category}.items')
 
     return len(missing_fields) == 0, missing_fields
@@ -1283,6 +1463,20 @@ def highlight_missing_fields(missing_fields):
             st.error(f"{field_names.get(field, field)} 항목을 입력해주세요.")
 
 def main():
+    menus.inject_styles()
+    with st.sidebar:
+        page = menus.menu("메뉴", ["이벤트 기획", "포트폴리오", "인력/장비 수요", "분석 쿼리"], icons=['calendar-event', 'bar-chart', 'people', 'terminal'], menu_icon="list", default_index=0, orientation='vertical')
+
+    if page == "포트폴리오":
+        portfolio_dashboard()
+        return
+    if page == "인력/장비 수요":
+        capacity_planner()
+        return
+    if page == "분석 쿼리":
+        analytics_console()
+        return
+
     st.title("이벤트 플래너")
 
     if 'current_event' not in st.session_state:
@@ -1290,11 +1484,16 @@ def main():
     if 'step' not in st.session_state:
         st.session_state.step = 0
     if 'event_data' not in st.session_state:
-        st.session_state.event_data = {}
-    if 'previous_button' not in st.session_state:
-        st.session_state.previous_button = False
-    if 'next_button' not in st.session_state:
-        st.session_state.next_button = False
+        st.session_state.event_data = Event()
+
+    # 선택 해제된 카테고리, 삭제된 납품일/기타 항목/장소의 위젯 키 정리
+    evicted = collect_garbage(st.session_state, st.session_state.event_data, event_options.CATEGORIES, ALL_ITEMS)
+    if config['SESSION_STATE_REPORT']:
+        report = state_report(st.session_state)
+        with st.sidebar.expander("세션 상태"):
+            st.write(f"키 {report['keys']}개 / {report['bytes'] / 1024:.1f}KB (이번 실행에서 {len(evicted)}개 정리)")
+            for key, size in report['largest']:
+                st.caption(f"{key}: {size / 1024:.1f}KB")
 
     functions = {
         0: basic_info,
@@ -1306,24 +1505,19 @@ def main():
     step_names = ["기본 정보", "장소 정보", "용역 구성 요소", "정의서 생성"]
 
     current_step = st.session_state.step
-    event_type = st.session_state.event_data.get('event_type')
+    event_type = st.session_state.event_data.event_type
 
     if event_type == "온라인 콘텐츠" and current_step == 1:
         current_step = 2
         st.session_state.step = 2
 
-    selected_step = option_menu(
+    selected_step = menus.menu(
         None,
         step_names,
         icons=['info-circle', 'geo-alt', 'list-task', 'file-earmark-spreadsheet'],
         default_index=current_step,
         orientation='horizontal',
-        styles={
-            "container": {"padding": "0!important", "background-color": "#e3f2fd"},
-            "icon": {"color": "#1976d2", "font-size": "25px"},
-            "nav-link": {"font-size": "16px", "text-align": "center", "margin":"0px", "--hover-color": "#bbdefb", "--icon-color": "#1976d2"},
-            "nav-link-selected": {"background-color": "#2196f3", "color": "white", "--icon-color": "white"},
-        },
+        style='steps',
     )
 
     if selected_step != step_names[current_step]:
@@ -0,0 +1,109 @@
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import streamlit as st
+from streamlit_option_menu import option_menu
+
+# 메뉴(옵션 선택) 렌더링 백엔드
+#
+# - component: streamlit_option_menu 커스텀 컴포넌트 (메뉴마다 iframe 하나)
+# - native: st.radio(horizontal) + CSS. 컴포넌트 왕복이 없어 카테고리/납품 일정이 많은 이벤트에서 재실행이 빠름
+#
+# 두 백엔드 모두 처음에는 options[default_index]를 반환하고, key가 같으면 재실행 사이에 선택을 유지한다.
+# 스타일은 MENU_STYLES 프리셋 이름으로 지정 (native는 같은 프리셋을 CSS로 바꿔 적용, 아이콘은 표시하지 않음)
+
+BACKEND_COMPONENT = 'component'
+BACKEND_NATIVE = 'native'
+BACKENDS = (BACKEND_COMPONENT, BACKEND_NATIVE)
+
+MENU_STYLES: Dict[str, Dict[str, Dict[str, str]]] = {
+    'option': {
+        "container": {"padding": "5px", "background-color": "#f0f0f0"},
+        "icon": {"color": "#ff6347", "font-size": "20px"},
+        "nav-link": {"font-size": "18px", "text-align": "center", "margin": "0px", "--hover-color": "#ffcccc", "--icon-color": "#ff6347"},
+        "nav-link-selected": {"background-color": "#ff6347", "color": "white", "--icon-color": "white"},
+    },
+    'vat': {
+        "container": {"padding": "0!important", "background-color": "#FFF9C4"},
+        "icon": {"color": "#FBC02D", "font-size": "16px"},
+        "nav-link": {"font-size": "14px", "text-align": "center", "margin": "0px", "--hover-color": "#FFF59D", "--icon-color": "#FBC02D"},
+        "nav-link-selected": {"background-color": "#FBC02D", "color": "white", "--icon-color": "white"},
+    },
+    'steps': {
+        "container": {"padding": "0!important", "background-color": "#e3f2fd"},
+        "icon": {"color": "#1976d2", "font-size": "25px"},
+        "nav-link": {"font-size": "16px", "text-align": "center", "margin": "0px", "--hover-color": "#bbdefb", "--icon-color": "#1976d2"},
+        "nav-link-selected": {"background-color": "#2196f3", "color": "white", "--icon-color": "white"},
+    },
+}
+
+# native에서 모든 라디오 메뉴에 기본으로 적용하는 프리셋 (나머지 프리셋만 메뉴 앞에 표시 요소를 둠)
+NATIVE_BASE_STYLE = 'option'
+
+_backend = BACKEND_COMPONENT
+
+
+def set_backend(backend: str) -> None:
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 메뉴 백엔드입니다: {backend}")
+    _backend = backend
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def _declarations(properties: Dict[str, str]) -> str:
+    return ''.join(f"{name}: {value};" for name, value in properties.items() if not name.startswith('--'))
+
+
+@lru_cache(maxsize=None)
+def native_css() -> str:
+    # 기본 프리셋은 모든 라디오에, 나머지는 메뉴 바로 앞의 표시 요소(.dnmd-menu-<프리셋>) 다음 라디오에만 적용
+    rules = []
+    for name, styles in MENU_STYLES.items():
+        if name == NATIVE_BASE_STYLE:
+            scope = 'div[role="radiogroup"]'
+        else:
+            scope = (f'div[data-testid="element-container"]:has(.dnmd-menu-{name}) + '
+                     f'div[data-testid="element-container"] div[role="radiogroup"]')
+        link = styles.get('nav-link', {})
+        selected = styles.get('nav-link-selected', {})
+        rules.append(f"{scope} {{{_declarations(styles.get('container', {}))} border-radius: 0.5rem;}}")
+        rules.append(f"{scope} label {{{_declarations(link)} padding: 0.25rem 0.75rem; border-radius: 0.5rem;}}")
+        if '--hover-color' in link:
+            rules.append(f"{scope} label:hover {{background-color: {link['--hover-color']};}}")
+        rules.append(f"{scope} label:has(input:checked) {{{_declarations(selected)}}}")
+        rules.append(f"{scope} label:has(input:checked) p {{color: {selected.get('color', 'inherit')};}}")
+    return f"<style>{''.join(rules)}</style>"
+
+
+def inject_styles() -> None:
+    # 재실행마다 한 번 호출 (native 백엔드일 때만 CSS 출력)
+    if _backend == BACKEND_NATIVE:
+        st.markdown(native_css(), unsafe_allow_html=True)
+
+
+def menu(label: Optional[str], options: List[str], key: Optional[str] = None, icons: Optional[List[str]] = None,
+         menu_icon: Optional[str] = None, default_index: int = 0, orientation: str = 'horizontal',
+         style: Optional[str] = None) -> str:
+    if _backend == BACKEND_NATIVE:
+        if style and style != NATIVE_BASE_STYLE:
+            st.markdown(f'<span class="dnmd-menu-{style}"></span>', unsafe_allow_html=True)
+        return st.radio(
+            label or "메뉴", options,
+            index=default_index,
+            key=key,
+            horizontal=orientation == 'horizontal',
+            label_visibility='visible' if label else 'collapsed',
+        )
+    return option_menu(
+        label, options,
+        icons=icons,
+        menu_icon=menu_icon,
+        default_index=default_index,
+        orientation=orientation,
+        styles=MENU_STYLES[style] if style else None,
+        key=key,
+    )
@@ -0,0 +1,290 @@
+import argparse
+import sqlite3
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+# 버전별 스키마 마이그레이션 (event_planner.db, budget.db)
+#
+# - 각 DB의 schema_migrations에 적용한 버전과 상태(backfilling/applied), 백필 커서를 기록
+# - 마이그레이션은 버전 순서대로 적용하고, 끝나지 않은 버전이 있으면 다음 버전으로 넘어가지 않음
+# - schema(열 추가, 인덱스 등 짧은 DDL)와 apply(현재 스키마를 보고 바꾸는 함수)는 상태 기록과 같은 트랜잭션에서 한 번만 실행
+# - backfill은 대상 테이블을 id 순서로 batch_size씩 나눠 배치마다 짧은 트랜잭션으로 처리하고
+#   커서(마지막 id)를 같은 트랜잭션에 저장 -> 중간에 멈춰도 다음 실행이 이어서 처리하고,
+#   배치 사이에는 앱의 쓰기가 끼어들 수 있어 큰 테이블도 잠그지 않음
+# - 백필 중에도 앱은 동작해야 하므로 새 열을 읽는 코드는 값이 없는(NULL) 행을 원래 방식으로 처리하고,
+#   저장 코드는 새 열을 함께 씀
+# - 앱 시작 시에는 max_seconds만큼만 진행하고 나머지는 다음 실행에서 이어감 (CLI는 끝까지 실행)
+# - budget.db 마이그레이션은 management_Project(create_tables)와 event_planner(budget_sync) 양쪽에서 실행
+#   (새 DB는 create_tables가 현재 스키마로 만들므로 apply 함수는 이미 바뀐 스키마면 아무것도 하지 않음)
+
+STATUS_BACKFILLING = 'backfilling'
+STATUS_APPLIED = 'applied'
+
+BATCH_SIZE = 500
+STARTUP_SECONDS = 2.0
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    schema: Tuple[str, ...] = ()
+    apply: Optional[Callable[[sqlite3.Connection], None]] = None
+    # 백필 대상 테이블과 배치 처리 함수 (conn, 배치의 id 목록)
+    backfill_table: Optional[str] = None
+    backfill: Optional[Callable[[sqlite3.Connection, List[int]], None]] = None
+    # 없으면 이 버전에서 멈출 테이블 (다른 앱이 아직 만들지 않은 경우)
+    requires: Tuple[str, ...] = ()
+
+
+class MigrationStatus(NamedTuple):
+    version: int
+    name: str
+    status: Optional[str]
+    done: int
+    total: int
+
+
+ProgressCallback = Callable[[MigrationStatus], None]
+
+
+def _backfill_event_summary(conn: sqlite3.Connection, ids: List[int]) -> None:
+    # 목록 화면에서 쓰는 이벤트명을 문서에서 꺼내 열에 저장
+    # (management_Project도 이 모듈을 불러오므로 event_planner 전용 의존성은 여기서 import)
+    from serialization import decode_event
+
+    placeholders = ','.join('?' * len(ids))
+    rows = conn.execute(f'SELECT id, event_data FROM events WHERE id IN ({placeholders})', ids).fetchall()
+    conn.executemany('UPDATE events SET event_name = ? WHERE id = ?',
+                     [(decode_event(event_data).get('event_name', 'Unnamed Event'), event_id)
+                      for event_id, event_data in rows])
+
+
+EVENT_MIGRATIONS = [
+    Migration(1, 'events_created_at_index', (
+        'CREATE INDEX IF NOT EXISTS idx_events_created_at ON events (created_at)',
+    ), requires=('events',)),
+    Migration(2, 'events_event_name_column', (
+        'ALTER TABLE events ADD COLUMN event_name TEXT',
+    ), backfill_table='events', backfill=_backfill_event_summary, requires=('events',)),
+]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[Tuple]:
+    return conn.execute(f'PRAGMA table_info({table})').fetchall()
+
+
+def _rebuild_budget_item_ids(conn: sqlite3.Connection) -> None:
+    # 예전 budget_input의 to_sql(if_exists='replace')로 만든 테이블은 id가 PRIMARY KEY가 아니어서 새 행의 id가 NULL이 됨
+    # -> id INTEGER PRIMARY KEY AUTOINCREMENT 테이블로 다시 만들고(인덱스/트리거 유지), id가 없거나 중복된 행에는 새 id 부여
+    columns = _columns(conn, 'budget_items')
+    if any(row[1] == 'id' and row[5] for row in columns):
+        return
+    others = [row for row in columns if row[1] != 'id']
+    dependents = [row[0] for row in conn.execute('''
+    SELECT sql FROM sqlite_master
+    WHERE tbl_name = 'budget_items' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    ''')]
+    definitions = ''.join(
+        f', "{name}" {col_type}' + (' NOT NULL' if notnull else '') + (f' DEFAULT {default}' if default is not None else '')
+        for _, name, col_type, notnull, default, _ in others
+    )
+    names = ', '.join(f'"{row[1]}"' for row in others)
+    conn.execute(f'CREATE TABLE budget_items_rebuild (id INTEGER PRIMARY KEY AUTOINCREMENT{definitions})')
+
+    # 유효한 id(각 id의 첫 행)를 먼저 옮긴 뒤 나머지 행은 새 id로 추가
+    has_id = any(row[1] == 'id' for row in columns)
+    keep = 'id IS NOT NULL AND ROW_NUMBER() OVER (PARTITION BY CAST(id AS INTEGER) ORDER BY rowid) = 1' if has_id else '0'
+    numbered = f'''SELECT rowid AS row_order, {'CAST(id AS INTEGER)' if has_id else 'NULL'} AS id, {names},
+                   CASE WHEN {keep} THEN 1 ELSE 0 END AS keep FROM budget_items'''
+    conn.execute(f'''
+    INSERT INTO budget_items_rebuild (id, {names})
+    SELECT id, {names} FROM ({numbered}) WHERE keep = 1 ORDER BY row_order
+    ''')
+    conn.execute(f'''
+    INSERT INTO budget_items_rebuild ({names})
+    SELECT {names} FROM ({numbered}) WHERE keep = 0 ORDER BY row_order
+    ''')
+    conn.execute('DROP TABLE budget_items')
+    conn.execute('ALTER TABLE budget_items_rebuild RENAME TO budget_items')
+    for statement in dependents:
+        conn.execute(statement)
+
+
+def _move_expense_request_columns(conn: sqlite3.Connection) -> None:
+    # 예전 버전의 지출희망금액1..3 / 잔액 열을 expense_requests로 옮기고 제거
+    columns = [row[1] for row in _columns(conn, 'budget_items')]
+    legacy_columns = [col for col in columns if col.startswith('지출희망금액')]
+    for col in legacy_columns:
+        conn.execute(f'''
+        INSERT INTO expense_requests (budget_item_id, 요청금액)
+        SELECT id, "{col}" FROM budget_items
+        WHERE id IS NOT NULL AND "{col}" IS NOT NULL AND "{col}" > 0
+        ''')
+    for col in legacy_columns + [col for col in columns if col == '잔액']:
+        conn.execute(f'ALTER TABLE budget_items DROP COLUMN "{col}"')
+
+
+def _add_budget_item_version_columns(conn: sqlite3.Connection) -> None:
+    # 낙관적 잠금을 위한 행 버전 열, event_planner 동기화용 source_key 열
+    columns = [row[1] for row in _columns(conn, 'budget_items')]
+    if 'version' not in columns:
+        conn.execute('ALTER TABLE budget_items ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+    if 'source_key' not in columns:
+        conn.execute('ALTER TABLE budget_items ADD COLUMN source_key TEXT')
+
+
+BUDGET_MIGRATIONS = [
+    Migration(1, 'expenses_budget_item_index', (
+        'CREATE INDEX IF NOT EXISTS idx_expenses_budget_item ON expenses (budget_item_id, 지출일자)',
+    ), requires=('expenses',)),
+    Migration(2, 'budget_items_id_primary_key', apply=_rebuild_budget_item_ids, requires=('budget_items',)),
+    Migration(3, 'budget_items_expense_request_columns', apply=_move_expense_request_columns,
+              requires=('budget_items', 'expense_requests')),
+    Migration(4, 'budget_items_version_columns', (
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_budget_items_source_key ON budget_items (source_key)',
+    ), apply=_add_budget_item_version_columns, requires=('budget_items',)),
+    Migration(5, 'budget_items_category_index', (
+        'CREATE INDEX IF NOT EXISTS idx_budget_items_category ON budget_items (대분류)',
+    ), requires=('budget_items',)),
+]
+
+
+def ensure_migration_schema(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        cursor INTEGER NOT NULL DEFAULT 0,
+        done INTEGER NOT NULL DEFAULT 0,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        applied_at TIMESTAMP
+    )''')
+
+
+def _state(conn: sqlite3.Connection, version: int) -> Optional[Tuple[str, int, int]]:
+    return conn.execute('SELECT status, cursor, done FROM schema_migrations WHERE version = ?', (version,)).fetchone()
+
+
+def _remaining(conn: sqlite3.Connection, migration: Migration, cursor: int) -> int:
+    if not migration.backfill_table:
+        return 0
+    return conn.execute(f'SELECT COUNT(*) FROM {migration.backfill_table} WHERE id > ?', (cursor,)).fetchone()[0]
+
+
+def migration_status(conn: sqlite3.Connection, migrations: Sequence[Migration]) -> List[MigrationStatus]:
+    ensure_migration_schema(conn)
+    statuses = []
+    for migration in migrations:
+        state = _state(conn, migration.version)
+        status, cursor, done = state if state else (None, 0, 0)
+        remaining = 0 if status == STATUS_APPLIED else _remaining(conn, migration, cursor)
+        statuses.append(MigrationStatus(migration.version, migration.name, status, done, done + remaining))
+    return statuses
+
+
+def _apply_schema(conn: sqlite3.Connection, migration: Migration) -> None:
+    # 다른 프로세스가 먼저 적용했을 수 있으므로 잠금을 잡은 뒤 다시 확인
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if _state(conn, migration.version) is None:
+            if migration.apply:
+                migration.apply(conn)
+            for statement in migration.schema:
+                conn.execute(statement)
+            status = STATUS_BACKFILLING if migration.backfill else STATUS_APPLIED
+            conn.execute('''
+            INSERT INTO schema_migrations (version, name, status, applied_at)
+            VALUES (?, ?, ?, CASE WHEN ? = ? THEN CURRENT_TIMESTAMP END)
+            ''', (migration.version, migration.name, status, status, STATUS_APPLIED))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _backfill_batch(conn: sqlite3.Connection, migration: Migration, batch_size: int) -> Tuple[bool, int]:
+    # 배치 하나를 처리. (끝났는지, 처리한 행 수)를 반환
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        status, cursor, _ = _state(conn, migration.version)
+        if status == STATUS_APPLIED:
+            conn.commit()
+            return True, 0
+        ids = [row[0] for row in conn.execute(
+            f'SELECT id FROM {migration.backfill_table} WHERE id > ? ORDER BY id LIMIT ?', (cursor, batch_size))]
+        if ids:
+            migration.backfill(conn, ids)
+            conn.execute('UPDATE schema_migrations SET cursor = ?, done = done + ? WHERE version = ?',
+                         (ids[-1], len(ids), migration.version))
+        else:
+            conn.execute('''
+            UPDATE schema_migrations SET status = ?, applied_at = CURRENT_TIMESTAMP WHERE version = ?
+            ''', (STATUS_APPLIED, migration.version))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return not ids, len(ids)
+
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration], batch_size: int = BATCH_SIZE,
+            max_seconds: Optional[float] = None, progress: Optional[ProgressCallback] = None) -> List[MigrationStatus]:
+    # 아직 끝나지 않은 마이그레이션을 진행하고, 끝나지 않은 채 남은 버전의 상태를 반환 (모두 끝났으면 빈 목록)
+    # 호출하는 쪽에서 열린 트랜잭션이 없어야 함
+    ensure_migration_schema(conn)
+    applied = {row[0] for row in conn.execute('SELECT version FROM schema_migrations WHERE status = ?',
+                                              (STATUS_APPLIED,))}
+    pending = [migration for migration in migrations if migration.version not in applied]
+    if not pending:
+        return []
+
+    deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for index, migration in enumerate(pending):
+        if any(table not in tables for table in migration.requires):
+            return migration_status(conn, pending[index:])
+        _apply_schema(conn, migration)
+        if not migration.backfill:
+            continue
+
+        _, cursor, done = _state(conn, migration.version)
+        total = done + _remaining(conn, migration, cursor)
+        finished = False
+        while not finished:
+            if deadline is not None and time.monotonic() >= deadline:
+                return migration_status(conn, pending[index:])
+            finished, count = _backfill_batch(conn, migration, batch_size)
+            done += count
+            if progress:
+                progress(MigrationStatus(migration.version, migration.name,
+                                         STATUS_APPLIED if finished else STATUS_BACKFILLING, done, max(total, done)))
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스키마 마이그레이션 적용/상태 확인")
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--budget', action='store_true', help="예산 관리 DB(budget.db)의 마이그레이션")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--max-seconds', type=float, help="이 시간만 진행하고 멈춤 (다음 실행에서 이어감)")
+    parser.add_argument('--status', action='store_true', help="적용하지 않고 상태만 출력")
+    args = parser.parse_args()
+
+    migrations = BUDGET_MIGRATIONS if args.budget else EVENT_MIGRATIONS
+    conn = sqlite3.connect(args.db, timeout=5)
+    try:
+        if not args.status:
+            def report(status: MigrationStatus) -> None:
+                print(f"\r[{status.version}] {status.name}: {status.done}/{status.total}", end='', flush=True)
+                if status.status == STATUS_APPLIED:
+                    print()
+            migrate(conn, migrations, args.batch_size, args.max_seconds, report)
+        for status in migration_status(conn, migrations):
+            print(f"{status.version}\t{status.name}\t{status.status or 'pending'}\t{status.done}/{status.total}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
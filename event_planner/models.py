@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional
+
+# 이벤트 데이터 모델
+#
+# 위저드/검증/엑셀 생성은 이 모델을 사용하고, DB에는 기존과 같은 dict 형식으로 저장한다.
+# (저장 형식의 구성 요소는 f'{item}_quantity' 같은 평탄화된 키를 사용하므로 변환 시 Item으로 묶음)
+
+ITEM_FIELDS = ('quantity', 'unit', 'duration', 'duration_unit', 'details')
+
+
+@dataclass(slots=True)
+class Item:
+    quantity: int = 0
+    unit: str = '개'
+    duration: int = 0
+    duration_unit: str = '개월'
+    details: str = ''
+
+
+@dataclass(slots=True)
+class Delivery:
+    status: str = ''
+    date: Optional[date] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    items: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Venue:
+    name: str = ''
+    address: str = ''
+
+
+@dataclass(slots=True)
+class Component:
+    status: str = ''
+    items: List[str] = field(default_factory=list)
+    budget: int = 0
+    shooting_date: Optional[date] = None
+    shooting_start_date: Optional[date] = None
+    shooting_end_date: Optional[date] = None
+    delivery_dates: List[Delivery] = field(default_factory=lambda: [Delivery()])
+    reference_links: List[str] = field(default_factory=lambda: [''])
+    cooperation_status: str = ''
+    preferred_vendor: bool = False
+    vendor_reason: str = ''
+    vendor_name: str = ''
+    vendor_contact: str = ''
+    vendor_manager: str = ''
+    other_items: List[str] = field(default_factory=list)
+    # 항목 키(항목명 또는 '기타_<n>')별 수량/단위/기간/세부사항
+    item_details: Dict[str, Item] = field(default_factory=dict)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def item(self, key: str) -> Item:
+        detail = self.item_details.get(key)
+        if detail is None:
+            detail = self.item_details[key] = Item()
+        return detail
+
+    def item_keys(self) -> List[str]:
+        keys = [item for item in self.items if item != "기타"]
+        keys.extend(f"기타_{i + 1}" for i in range(len(self.other_items)))
+        return keys
+
+
+@dataclass(slots=True)
+class Event:
+    id: Optional[int] = None
+    event_name: str = ''
+    client_name: str = ''
+    manager_name: str = ''
+    manager_email: str = ''
+    manager_position: str = ''
+    manager_contact: str = ''
+    event_type: str = ''
+    contract_type: str = ''
+    contract_status: str = ''
+    vat_included: bool = False
+    contract_amount: int = 0
+    additional_amount: int = 0
+    expected_profit_percentage: float = 0.0
+    expected_profit: int = 0
+    scale: int = 0
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    setup_start: str = ''
+    teardown: str = ''
+    setup_date: Optional[date] = None
+    teardown_date: Optional[date] = None
+    online_platform: str = ''
+    streaming_method: str = ''
+    streaming_date: Optional[date] = None
+    streaming_time: Optional[time] = None
+    recording_location: str = ''
+    upload_date: Optional[date] = None
+    expected_duration: int = 60
+    content_description: str = ''
+    location_name: str = ''
+    location_status: str = ''
+    venue_status: str = ''
+    venue_type: str = ''
+    venues: List[Venue] = field(default_factory=list)
+    desired_region: str = ''
+    specific_location: str = ''
+    desired_capacity: int = 0
+    facilities: List[str] = field(default_factory=list)
+    other_facilities: str = ''
+    venue_budget: int = 0
+    selected_categories: List[str] = field(default_factory=list)
+    components: Dict[str, Component] = field(default_factory=dict)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+# 저장 형식(dict) <-> 모델 변환
+# dataclasses.asdict/fields는 재귀 복사와 리플렉션 비용이 커서 필드 목록을 미리 만들어 직접 변환
+
+EVENT_SCALAR_FIELDS = tuple(name for name in Event.__slots__
+                            if name not in ('venues', 'components', 'facilities', 'selected_categories', 'extra'))
+COMPONENT_SCALAR_FIELDS = tuple(name for name in Component.__slots__
+                                if name not in ('items', 'delivery_dates', 'reference_links', 'other_items',
+                                                'item_details', 'extra'))
+EVENT_KEYS = frozenset(Event.__slots__) - {'extra'}
+COMPONENT_KEYS = frozenset(Component.__slots__) - {'item_details', 'extra'}
+
+
+def _as_date(value: Any) -> Optional[date]:
+    # 이전 JSON 형식에서 datetime으로 복원된 값도 date로 통일
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def delivery_from_dict(data: Dict[str, Any]) -> Delivery:
+    return Delivery(
+        status=data.get('status', ''),
+        date=_as_date(data.get('date')),
+        start_date=_as_date(data.get('start_date')),
+        end_date=_as_date(data.get('end_date')),
+        items=dict(data.get('items') or {}),
+    )
+
+
+def delivery_to_dict(delivery: Delivery) -> Dict[str, Any]:
+    data = {'status': delivery.status, 'date': delivery.date, 'items': dict(delivery.items)}
+    if delivery.start_date is not None:
+        data['start_date'] = delivery.start_date
+    if delivery.end_date is not None:
+        data['end_date'] = delivery.end_date
+    return data
+
+
+def component_from_dict(data: Dict[str, Any]) -> Component:
+    component = Component()
+    for name in COMPONENT_SCALAR_FIELDS:
+        if name in data:
+            setattr(component, name, data[name])
+    for name in ('shooting_date', 'shooting_start_date', 'shooting_end_date'):
+        setattr(component, name, _as_date(getattr(component, name)))
+    component.items = list(data.get('items') or [])
+    component.other_items = list(data.get('other_items') or [])
+    if 'delivery_dates' in data:
+        component.delivery_dates = [delivery_from_dict(d) for d in data['delivery_dates']]
+    if 'reference_links' in data:
+        component.reference_links = list(data['reference_links'])
+
+    # 평탄화된 항목 키를 Item으로 묶고, 나머지 알 수 없는 키는 extra에 보존
+    consumed = set()
+    for key in component.item_keys():
+        detail_keys = [f"{key}_{suffix}" for suffix in ITEM_FIELDS]
+        if any(k in data for k in detail_keys):
+            component.item_details[key] = Item(**{suffix: data[k] for suffix, k in zip(ITEM_FIELDS, detail_keys)
+                                                 if k in data})
+            consumed.update(detail_keys)
+    component.extra = {k: v for k, v in data.items() if k not in COMPONENT_KEYS and k not in consumed}
+    return component
+
+
+def component_to_dict(component: Component) -> Dict[str, Any]:
+    data = dict(component.extra)
+    for name in COMPONENT_SCALAR_FIELDS:
+        value = getattr(component, name)
+        if value is not None:
+            data[name] = value
+    data['items'] = list(component.items)
+    data['delivery_dates'] = [delivery_to_dict(d) for d in component.delivery_dates]
+    data['reference_links'] = list(component.reference_links)
+    if component.other_items:
+        data['other_items'] = list(component.other_items)
+    for key, detail in component.item_details.items():
+        data[f"{key}_quantity"] = detail.quantity
+        data[f"{key}_unit"] = detail.unit
+        data[f"{key}_duration"] = detail.duration
+        data[f"{key}_duration_unit"] = detail.duration_unit
+        data[f"{key}_details"] = detail.details
+    return data
+
+
+def event_from_dict(data: Dict[str, Any]) -> Event:
+    event = Event()
+    for name in EVENT_SCALAR_FIELDS:
+        if name in data:
+            setattr(event, name, data[name])
+    for name in ('start_date', 'end_date', 'setup_date', 'teardown_date', 'streaming_date', 'upload_date'):
+        setattr(event, name, _as_date(getattr(event, name)))
+    event.venues = [Venue(v.get('name', ''), v.get('address', '')) for v in data.get('venues') or []]
+    event.facilities = list(data.get('facilities') or [])
+    event.selected_categories = list(data.get('selected_categories') or [])
+    event.components = {category: component_from_dict(component)
+                        for category, component in (data.get('components') or {}).items()}
+    event.extra = {k: v for k, v in data.items() if k not in EVENT_KEYS}
+    return event
+
+
+def event_to_dict(event: Event) -> Dict[str, Any]:
+    data = dict(event.extra)
+    for name in EVENT_SCALAR_FIELDS:
+        value = getattr(event, name)
+        if value is not None:
+            data[name] = value
+    data['venues'] = [{'name': v.name, 'address': v.address} for v in event.venues]
+    data['facilities'] = list(event.facilities)
+    data['selected_categories'] = list(event.selected_categories)
+    data['components'] = {category: component_to_dict(component) for category, component in event.components.items()}
+    return data
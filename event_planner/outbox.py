@@ -0,0 +1,206 @@
+import argparse
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# 변경 피드 (트랜잭셔널 아웃박스)
+#
+# event_planner.db와 budget.db에 각각 outbox 테이블을 두고, 원본 테이블의 INSERT/UPDATE/DELETE 트리거가
+# 같은 트랜잭션에서 (엔티티, id, 작업, 버전)을 기록한다. 앱 코드가 변경 기록을 빠뜨릴 수 없고,
+# management_Project(SQLAlchemy)에서의 편집도 그대로 잡힌다.
+# - 버전: version 열이 있는 테이블(budget_items)은 그 값, 없으면 엔티티별 변경 횟수
+# - 소비자(consumer)는 sync_offsets에 마지막으로 처리한 seq를 저장하고 그 이후만 배치로 읽는다.
+#   오프셋은 소비자가 결과를 쓰는 DB에 결과와 같은 트랜잭션으로 저장해야 재실행해도 안전
+# - 트리거를 처음 만들 때 기존 행을 insert로 한 번 기록하므로, 새 소비자는 seq 0부터 읽으면 전체를 받는다
+
+ENTITY_EVENT = 'event'
+ENTITY_BUDGET_ITEM = 'budget_item'
+ENTITY_EXPENSE = 'expense'
+ENTITY_EXPENSE_REQUEST = 'expense_request'
+
+OP_INSERT = 'insert'
+OP_UPDATE = 'update'
+OP_DELETE = 'delete'
+
+# 원본 테이블 -> (엔티티, 버전 열)
+EVENT_TABLES = {'events': (ENTITY_EVENT, None)}
+BUDGET_TABLES = {
+    'budget_items': (ENTITY_BUDGET_ITEM, 'version'),
+    'expenses': (ENTITY_EXPENSE, None),
+    'expense_requests': (ENTITY_EXPENSE_REQUEST, None),
+}
+# 내용이 그대로인 UPDATE(저장 시각만 바뀐 경우 등)는 기록하지 않도록 비교할 열
+WATCHED_COLUMNS = {'events': ('event_data',)}
+
+BATCH_SIZE = 500
+
+
+class Change(NamedTuple):
+    seq: int
+    entity: str
+    entity_id: int
+    op: str
+    version: Optional[int]
+
+
+def _version_sql(row: str, entity: str, version_column: Optional[str], op: str) -> str:
+    if version_column and op != OP_DELETE:
+        return f'{row}.{version_column}'
+    return f'''COALESCE((SELECT version FROM outbox WHERE entity = '{entity}' AND entity_id = {row}.id
+                ORDER BY seq DESC LIMIT 1), 0) + 1'''
+
+
+def _trigger_statements(table: str, entity: str, version_column: Optional[str]) -> List[str]:
+    statements = []
+    for op, event, row in ((OP_INSERT, 'INSERT', 'NEW'), (OP_UPDATE, 'UPDATE', 'NEW'), (OP_DELETE, 'DELETE', 'OLD')):
+        when = ''
+        if op == OP_UPDATE and table in WATCHED_COLUMNS:
+            when = 'WHEN ' + ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in WATCHED_COLUMNS[table])
+        statements.append(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_outbox_{table}_{op} AFTER {event} ON {table} {when}
+        BEGIN
+            INSERT INTO outbox (entity, entity_id, op, version)
+            VALUES ('{entity}', {row}.id, '{op}', {_version_sql(row, entity, version_column, op)});
+        END''')
+    return statements
+
+
+def _create_outbox_tables(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS outbox (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        entity TEXT NOT NULL,
+        entity_id INTEGER NOT NULL,
+        op TEXT NOT NULL,
+        version INTEGER,
+        changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_entity ON outbox (entity, entity_id, seq)')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS sync_offsets (
+        consumer TEXT PRIMARY KEY,
+        last_seq INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+
+
+def _migrate_event_changes(conn: sqlite3.Connection) -> None:
+    # 이전 변경 피드(event_changes)를 seq 그대로 옮겨 기존 소비자 오프셋이 계속 유효하게 함
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'event_changes'").fetchone():
+        return
+    conn.execute(f'''
+    INSERT INTO outbox (seq, entity, entity_id, op, version, changed_at)
+    SELECT seq, '{ENTITY_EVENT}', event_id, '{OP_UPDATE}',
+           ROW_NUMBER() OVER (PARTITION BY event_id ORDER BY seq), changed_at
+    FROM event_changes
+    WHERE seq > (SELECT COALESCE(MAX(seq), 0) FROM outbox)
+    ''')
+    conn.execute('DROP TABLE event_changes')
+
+
+def install_outbox(conn: sqlite3.Connection, tables: Dict[str, Tuple[str, Optional[str]]]) -> List[str]:
+    # 있는 원본 테이블에 트리거를 만들고, 새로 트리거를 만든 테이블의 기존 행을 insert로 기록
+    # 새로 설치한 테이블 목록을 반환 (호출하는 쪽에서 열린 트랜잭션이 없어야 함)
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    pending = [table for table in tables
+               if table in existing and f'trg_outbox_{table}_{OP_DELETE}' not in existing]
+    if not pending and 'outbox' in existing and 'event_changes' not in existing:
+        return []
+
+    # 기존 행을 기록하는 동안 다른 연결의 쓰기가 빠지지 않도록 트리거 생성과 같은 트랜잭션에서 처리
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        _create_outbox_tables(conn)
+        _migrate_event_changes(conn)
+        for table in pending:
+            entity, version_column = tables[table]
+            for statement in _trigger_statements(table, entity, version_column):
+                conn.execute(statement)
+            version = version_column or 1
+            conn.execute(f'''
+            INSERT INTO outbox (entity, entity_id, op, version)
+            SELECT '{entity}', id, '{OP_INSERT}', {version} FROM {table}
+            WHERE id NOT IN (SELECT entity_id FROM outbox WHERE entity = '{entity}')
+            ORDER BY id
+            ''')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return pending
+
+
+def read_changes(conn: sqlite3.Connection, after_seq: int, limit: int = BATCH_SIZE,
+                 entities: Optional[Sequence[str]] = None) -> List[Change]:
+    query = 'SELECT seq, entity, entity_id, op, version FROM outbox WHERE seq > ?'
+    params: List[object] = [after_seq]
+    if entities:
+        query += f" AND entity IN ({','.join('?' * len(entities))})"
+        params.extend(entities)
+    query += ' ORDER BY seq LIMIT ?'
+    params.append(limit)
+    return [Change(*row) for row in conn.execute(query, params)]
+
+
+def latest_seq(conn: sqlite3.Connection) -> int:
+    return conn.execute('SELECT COALESCE(MAX(seq), 0) FROM outbox').fetchone()[0]
+
+
+def latest_changes(changes: Iterable[Change]) -> Dict[Tuple[str, int], Change]:
+    # 같은 배치 안에서 여러 번 바뀐 엔티티는 마지막 변경만 남김
+    return {(change.entity, change.entity_id): change for change in changes}
+
+
+def get_offset(conn: sqlite3.Connection, consumer: str) -> int:
+    row = conn.execute('SELECT last_seq FROM sync_offsets WHERE consumer = ?', (consumer,)).fetchone()
+    return row[0] if row else 0
+
+
+def set_offset(conn: sqlite3.Connection, consumer: str, last_seq: int) -> None:
+    conn.execute('''
+    INSERT INTO sync_offsets (consumer, last_seq) VALUES (?, ?)
+    ON CONFLICT(consumer) DO UPDATE SET last_seq = excluded.last_seq, updated_at = CURRENT_TIMESTAMP
+    ''', (consumer, last_seq))
+
+
+def tail(source_conn: sqlite3.Connection, offset_conn: sqlite3.Connection, consumer: str,
+         entities: Optional[Sequence[str]] = None, batch_size: int = BATCH_SIZE) -> Iterator[List[Change]]:
+    # 소비자 오프셋 이후의 변경을 배치로 돌려줌. 소비자는 배치를 처리하면서 같은 트랜잭션에서
+    # set_offset(offset_conn, consumer, batch[-1].seq)를 호출해야 다음 배치로 넘어감
+    while True:
+        batch = read_changes(source_conn, get_offset(offset_conn, consumer), batch_size, entities)
+        if not batch:
+            return
+        yield batch
+
+
+def prune_outbox(conn: sqlite3.Connection, through_seq: int) -> int:
+    # 모든 소비자가 처리한 seq까지 삭제. 삭제한 행 수를 반환
+    with conn:
+        return conn.execute('DELETE FROM outbox WHERE seq <= ?', (through_seq,)).rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="변경 피드(outbox) 상태 확인")
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--budget', action='store_true', help="예산 관리 DB(budget.db)의 테이블에 설치")
+    parser.add_argument('--tail', type=int, metavar='N', help="마지막 N건의 변경 출력")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        installed = install_outbox(conn, BUDGET_TABLES if args.budget else EVENT_TABLES)
+        if installed:
+            print(f"트리거 설치: {', '.join(installed)}")
+        print(f"마지막 seq: {latest_seq(conn)}")
+        for consumer, last_seq in conn.execute('SELECT consumer, last_seq FROM sync_offsets ORDER BY consumer'):
+            print(f"{consumer}\t{last_seq}")
+        if args.tail:
+            rows = conn.execute('SELECT * FROM outbox ORDER BY seq DESC LIMIT ?', (args.tail,)).fetchall()
+            for row in reversed(rows):
+                print('\t'.join(str(value) for value in row))
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+import argparse
+import sqlite3
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from serialization import decode_event
+
+# 여러 이벤트를 모아 보는 포트폴리오 집계
+#
+# - event_facts / event_category_facts: 이벤트별로 집계에 필요한 값만 뽑아 둔 테이블
+# - rollup_totals / rollup_category_budgets: (고객사, 용역 유형, 월) 단위로 미리 합산한 테이블
+# save_event_data가 같은 트랜잭션에서 이전 값을 빼고 새 값을 더하므로, 조회 시 이벤트 문서를
+# 역직렬화하지 않고 작은 집계 테이블만 읽는다.
+
+DIMENSIONS = ('client_name', 'event_type', 'month')
+UNKNOWN_MONTH = '미정'
+
+
+def ensure_portfolio_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript('''
+    CREATE TABLE IF NOT EXISTS event_facts (
+        event_id INTEGER PRIMARY KEY,
+        client_name TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        month TEXT NOT NULL,
+        contract_amount INTEGER NOT NULL,
+        expected_profit INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS event_category_facts (
+        event_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        budget INTEGER NOT NULL,
+        PRIMARY KEY (event_id, category)
+    );
+    CREATE TABLE IF NOT EXISTS rollup_totals (
+        client_name TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        month TEXT NOT NULL,
+        event_count INTEGER NOT NULL,
+        contract_amount INTEGER NOT NULL,
+        expected_profit INTEGER NOT NULL,
+        PRIMARY KEY (client_name, event_type, month)
+    );
+    CREATE TABLE IF NOT EXISTS rollup_category_budgets (
+        client_name TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        month TEXT NOT NULL,
+        category TEXT NOT NULL,
+        event_count INTEGER NOT NULL,
+        budget INTEGER NOT NULL,
+        PRIMARY KEY (client_name, event_type, month, category)
+    );
+    ''')
+
+
+def event_month(value: Any) -> str:
+    return value.strftime('%Y-%m') if isinstance(value, date) else UNKNOWN_MONTH
+
+
+def facts_from_document(document: Dict[str, Any]) -> Tuple[Tuple[str, str, str], int, int, Dict[str, int]]:
+    key = (
+        document.get('client_name') or '',
+        document.get('event_type') or '',
+        event_month(document.get('start_date')),
+    )
+    budgets = {category: int(component.get('budget') or 0)
+               for category, component in (document.get('components') or {}).items()}
+    return key, int(document.get('contract_amount') or 0), int(document.get('expected_profit') or 0), budgets
+
+
+def _add_totals(conn: sqlite3.Connection, key: Tuple[str, str, str], count: int, amount: int, profit: int) -> None:
+    conn.execute('''
+    INSERT INTO rollup_totals (client_name, event_type, month, event_count, contract_amount, expected_profit)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(client_name, event_type, month) DO UPDATE SET
+        event_count = event_count + excluded.event_count,
+        contract_amount = contract_amount + excluded.contract_amount,
+        expected_profit = expected_profit + excluded.expected_profit
+    ''', (*key, count, amount, profit))
+
+
+def _add_category_budgets(conn: sqlite3.Connection, key: Tuple[str, str, str], count: int,
+                          budgets: Dict[str, int]) -> None:
+    conn.executemany('''
+    INSERT INTO rollup_category_budgets (client_name, event_type, month, category, event_count, budget)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(client_name, event_type, month, category) DO UPDATE SET
+        event_count = event_count + excluded.event_count,
+        budget = budget + excluded.budget
+    ''', [(*key, category, count, count * budget) for category, budget in budgets.items()])
+
+
+def refresh_event_rollup(conn: sqlite3.Connection, event_id: int, document: Dict[str, Any]) -> None:
+    # 이전에 반영한 값을 빼고 새 값을 더함 (호출하는 쪽의 트랜잭션 안에서 실행)
+    old = conn.execute('''
+    SELECT client_name, event_type, month, contract_amount, expected_profit FROM event_facts WHERE event_id = ?
+    ''', (event_id,)).fetchone()
+    if old:
+        old_key = tuple(old[:3])
+        old_budgets = dict(conn.execute('SELECT category, budget FROM event_category_facts WHERE event_id = ?',
+                                        (event_id,)).fetchall())
+        _add_totals(conn, old_key, -1, -old[3], -old[4])
+        _add_category_budgets(conn, old_key, -1, old_budgets)
+        conn.execute('''
+        DELETE FROM rollup_totals WHERE client_name = ? AND event_type = ? AND month = ? AND event_count <= 0
+        ''', old_key)
+        conn.execute('''
+        DELETE FROM rollup_category_budgets
+        WHERE client_name = ? AND event_type = ? AND month = ? AND event_count <= 0
+        ''', old_key)
+        conn.execute('DELETE FROM event_category_facts WHERE event_id = ?', (event_id,))
+
+    key, amount, profit, budgets = facts_from_document(document)
+    _add_totals(conn, key, 1, amount, profit)
+    _add_category_budgets(conn, key, 1, budgets)
+    conn.execute('''
+    INSERT OR REPLACE INTO event_facts (event_id, client_name, event_type, month, contract_amount, expected_profit)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', (event_id, *key, amount, profit))
+    conn.executemany('INSERT INTO event_category_facts (event_id, category, budget) VALUES (?, ?, ?)',
+                     [(event_id, category, budget) for category, budget in budgets.items()])
+
+
+def rebuild_rollups(conn: sqlite3.Connection) -> int:
+    # 전체 이벤트로부터 집계 테이블을 다시 만듦. 처리한 이벤트 수를 반환
+    with conn:
+        for table in ('event_facts', 'event_category_facts', 'rollup_totals', 'rollup_category_budgets'):
+            conn.execute(f'DELETE FROM {table}')
+        count = 0
+        for event_id, stored in conn.execute('SELECT id, event_data FROM events').fetchall():
+            refresh_event_rollup(conn, event_id, decode_event(stored))
+            count += 1
+    return count
+
+
+def backfill_if_empty(conn: sqlite3.Connection) -> int:
+    # 집계 도입 이전에 저장된 이벤트가 있으면 한 번만 채움
+    has_facts = conn.execute('SELECT 1 FROM event_facts LIMIT 1').fetchone()
+    has_events = conn.execute('SELECT 1 FROM events LIMIT 1').fetchone()
+    if has_facts or not has_events:
+        return 0
+    return rebuild_rollups(conn)
+
+
+def _where(clients: Optional[Sequence[str]], event_types: Optional[Sequence[str]],
+           month_range: Optional[Tuple[str, str]]) -> Tuple[str, List[Any]]:
+    clauses, params = [], []
+    if clients:
+        clauses.append(f"client_name IN ({','.join('?' * len(clients))})")
+        params.extend(clients)
+    if event_types:
+        clauses.append(f"event_type IN ({','.join('?' * len(event_types))})")
+        params.extend(event_types)
+    if month_range:
+        clauses.append('month BETWEEN ? AND ?')
+        params.extend(month_range)
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+
+def query_totals(conn: sqlite3.Connection, group_by: str, clients: Optional[Sequence[str]] = None,
+                 event_types: Optional[Sequence[str]] = None,
+                 month_range: Optional[Tuple[str, str]] = None) -> pd.DataFrame:
+    if group_by not in DIMENSIONS:
+        raise ValueError(f"지원하지 않는 집계 기준입니다: {group_by}")
+    where, params = _where(clients, event_types, month_range)
+    return pd.read_sql_query(f'''
+    SELECT {group_by}, SUM(event_count) AS event_count, SUM(contract_amount) AS contract_amount,
+           SUM(expected_profit) AS expected_profit
+    FROM rollup_totals {where}
+    GROUP BY {group_by} ORDER BY {group_by}
+    ''', conn, params=params)
+
+
+def query_category_budgets(conn: sqlite3.Connection, group_by: str, clients: Optional[Sequence[str]] = None,
+                           event_types: Optional[Sequence[str]] = None,
+                           month_range: Optional[Tuple[str, str]] = None) -> pd.DataFrame:
+    # group_by x 카테고리 예산 합계 (피벗)
+    if group_by not in DIMENSIONS:
+        raise ValueError(f"지원하지 않는 집계 기준입니다: {group_by}")
+    where, params = _where(clients, event_types, month_range)
+    df = pd.read_sql_query(f'''
+    SELECT {group_by}, category, SUM(budget) AS budget
+    FROM rollup_category_budgets {where}
+    GROUP BY {group_by}, category
+    ''', conn, params=params)
+    if df.empty:
+        return df
+    return df.pivot(index=group_by, columns='category', values='budget').fillna(0).astype(int)
+
+
+def dimension_values(conn: sqlite3.Connection, dimension: str) -> List[str]:
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"지원하지 않는 집계 기준입니다: {dimension}")
+    return [row[0] for row in conn.execute(f'SELECT DISTINCT {dimension} FROM rollup_totals ORDER BY {dimension}')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="포트폴리오 집계 테이블 재생성")
+    parser.add_argument('--event-db', default='event_planner.db')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.event_db)
+    try:
+        ensure_portfolio_schema(conn)
+        print(f"{rebuild_rollups(conn)}개 이벤트로 집계 테이블을 다시 만들었습니다.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import math
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, Optional
+
+from budget_sync import ensure_budget_schema
+
+# 과거 단가 색인 (budget.db)
+#
+# budget_items의 단가를 항목명별/대분류별 분위수 스케치로 유지한다.
+# - 상대 오차 RELATIVE_ACCURACY의 로그 구간(bucket)마다 개수만 세는 방식(DDSketch와 같은 구간 분할)이라
+#   값을 더하고 빼는 것만으로 갱신되고, 분위수는 구간 누적 개수로 계산
+# - budget_items의 INSERT/UPDATE/DELETE 트리거가 같은 트랜잭션에서 구간 개수를 조정하므로,
+#   management_Project에서 편집해도 테이블을 다시 읽지 않고 최신 상태가 유지됨
+# - 이벤트 예산 동기화 행(source_key가 있는 행)은 항목 단가가 아니므로 제외
+# - price_bucket_ranks 뷰는 (scope, key)별 구간 누적 개수. scope/key 조건이 뷰 안으로 내려가므로 조회한 key의
+#   구간만 읽는다 (management_Project도 같은 뷰로 분위수를 계산)
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+MAX_PRICE = 10 ** 12
+
+SCOPE_ITEM = 'item'
+SCOPE_CATEGORY = 'category'
+SCOPE_COLUMNS = {SCOPE_ITEM: '항목명', SCOPE_CATEGORY: '대분류'}
+
+_BUCKET = "(SELECT bucket FROM price_bucket_bounds WHERE upper >= {row}.단가 ORDER BY upper LIMIT 1)"
+
+
+def bucket_bounds() -> Iterable[tuple]:
+    # (구간 번호, 상한, 대표값). 구간 i는 (GAMMA^(i-1), GAMMA^i], 대표값은 상대 오차가 가장 작은 값
+    for bucket in range(math.ceil(math.log(MAX_PRICE, GAMMA)) + 1):
+        upper = GAMMA ** bucket
+        yield bucket, upper, 2 * upper / (GAMMA + 1)
+
+
+def _adjust_sql(row: str, sign: int) -> str:
+    statements = []
+    for scope, column in SCOPE_COLUMNS.items():
+        statements.append(f'''
+        INSERT INTO price_buckets (scope, key, bucket, count)
+        SELECT '{scope}', TRIM({row}.{column}), {_BUCKET.format(row=row)}, {sign}
+        WHERE {row}.source_key IS NULL AND {row}.단가 > 0 AND {row}.단가 <= {MAX_PRICE}
+          AND TRIM(COALESCE({row}.{column}, '')) != ''
+        ON CONFLICT(scope, key, bucket) DO UPDATE SET count = count + excluded.count;''')
+        if sign < 0:
+            statements.append(f'''
+        DELETE FROM price_buckets
+        WHERE scope = '{scope}' AND key = TRIM({row}.{column}) AND bucket = {_BUCKET.format(row=row)} AND count <= 0;''')
+    return ''.join(statements)
+
+
+SCHEMA_STATEMENTS = [
+    '''
+    CREATE TABLE IF NOT EXISTS price_bucket_bounds (
+        bucket INTEGER PRIMARY KEY,
+        upper REAL NOT NULL UNIQUE,
+        value REAL NOT NULL
+    )''',
+    '''
+    CREATE TABLE IF NOT EXISTS price_buckets (
+        scope TEXT NOT NULL,
+        key TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (scope, key, bucket)
+    ) WITHOUT ROWID''',
+    '''
+    CREATE VIEW IF NOT EXISTS price_bucket_ranks AS
+    SELECT pb.scope, pb.key, bounds.value,
+           SUM(pb.count) OVER (PARTITION BY pb.scope, pb.key ORDER BY pb.bucket) AS cumulative,
+           SUM(pb.count) OVER (PARTITION BY pb.scope, pb.key) AS total
+    FROM price_buckets pb JOIN price_bucket_bounds bounds ON bounds.bucket = pb.bucket''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_price_index_insert AFTER INSERT ON budget_items
+    BEGIN{_adjust_sql('NEW', 1)}
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_price_index_delete AFTER DELETE ON budget_items
+    BEGIN{_adjust_sql('OLD', -1)}
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_price_index_update AFTER UPDATE OF 단가, 항목명, 대분류, source_key ON budget_items
+    WHEN OLD.단가 IS NOT NEW.단가 OR OLD.항목명 IS NOT NEW.항목명 OR OLD.대분류 IS NOT NEW.대분류
+         OR OLD.source_key IS NOT NEW.source_key
+    BEGIN{_adjust_sql('OLD', -1)}{_adjust_sql('NEW', 1)}
+    END''',
+]
+
+
+def install_price_index(conn: sqlite3.Connection) -> bool:
+    # 색인 테이블/트리거를 만들고, 처음 만들 때만 기존 budget_items를 한 번 읽어 채움
+    # budget_items가 없으면 False
+    if not ensure_budget_schema(conn):
+        return False
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_price_index_update'").fetchone():
+        return True
+
+    # 기존 행을 채우는 동안 다른 연결의 쓰기가 빠지지 않도록 트리거 생성과 같은 트랜잭션에서 처리
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        for statement in SCHEMA_STATEMENTS:
+            conn.execute(statement)
+        conn.execute('DELETE FROM price_buckets')
+        conn.execute('DELETE FROM price_bucket_bounds')
+        conn.executemany('INSERT INTO price_bucket_bounds (bucket, upper, value) VALUES (?, ?, ?)', bucket_bounds())
+        for scope, column in SCOPE_COLUMNS.items():
+            conn.execute(f'''
+            INSERT INTO price_buckets (scope, key, bucket, count)
+            SELECT '{scope}', TRIM({column}), {_BUCKET.format(row='budget_items')}, COUNT(*)
+            FROM budget_items
+            WHERE source_key IS NULL AND 단가 > 0 AND 단가 <= {MAX_PRICE} AND TRIM(COALESCE({column}, '')) != ''
+            GROUP BY 1, 2, 3
+            ''')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return True
+
+
+def price_stats(conn: sqlite3.Connection, scope: str, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    # key -> {'count', 'p25', 'p50', 'p75'} (기록이 없는 key는 빠짐)
+    keys = sorted({key.strip() for key in keys if key and key.strip()})
+    if not keys:
+        return {}
+    placeholders = ','.join('?' * len(keys))
+    rows = conn.execute(f'''
+    SELECT key, MAX(total),
+           MIN(CASE WHEN cumulative >= 0.25 * total THEN value END),
+           MIN(CASE WHEN cumulative >= 0.5 * total THEN value END),
+           MIN(CASE WHEN cumulative >= 0.75 * total THEN value END)
+    FROM price_bucket_ranks WHERE scope = ? AND key IN ({placeholders})
+    GROUP BY key
+    ''', [scope, *keys])
+    return {row[0]: {'count': row[1], 'p25': round(row[2]), 'p50': round(row[3]), 'p75': round(row[4])}
+            for row in rows}
+
+
+def suggest_unit_price(conn: sqlite3.Connection, item: str, category: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    # 항목명 기록이 있으면 항목명 기준, 없으면 대분류 기준 단가 분포 ('scope'에 어느 쪽인지 기록)
+    for scope, key in ((SCOPE_ITEM, item), (SCOPE_CATEGORY, category)):
+        stats = price_stats(conn, scope, [key] if key else []).get((key or '').strip())
+        if stats:
+            return {**stats, 'scope': scope}
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="budget_items 단가 분위수 색인")
+    parser.add_argument('--budget-db', required=True)
+    parser.add_argument('--item', help="항목명 단가 분포 조회")
+    parser.add_argument('--category', help="대분류 단가 분포 조회 (항목명 기록이 없을 때)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.budget_db):
+        parser.error(f"예산 DB를 찾을 수 없습니다: {args.budget_db}")
+    conn = sqlite3.connect(args.budget_db)
+    try:
+        if not install_price_index(conn):
+            print("budget_items 테이블이 없습니다.")
+            return
+        if args.item or args.category:
+            stats = suggest_unit_price(conn, args.item or '', args.category)
+            if stats is None:
+                print("단가 기록이 없습니다.")
+            else:
+                print(f"{stats['scope']}\t{stats['count']}건\t25%: {stats['p25']:,}\t"
+                      f"중앙값: {stats['p50']:,}\t75%: {stats['p75']:,}")
+        else:
+            count = conn.execute("SELECT COUNT(DISTINCT key) FROM price_buckets WHERE scope = ?",
+                                 (SCOPE_ITEM,)).fetchone()[0]
+            print(f"{count}개 항목명의 단가 분포를 색인했습니다.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
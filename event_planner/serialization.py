@@ -0,0 +1,104 @@
+import json
+import re
+from datetime import date, datetime, time
+from typing import Any, Dict, Union
+
+import msgpack
+
+try:
+    import zstandard
+except ImportError:  # zstd 압축은 선택 사항
+    zstandard = None
+
+# 이벤트 문서 직렬화
+#
+# 저장 형식: 1바이트 헤더 + 본문
+#   0x01: msgpack
+#   0x02: zstd로 압축한 msgpack
+# 날짜/시간은 msgpack 확장 타입으로 명시적으로 태깅하여 중첩 구조(components, delivery_dates 등)에서도
+# 원래 타입으로 복원된다. 헤더 없이 '{'로 시작하는 TEXT는 이전 JSON 형식으로 읽는다.
+
+FORMAT_MSGPACK = 0x01
+FORMAT_MSGPACK_ZSTD = 0x02
+
+EXT_DATE = 1
+EXT_DATETIME = 2
+EXT_TIME = 3
+
+ZSTD_LEVEL = 3
+
+
+def _default(obj: Any) -> msgpack.ExtType:
+    # datetime은 date의 하위 클래스이므로 먼저 확인
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(EXT_DATE, obj.toordinal().to_bytes(4, 'big'))
+    if isinstance(obj, time):
+        return msgpack.ExtType(EXT_TIME, obj.isoformat().encode())
+    if isinstance(obj, (set, tuple)):
+        return list(obj)
+    raise TypeError(f"직렬화할 수 없는 타입입니다: {type(obj).__name__}")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == EXT_DATE:
+        return date.fromordinal(int.from_bytes(data, 'big'))
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == EXT_TIME:
+        return time.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def compression_available() -> bool:
+    return zstandard is not None
+
+
+def encode_event(event_data: Dict[str, Any], compress: bool = True) -> bytes:
+    body = msgpack.packb(event_data, default=_default, use_bin_type=True)
+    if compress and zstandard is not None:
+        return bytes([FORMAT_MSGPACK_ZSTD]) + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return bytes([FORMAT_MSGPACK]) + body
+
+
+def decode_event(stored: Union[bytes, str]) -> Dict[str, Any]:
+    if isinstance(stored, str):
+        return decode_legacy_json(stored)
+
+    header, body = stored[0], stored[1:]
+    if header == FORMAT_MSGPACK_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 이벤트를 읽으려면 zstandard 패키지가 필요합니다.")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif header != FORMAT_MSGPACK:
+        return decode_legacy_json(stored.decode('utf-8'))
+    return msgpack.unpackb(body, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+# 이전 JSON 형식: 날짜가 ISO 문자열로 저장되어 있어 형태가 정확히 일치하는 문자열만 복원
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_DATETIME_RE = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2}(\.\d+)?)?([+-]\d{2}:\d{2})?$')
+_TIME_RE = re.compile(r'^\d{2}:\d{2}:\d{2}(\.\d+)?$')
+
+
+def _revive(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _revive(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_revive(v) for v in value]
+    if isinstance(value, str):
+        try:
+            if _DATE_RE.match(value):
+                return date.fromisoformat(value)
+            if _DATETIME_RE.match(value):
+                return datetime.fromisoformat(value)
+            if _TIME_RE.match(value):
+                return time.fromisoformat(value)
+        except ValueError:
+            pass
+    return value
+
+
+def decode_legacy_json(text: str) -> Dict[str, Any]:
+    return _revive(json.loads(text))
@@ -0,0 +1,104 @@
+import re
+import sys
+from typing import Any, Dict, Iterable, List, MutableMapping, Optional, Set
+
+from models import Component, Event
+
+# 세션 상태 정리
+#
+# 카테고리/납품일/기타 항목/장소처럼 이벤트 구조에 따라 생기는 위젯 키는 해당 구조가 사라져도
+# session_state에 남는다. 현재 이벤트 구조로 렌더링될 수 있는 키(live_keys)를 계산하고,
+# 구조 기반 키(is_managed_key) 중 여기에 없는 키를 지운다.
+# 그 외의 키(기본 정보 입력, 단계, 이벤트 데이터 등)는 건드리지 않는다.
+
+CATEGORY_KEY_SUFFIXES = (
+    'status', 'items', 'budget', 'shooting_date_status', 'shooting_start_date', 'shooting_end_date',
+    'remove_delivery_date', 'add_delivery_date', 'add_reference_link', 'remove_reference_link',
+    'cooperation_status', 'vendor_reason', 'vendor_name', 'vendor_match', 'vendor_contact', 'vendor_manager',
+    'vendor_applied', 'add_other_item',
+)
+DELIVERY_KEY_PREFIXES = ('delivery_status', 'delivery_type', 'delivery_start_date', 'delivery_end_date', 'delivery_date')
+ITEM_KEY_SUFFIXES = ('quantity', 'unit', 'duration', 'duration_unit', 'details')
+
+VENUE_KEY_PATTERN = re.compile(r'^(venue_name|venue_address|delete_venue)_\d+$')
+OTHER_ITEM_PATTERN = re.compile(r'^기타_\d+$')
+
+
+def _item_detail_keys(item: str) -> List[str]:
+    return [f"{item}_{suffix}" for suffix in ITEM_KEY_SUFFIXES]
+
+
+def category_live_keys(category: str, component: Component) -> List[str]:
+    keys = [f"{category}_{suffix}" for suffix in CATEGORY_KEY_SUFFIXES]
+    for idx in range(len(component.delivery_dates)):
+        keys.extend(f"{category}_{prefix}_{idx}" for prefix in DELIVERY_KEY_PREFIXES)
+        keys.extend(f"{category}_delivery_item_{idx}_{item}" for item in component.items)
+    keys.extend(f"{category}_reference_link_{i}" for i in range(len(component.reference_links)))
+    for i in range(len(component.other_items)):
+        keys.append(f"{category}_other_item_{i}")
+        keys.append(f"{category}_delete_other_item_{i}")
+        keys.extend(_item_detail_keys(f"기타_{i + 1}"))
+    for item in component.items:
+        if item != "기타":
+            keys.extend(_item_detail_keys(item))
+    return keys
+
+
+def live_keys(event: Event) -> Set[str]:
+    keys = set()
+    for i in range(len(event.venues)):
+        keys.update((f"venue_name_{i}", f"venue_address_{i}", f"delete_venue_{i}"))
+    for category in event.selected_categories:
+        keys.update(category_live_keys(category, event.components.get(category) or Component()))
+    return keys
+
+
+def is_managed_key(key: str, categories: Iterable[str], items: Set[str]) -> bool:
+    # 이벤트 구조에 따라 생기는 키인지 (categories: 전체 카테고리, items: 전체 항목명)
+    if VENUE_KEY_PATTERN.match(key):
+        return True
+    if any(key.startswith(f"{category}_") for category in categories):
+        return True
+    for suffix in ITEM_KEY_SUFFIXES:
+        if key.endswith(f"_{suffix}"):
+            item = key[:-len(suffix) - 1]
+            if item in items or OTHER_ITEM_PATTERN.match(item):
+                return True
+    return False
+
+
+def collect_garbage(state: MutableMapping[str, Any], event: Event, categories: Iterable[str],
+                    items: Set[str]) -> List[str]:
+    # 구조 기반 키 중 현재 이벤트 구조에 없는 키를 지우고 지운 키 목록을 반환
+    # (위젯이 렌더링되기 전, 스크립트 시작 부분에서 호출)
+    categories = tuple(categories)
+    live = live_keys(event)
+    stale = [key for key in list(state.keys())
+             if isinstance(key, str) and key not in live and is_managed_key(key, categories, items)]
+    for key in stale:
+        del state[key]
+    return stale
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_sizeof(getattr(obj, name), seen) for name in obj.__slots__ if hasattr(obj, name))
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def state_report(state: MutableMapping[str, Any], top: int = 5) -> Dict[str, Any]:
+    # 세션 상태 크기 (키 수, 전체 바이트, 가장 큰 키 top개)
+    sizes = {key: deep_sizeof(value) for key, value in state.items()}
+    largest = sorted(sizes.items(), key=lambda entry: entry[1], reverse=True)[:top]
+    return {'keys': len(sizes), 'bytes': sum(sizes.values()), 'largest': largest}
@@ -0,0 +1,277 @@
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from outbox import (BUDGET_TABLES, ENTITY_EVENT, ENTITY_EXPENSE, ENTITY_EXPENSE_REQUEST, EVENT_TABLES, OP_DELETE,
+                    install_outbox, latest_changes, set_offset, tail)
+from serialization import decode_event
+
+# 협력사(업체) 디렉토리
+#
+# 이벤트의 선호 업체(vendor_name/vendor_contact/vendor_manager)와 management_Project의
+# 지출/지출 요청 협력사를 budget.db의 vendors 테이블 하나로 모은다.
+# - 업체명은 법인 표기/공백/기호를 제거해 정규화하고, 연락처는 format_phone_number 형식으로 통일
+# - 정규화된 이름의 3-gram을 vendor_trigrams에 색인하여 유사한 이름(오타, 띄어쓰기 차이)을 같은 업체로 합치고
+#   입력 중인 업체명으로 빠르게 검색(typeahead)
+# - 두 DB의 변경 피드(outbox)에서 처리한 seq를 sync_offsets에 기록해 새로 생기거나 바뀐 데이터만 반영
+
+DEDUP_THRESHOLD = 0.75
+PHONE_DEDUP_THRESHOLD = 0.3
+LOOKUP_CANDIDATES = 50
+BATCH_SIZE = 500
+
+EVENT_CONSUMER = 'vendor_events'
+EXPENSE_CONSUMER = 'vendor_expense_changes'
+# 엔티티 -> 협력사 열이 있는 테이블
+EXPENSE_SOURCES = {
+    ENTITY_EXPENSE: 'expenses',
+    ENTITY_EXPENSE_REQUEST: 'expense_requests',
+}
+
+_CORPORATE_MARKERS = re.compile(r'\(주\)|\(유\)|\(사\)|\(재\)|주식회사|유한회사|사단법인|재단법인|'
+                                r'co\.?,?\s*ltd\.?|inc\.?|corp\.?')
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def format_phone_number(number: str) -> str:
+    pattern = r'(\d{3})(\d{3,4})(\d{4})'
+    return re.sub(pattern, r'\1-\2-\3', number)
+
+
+def normalize_vendor_name(name: Optional[str]) -> str:
+    # NFKC로 ㈜ 같은 기호를 (주)로 풀어낸 뒤 법인 표기와 공백/기호 제거
+    name = unicodedata.normalize('NFKC', name or '').lower()
+    return _NON_WORD.sub('', _CORPORATE_MARKERS.sub('', name))
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    digits = ''.join(filter(str.isdigit, phone or ''))
+    return format_phone_number(digits) if digits else ''
+
+
+def trigrams(normalized: str, prefix: bool = False) -> Set[str]:
+    # 앞뒤에 경계 문자를 붙여 짧은 이름도 색인되게 함. prefix=True면 입력 중인 검색어용(끝 경계 없음)
+    padded = f"${normalized}" if prefix else f"${normalized}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def ensure_vendor_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript('''
+    CREATE TABLE IF NOT EXISTS vendors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        normalized_name TEXT NOT NULL UNIQUE,
+        phone TEXT NOT NULL DEFAULT '',
+        manager TEXT NOT NULL DEFAULT '',
+        trigram_count INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_vendors_phone ON vendors (phone);
+    CREATE TABLE IF NOT EXISTS vendor_trigrams (
+        trigram TEXT NOT NULL,
+        vendor_id INTEGER NOT NULL,
+        PRIMARY KEY (trigram, vendor_id)
+    ) WITHOUT ROWID;
+    ''')
+    # 지출/지출 요청 변경 피드 (sync_offsets도 여기서 생성)
+    install_outbox(conn, BUDGET_TABLES)
+
+
+def _trigram_hits(conn: sqlite3.Connection, grams: Set[str], limit: int) -> List[Tuple[int, int]]:
+    placeholders = ','.join('?' * len(grams))
+    return conn.execute(f'''
+    SELECT vendor_id, COUNT(*) AS hits FROM vendor_trigrams
+    WHERE trigram IN ({placeholders})
+    GROUP BY vendor_id ORDER BY hits DESC LIMIT ?
+    ''', [*grams, limit]).fetchall()
+
+
+def find_duplicate(conn: sqlite3.Connection, normalized: str, phone: str = '') -> Optional[int]:
+    row = conn.execute('SELECT id FROM vendors WHERE normalized_name = ?', (normalized,)).fetchone()
+    if row:
+        return row[0]
+
+    grams = trigrams(normalized)
+    hits = _trigram_hits(conn, grams, LOOKUP_CANDIDATES)
+    if not hits:
+        return None
+    placeholders = ','.join('?' * len(hits))
+    candidates = {row[0]: row[1:] for row in conn.execute(
+        f'SELECT id, trigram_count, phone FROM vendors WHERE id IN ({placeholders})', [h[0] for h in hits])}
+
+    best_id, best_score = None, 0.0
+    for vendor_id, shared in hits:
+        trigram_count, vendor_phone = candidates[vendor_id]
+        score = shared / (len(grams) + trigram_count - shared)
+        threshold = PHONE_DEDUP_THRESHOLD if phone and phone == vendor_phone else DEDUP_THRESHOLD
+        if score >= threshold and score > best_score:
+            best_id, best_score = vendor_id, score
+    return best_id
+
+
+def register_vendor(conn: sqlite3.Connection, name: str, phone: str = '', manager: str = '') -> Optional[int]:
+    # 같은 업체로 판단되면 기존 id를 반환하고 비어 있는 연락처/담당자만 채움
+    normalized = normalize_vendor_name(name)
+    if not normalized:
+        return None
+    phone = normalize_phone(phone)
+    manager = (manager or '').strip()
+
+    vendor_id = find_duplicate(conn, normalized, phone)
+    if vendor_id is not None:
+        conn.execute('''
+        UPDATE vendors SET
+            phone = CASE WHEN phone = '' THEN ? ELSE phone END,
+            manager = CASE WHEN manager = '' THEN ? ELSE manager END,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND ((phone = '' AND ? != '') OR (manager = '' AND ? != ''))
+        ''', (phone, manager, vendor_id, phone, manager))
+        return vendor_id
+
+    grams = trigrams(normalized)
+    cursor = conn.execute('''
+    INSERT INTO vendors (name, normalized_name, phone, manager, trigram_count) VALUES (?, ?, ?, ?, ?)
+    ''', (name.strip(), normalized, phone, manager, len(grams)))
+    vendor_id = cursor.lastrowid
+    conn.executemany('INSERT INTO vendor_trigrams (trigram, vendor_id) VALUES (?, ?)',
+                     [(gram, vendor_id) for gram in grams])
+    return vendor_id
+
+
+def lookup_vendors(conn: sqlite3.Connection, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    # 입력 중인 업체명으로 검색. 앞부분이 일치하는 업체를 먼저, 그 다음 3-gram 유사도 순
+    normalized = normalize_vendor_name(query)
+    if not normalized:
+        return []
+
+    if len(normalized) < 2:
+        # 한 글자는 3-gram이 없으므로 정규화 이름의 범위 조회(UNIQUE 인덱스 사용)
+        rows = conn.execute('''
+        SELECT id, name, phone, manager FROM vendors
+        WHERE normalized_name >= ? AND normalized_name < ?
+        ORDER BY normalized_name LIMIT ?
+        ''', (normalized, normalized + '\U0010ffff', limit)).fetchall()
+        return [{'id': r[0], 'name': r[1], 'phone': r[2], 'manager': r[3], 'score': 1.0} for r in rows]
+
+    grams = trigrams(normalized, prefix=True)
+    hits = _trigram_hits(conn, grams, LOOKUP_CANDIDATES)
+    if not hits:
+        return []
+    placeholders = ','.join('?' * len(hits))
+    vendors = {row[0]: row for row in conn.execute(
+        f'SELECT id, name, phone, manager, normalized_name, trigram_count FROM vendors WHERE id IN ({placeholders})',
+        [h[0] for h in hits])}
+
+    results = []
+    for vendor_id, shared in hits:
+        _, name, phone, manager, vendor_normalized, trigram_count = vendors[vendor_id]
+        score = shared / (len(grams) + trigram_count - shared)
+        if vendor_normalized.startswith(normalized):
+            score += 1.0
+        results.append({'id': vendor_id, 'name': name, 'phone': phone, 'manager': manager, 'score': score})
+    results.sort(key=lambda r: (-r['score'], r['name']))
+    return results[:limit]
+
+
+def event_vendor_records(document: Dict[str, Any]) -> Iterable[Tuple[str, str, str]]:
+    for component in (document.get('components') or {}).values():
+        if component.get('vendor_name'):
+            yield component['vendor_name'], component.get('vendor_contact', ''), component.get('vendor_manager', '')
+
+
+def _register_all(conn: sqlite3.Connection, records: Iterable[Tuple[str, str, str]]) -> int:
+    # 같은 정규화 이름은 메모리에서 먼저 합쳐 DB 조회 횟수를 줄임
+    merged: Dict[str, List[str]] = {}
+    for name, phone, manager in records:
+        normalized = normalize_vendor_name(name)
+        if not normalized:
+            continue
+        record = merged.setdefault(normalized, [name, '', ''])
+        record[1] = record[1] or (phone or '')
+        record[2] = record[2] or (manager or '')
+    for name, phone, manager in merged.values():
+        register_vendor(conn, name, phone, manager)
+    return len(merged)
+
+
+def _sync_events(event_conn: sqlite3.Connection, budget_conn: sqlite3.Connection, batch_size: int) -> int:
+    install_outbox(event_conn, EVENT_TABLES)
+    processed = 0
+    for changes in tail(event_conn, budget_conn, EVENT_CONSUMER, (ENTITY_EVENT,), batch_size):
+        event_ids = sorted(event_id for (_, event_id), change in latest_changes(changes).items()
+                           if change.op != OP_DELETE)
+        placeholders = ','.join('?' * len(event_ids))
+        rows = event_conn.execute(f'SELECT event_data FROM events WHERE id IN ({placeholders})', event_ids)
+        with budget_conn:
+            _register_all(budget_conn, (record for row in rows for record in event_vendor_records(decode_event(row[0]))))
+            set_offset(budget_conn, EVENT_CONSUMER, changes[-1].seq)
+        processed += len(changes)
+    return processed
+
+
+def _sync_expenses(budget_conn: sqlite3.Connection, batch_size: int) -> int:
+    # 새 지출과 협력사가 바뀐 지출 요청 (삭제는 디렉토리에 영향 없음)
+    processed = 0
+    for changes in tail(budget_conn, budget_conn, EXPENSE_CONSUMER, tuple(EXPENSE_SOURCES), batch_size):
+        latest = latest_changes(changes)
+        partners = []
+        for entity, table in EXPENSE_SOURCES.items():
+            ids = sorted(entity_id for (changed_entity, entity_id), change in latest.items()
+                         if changed_entity == entity and change.op != OP_DELETE)
+            if ids:
+                placeholders = ','.join('?' * len(ids))
+                partners.extend(row[0] for row in budget_conn.execute(
+                    f'SELECT 협력사 FROM {table} WHERE id IN ({placeholders})', ids))
+        with budget_conn:
+            _register_all(budget_conn, ((partner, '', '') for partner in partners))
+            set_offset(budget_conn, EXPENSE_CONSUMER, changes[-1].seq)
+        processed += len(changes)
+    return processed
+
+
+def sync_vendors(event_db: Optional[str], budget_db: str, batch_size: int = BATCH_SIZE) -> int:
+    # 처음 실행하면 두 DB의 기존 데이터 전체를 배치 단위로 일괄 등록하고, 이후에는 새로 생긴 데이터만 반영
+    if not os.path.exists(budget_db):
+        logging.warning(f"예산 DB를 찾을 수 없어 업체 동기화를 건너뜁니다: {budget_db}")
+        return 0
+
+    budget_conn = sqlite3.connect(budget_db, timeout=5)
+    try:
+        ensure_vendor_schema(budget_conn)
+        processed = _sync_expenses(budget_conn, batch_size)
+        if event_db and os.path.exists(event_db):
+            event_conn = sqlite3.connect(event_db, timeout=5)
+            try:
+                processed += _sync_events(event_conn, budget_conn, batch_size)
+            finally:
+                event_conn.close()
+        return processed
+    finally:
+        budget_conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이벤트/지출 데이터 -> 협력사 디렉토리 동기화")
+    parser.add_argument('--event-db', default='event_planner.db')
+    parser.add_argument('--budget-db', required=True)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--lookup', help="동기화 후 업체명 검색")
+    args = parser.parse_args()
+
+    print(f"{sync_vendors(args.event_db, args.budget_db, args.batch_size)}건을 반영했습니다.")
+    if args.lookup:
+        conn = sqlite3.connect(args.budget_db)
+        try:
+            for vendor in lookup_vendors(conn, args.lookup):
+                print(f"{vendor['name']}\t{vendor['phone']}\t{vendor['manager']}\t{vendor['score']:.2f}")
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    main()
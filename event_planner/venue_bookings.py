@@ -0,0 +1,157 @@
+import argparse
+import re
+import sqlite3
+import unicodedata
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from serialization import decode_event
+
+# 장소 중복 예약 확인
+#
+# venue_bookings: 오프라인 이벤트의 장소명/주소별 점유 구간(셋업일~철수일, date.toordinal 정수)
+#   (venue_key, start_day) 인덱스로 정렬된 구간 테이블
+# venue_spans: 장소별 가장 긴 점유 기간
+#
+# 겹치는 구간은 start_day <= 조회 종료일 AND end_day >= 조회 시작일 이다. start_day는
+# 조회 시작일 - 가장 긴 기간 보다 작을 수 없으므로 start_day 범위 검색 한 번(O(log n + 후보 수))으로 찾는다.
+# save_event_data가 같은 트랜잭션에서 이벤트의 예약을 다시 쓴다.
+
+OFFLINE_EVENT_TYPE = "오프라인 이벤트"
+ONLINE_VENUE = "온라인"
+KIND_NAME = 'name'
+KIND_ADDRESS = 'address'
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def ensure_booking_schema(conn: sqlite3.Connection) -> bool:
+    # 테이블을 새로 만들었으면 True (기존 이벤트로 채워야 함)
+    created = not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'venue_bookings'").fetchone()
+    conn.executescript('''
+    CREATE TABLE IF NOT EXISTS venue_bookings (
+        event_id INTEGER NOT NULL,
+        venue_key TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        label TEXT NOT NULL,
+        event_name TEXT NOT NULL,
+        start_day INTEGER NOT NULL,
+        end_day INTEGER NOT NULL,
+        PRIMARY KEY (event_id, venue_key)
+    );
+    CREATE INDEX IF NOT EXISTS idx_venue_bookings_interval ON venue_bookings (venue_key, start_day);
+    CREATE TABLE IF NOT EXISTS venue_spans (
+        venue_key TEXT PRIMARY KEY,
+        max_length INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    ''')
+    return created
+
+
+def normalize_venue(text: Optional[str]) -> str:
+    # 대소문자/전각 문자/공백/기호 차이를 무시
+    return _NON_WORD.sub('', unicodedata.normalize('NFKC', text or '').lower())
+
+
+def venue_keys(name: Optional[str], address: Optional[str]) -> List[Tuple[str, str, str]]:
+    # (venue_key, 종류, 표시용 값). 장소명과 주소 중 하나만 같아도 같은 장소로 봄
+    keys = []
+    for kind, value in ((KIND_NAME, name), (KIND_ADDRESS, address)):
+        normalized = normalize_venue(value)
+        if normalized and value.strip() != ONLINE_VENUE:
+            keys.append((f"{kind}:{normalized}", kind, value.strip()))
+    return keys
+
+
+def occupancy(document: Dict[str, Any]) -> Optional[Tuple[date, date]]:
+    # 장소를 점유하는 기간 (셋업일~철수일, 없으면 시작일~종료일). 오프라인 이벤트가 아니면 None
+    if document.get('event_type') != OFFLINE_EVENT_TYPE or document.get('venue_type') == ONLINE_VENUE:
+        return None
+    start = document.get('setup_date') or document.get('start_date')
+    end = document.get('teardown_date') or document.get('end_date') or start
+    if not isinstance(start, date) or not isinstance(end, date):
+        return None
+    return (start, end) if start <= end else (end, start)
+
+
+def refresh_event_bookings(conn: sqlite3.Connection, event_id: int, document: Dict[str, Any]) -> None:
+    # 호출하는 쪽의 트랜잭션 안에서 실행
+    conn.execute('DELETE FROM venue_bookings WHERE event_id = ?', (event_id,))
+    period = occupancy(document)
+    if period is None:
+        return
+    start_day, end_day = period[0].toordinal(), period[1].toordinal()
+    rows = {}
+    for venue in document.get('venues') or []:
+        for key, kind, label in venue_keys(venue.get('name'), venue.get('address')):
+            rows[key] = (event_id, key, kind, label, document.get('event_name') or '', start_day, end_day)
+    conn.executemany('''
+    INSERT INTO venue_bookings (event_id, venue_key, kind, label, event_name, start_day, end_day)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', list(rows.values()))
+    conn.executemany('''
+    INSERT INTO venue_spans (venue_key, max_length) VALUES (?, ?)
+    ON CONFLICT(venue_key) DO UPDATE SET max_length = MAX(max_length, excluded.max_length)
+    ''', [(key, end_day - start_day) for key in rows])
+
+
+def rebuild_bookings(conn: sqlite3.Connection) -> int:
+    # 전체 이벤트로부터 예약 테이블을 다시 만듦. 처리한 이벤트 수를 반환
+    with conn:
+        conn.execute('DELETE FROM venue_bookings')
+        conn.execute('DELETE FROM venue_spans')
+        count = 0
+        for event_id, stored in conn.execute('SELECT id, event_data FROM events').fetchall():
+            refresh_event_bookings(conn, event_id, decode_event(stored))
+            count += 1
+    return count
+
+
+def find_conflicts(conn: sqlite3.Connection, venues: Sequence[Tuple[str, str]], start: date, end: date,
+                   exclude_event_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    # venues: [(장소명, 주소), ...]. 같은 장소를 겹치는 기간에 점유하는 다른 이벤트 목록
+    if start > end:
+        start, end = end, start
+    start_day, end_day = start.toordinal(), end.toordinal()
+    conflicts, seen = [], set()
+    for name, address in venues:
+        for key, kind, _ in venue_keys(name, address):
+            span = conn.execute('SELECT max_length FROM venue_spans WHERE venue_key = ?', (key,)).fetchone()
+            if span is None:
+                continue
+            rows = conn.execute('''
+            SELECT event_id, label, event_name, start_day, end_day FROM venue_bookings
+            WHERE venue_key = ? AND start_day BETWEEN ? AND ? AND end_day >= ? AND event_id IS NOT ?
+            ORDER BY start_day
+            ''', (key, start_day - span[0], end_day, start_day, exclude_event_id))
+            for event_id, label, event_name, booked_start, booked_end in rows:
+                if (event_id, key) in seen:
+                    continue
+                seen.add((event_id, key))
+                conflicts.append({
+                    'event_id': event_id,
+                    'event_name': event_name,
+                    'kind': kind,
+                    'venue': label,
+                    'start': date.fromordinal(booked_start),
+                    'end': date.fromordinal(booked_end),
+                })
+    return conflicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="장소 예약 테이블 재생성")
+    parser.add_argument('--event-db', default='event_planner.db')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.event_db)
+    try:
+        ensure_booking_schema(conn)
+        print(f"{rebuild_bookings(conn)}개 이벤트로 장소 예약 테이블을 다시 만들었습니다.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,37 @@
 import streamlit as st
 import pandas as pd
 from streamlit_option_menu import option_menu
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 import openai
 from dotenv import load_dotenv
 
 import os
-from io import BytesIO  # BytesIO를 io 모듈에서 import
+import sys
 import openpyxl
 
+from llm_convert import convert_records
+from excel_reader import list_sheets, sheet_row_count, read_page, iter_records
+from budget_analytics import MAX_FORECAST_DAYS, BurnRateAnalytics
+from upload_merge import STATUS_LABELS, STATUS_NEW, STATUS_MODIFIED, ensure_fingerprint_schema, plan_merge, apply_merge
+from budget_grid import GridQuery, PAGE_SIZES, SORT_COLUMNS, count_rows, load_page, save_row_edits
+
+# budget.db 스키마 마이그레이션은 event_planner와 같은 목록을 사용 (event_planner/migrations.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'event_planner'))
+from migrations import BUDGET_MIGRATIONS, migrate  # noqa: E402
+
 # 데이터베이스 연결 설정
 DATABASE = os.path.join(os.getcwd(), 'budget.db')
-engine = create_engine(f'sqlite:///{DATABASE}')
+BUSY_TIMEOUT_MS = 5000
+engine = create_engine(f'sqlite:///{DATABASE}', connect_args={'timeout': BUSY_TIMEOUT_MS / 1000})
+
+# 여러 사용자가 동시에 읽고 쓸 수 있도록 WAL 모드와 busy timeout 설정
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
@@ -19,6 +39,26 @@ load_dotenv()
 # OpenAI API 키 설정
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+BUDGET_ITEM_COLUMNS = ['대분류', '항목명', '단가', '개수1', '단위1', '개수2', '단위2', '배정예산']
+
+# 반려된 요청은 잔액 계산에서 제외
+EXPENSE_REQUEST_STATUSES = ['요청', '승인', '반려']
+
+# 항목별 요청 합계와 잔액 (expense_requests 인덱스를 통한 집계)
+BUDGET_WITH_BALANCE_QUERY = """
+    SELECT bi.id, bi.대분류, bi.항목명, bi.단가, bi.개수1, bi.단위1, bi.개수2, bi.단위2, bi.배정예산, bi.version,
+           bi.source_key,
+           COALESCE(r.요청합계, 0) AS 요청합계,
+           bi.배정예산 - COALESCE(r.요청합계, 0) AS 잔액
+    FROM budget_items bi
+    LEFT JOIN (
+        SELECT budget_item_id, SUM(요청금액) AS 요청합계
+        FROM expense_requests
+        WHERE 상태 != '반려'
+        GROUP BY budget_item_id
+    ) r ON r.budget_item_id = bi.id
+"""
+
 def create_tables():
     with engine.connect() as conn:
         conn.execute(text("""
@@ -31,7 +71,9 @@ def create_tables():
                 단위1 TEXT,
                 개수2 INTEGER,
                 단위2 TEXT,
-                배정예산 INTEGER
+                배정예산 INTEGER,
+                version INTEGER NOT NULL DEFAULT 1,
+                source_key TEXT
             )
         """))
         conn.execute(text("""
@@ -44,20 +86,345 @@ def create_tables():
                 FOREIGN KEY (budget_item_id) REFERENCES budget_items (id)
             )
         """))
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS expense_requests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                budget_item_id INTEGER NOT NULL,
+                요청금액 INTEGER NOT NULL,
+                협력사 TEXT,
+                상태 TEXT NOT NULL DEFAULT '요청',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (budget_item_id) REFERENCES budget_items (id)
+            )
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_expense_requests_item
+            ON expense_requests (budget_item_id, 상태)
+        """))
+        ensure_fingerprint_schema(conn)
         conn.commit()
 
+    # 예전 DB의 스키마 변경(id 기본 키, 예전 열 정리, version/source_key 등)은 버전별 마이그레이션으로 적용
+    raw_conn = engine.raw_connection()
+    try:
+        migrate(raw_conn.driver_connection, BUDGET_MIGRATIONS)
+    finally:
+        raw_conn.close()
+
+def load_vendor_names(conn):
+    # 협력사 디렉토리(vendors)는 event_planner/vendor_directory.py가 채움. 아직 없으면 빈 목록
+    exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vendors'")).fetchone()
+    if not exists:
+        return []
+    return [row[0] for row in conn.execute(text("SELECT name FROM vendors ORDER BY name"))]
+
+def partner_input(key):
+    # 등록된 협력사는 선택 상자에서 입력해 검색하고, 없으면 직접 입력
+    with engine.connect() as conn:
+        vendor_names = load_vendor_names(conn)
+    if not vendor_names:
+        return st.text_input("협력사", key=f"{key}_text")
+    choice = st.selectbox("협력사", ["직접 입력"] + vendor_names, key=f"{key}_select")
+    typed = st.text_input("협력사 직접 입력", key=f"{key}_text")
+    return typed if choice == "직접 입력" else choice
+
+def load_price_stats(conn, scope, keys):
+    # 과거 단가 색인(price_bucket_ranks)은 event_planner/price_index.py가 만들고 budget_items 트리거로 갱신됨
+    # scope: 'item'(항목명) 또는 'category'(대분류). 아직 없으면 빈 결과
+    keys = sorted({key.strip() for key in keys if isinstance(key, str) and key.strip()})
+    exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'price_bucket_ranks'")).fetchone()
+    if not exists or not keys:
+        return pd.DataFrame(columns=['key', '건수', '하위25%', '중앙값', '상위25%'])
+    params = {f"key{i}": key for i, key in enumerate(keys)}
+    return pd.read_sql_query(text(f"""
+        SELECT key, MAX(total) AS 건수,
+               ROUND(MIN(CASE WHEN cumulative >= 0.25 * total THEN value END)) AS "하위25%",
+               ROUND(MIN(CASE WHEN cumulative >= 0.5 * total THEN value END)) AS 중앙값,
+               ROUND(MIN(CASE WHEN cumulative >= 0.75 * total THEN value END)) AS "상위25%"
+        FROM price_bucket_ranks
+        WHERE scope = :scope AND key IN ({', '.join(':' + name for name in params)})
+        GROUP BY key
+    """), conn, params={"scope": scope, **params})
+
+def show_price_reference(edited_df, category):
+    # 편집 중인 항목의 과거 단가 분포와 중앙값 기준 예상 배정예산 (개수1 x 개수2)
+    with engine.connect() as conn:
+        item_stats = load_price_stats(conn, 'item', edited_df['항목명'].dropna())
+        category_stats = load_price_stats(conn, 'category', [category] if category else [])
+    if item_stats.empty and category_stats.empty:
+        return
+
+    with st.expander("과거 단가 참고", expanded=True):
+        if not category_stats.empty:
+            stats = category_stats.iloc[0]
+            st.caption(f"'{category}' 대분류 단가 ({int(stats['건수']):,}건): 중앙값 ₩{stats['중앙값']:,.0f} "
+                       f"(25~75%: ₩{stats['하위25%']:,.0f} ~ ₩{stats['상위25%']:,.0f})")
+        if not item_stats.empty:
+            reference = edited_df[['항목명', '단가', '개수1', '개수2']].merge(
+                item_stats.rename(columns={'key': '항목명'}), on='항목명')
+            reference['예상배정예산'] = reference['중앙값'] * reference['개수1'].fillna(1) * reference['개수2'].fillna(1)
+            st.dataframe(
+                reference[['항목명', '단가', '건수', '하위25%', '중앙값', '상위25%', '예상배정예산']],
+                column_config={
+                    "단가": st.column_config.NumberColumn("입력 단가", format="₩%d"),
+                    "하위25%": st.column_config.NumberColumn(format="₩%d"),
+                    "중앙값": st.column_config.NumberColumn(format="₩%d"),
+                    "상위25%": st.column_config.NumberColumn(format="₩%d"),
+                    "예상배정예산": st.column_config.NumberColumn("예상 배정예산 (중앙값 기준)", format="₩%d"),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+
+def load_budget_with_balance(conn, category=None):
+    query = BUDGET_WITH_BALANCE_QUERY
+    params = {}
+    if category is not None:
+        query += " WHERE bi.대분류 = :category"
+        params['category'] = category
+    return pd.read_sql_query(text(query + " ORDER BY bi.id"), conn, params=params)
+
+def load_categories(conn):
+    # 대분류 목록 (처음 등록된 순서)
+    return [row[0] for row in conn.execute(text("""
+        SELECT 대분류 FROM budget_items WHERE 대분류 IS NOT NULL GROUP BY 대분류 ORDER BY MIN(id)
+    """))]
+
+def load_category_items(conn, category):
+    return dict(conn.execute(text("""
+        SELECT id, 항목명 FROM budget_items WHERE 대분류 = :category AND 항목명 IS NOT NULL ORDER BY id
+    """), {"category": category}).fetchall())
+
+def add_expense_request(conn, item_id, amount, partner):
+    # 잔액 확인과 INSERT를 한 문장으로 처리하여 동시 요청 시에도 잔액을 초과하지 않도록 함
+    result = conn.execute(text("""
+        INSERT INTO expense_requests (budget_item_id, 요청금액, 협력사)
+        SELECT bi.id, :amount, :partner
+        FROM budget_items bi
+        WHERE bi.id = :item_id
+          AND bi.배정예산 - COALESCE((
+              SELECT SUM(요청금액) FROM expense_requests
+              WHERE budget_item_id = :item_id AND 상태 != '반려'
+          ), 0) >= :amount
+    """), {"item_id": item_id, "amount": amount, "partner": partner})
+    return result.rowcount == 1
+
+def update_expense_request_status(conn, request_id, status):
+    # 반려에서 다른 상태로 되돌리면 요청금액이 다시 잔액에서 빠지므로 add_expense_request와 같은 잔액 조건을 같은 문장에서 확인
+    result = conn.execute(text("""
+        UPDATE expense_requests SET 상태 = :status, updated_at = CURRENT_TIMESTAMP
+        WHERE id = :id
+          AND (상태 != '반려' OR :status = '반려' OR (
+              SELECT bi.배정예산 - COALESCE((
+                  SELECT SUM(er.요청금액) FROM expense_requests er
+                  WHERE er.budget_item_id = bi.id AND er.상태 != '반려'
+              ), 0)
+              FROM budget_items bi
+              WHERE bi.id = expense_requests.budget_item_id
+          ) >= 요청금액)
+    """), {"status": status, "id": request_id})
+    return result.rowcount == 1
+
+def _to_db_value(value):
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+def _fetch_budget_item(conn, item_id):
+    row = conn.execute(text(f"""
+        SELECT id, {', '.join(BUDGET_ITEM_COLUMNS)}, version FROM budget_items WHERE id = :id
+    """), {"id": item_id}).mappings().fetchone()
+    return dict(row) if row else None
+
+def save_category_items(conn, category, original_df, edited_df):
+    # 대분류 단위로 변경된 행만 INSERT/UPDATE/DELETE
+    # UPDATE/DELETE는 읽어온 version과 일치할 때만 적용 (낙관적 잠금)
+    # 충돌한 행 목록을 반환하며, 충돌이 있으면 호출 측에서 rollback 해야 함
+    original = {
+        int(record['id']): record
+        for record in original_df[['id', 'version'] + BUDGET_ITEM_COLUMNS].to_dict(orient='records')
+    }
+    conflicts = []
+    kept_ids = set()
+
+    for record in edited_df[['id', 'version'] + BUDGET_ITEM_COLUMNS].to_dict(orient='records'):
+        record = {key: _to_db_value(value) for key, value in record.items()}
+        item_id = record.pop('id')
+        version = record.pop('version')
+
+        if item_id is None:
+            conn.execute(text("""
+                INSERT INTO budget_items (대분류, 항목명, 단가, 개수1, 단위1, 개수2, 단위2, 배정예산)
+                VALUES (:대분류, :항목명, :단가, :개수1, :단위1, :개수2, :단위2, :배정예산)
+            """), record)
+            continue
+
+        item_id = int(item_id)
+        kept_ids.add(item_id)
+        before = original.get(item_id)
+        if before is not None and all(_to_db_value(before[col]) == record[col] for col in BUDGET_ITEM_COLUMNS):
+            continue
+
+        result = conn.execute(text("""
+            UPDATE budget_items
+            SET 대분류 = :대분류, 항목명 = :항목명, 단가 = :단가, 개수1 = :개수1, 단위1 = :단위1,
+                개수2 = :개수2, 단위2 = :단위2, 배정예산 = :배정예산, version = version + 1
+            WHERE id = :id AND version = :version
+        """), {**record, "id": item_id, "version": int(version)})
+        if result.rowcount == 0:
+            conflicts.append({"id": item_id, "mine": record, "theirs": _fetch_budget_item(conn, item_id)})
+
+    # 편집 화면에 있던 행 중 사용자가 삭제한 행만 삭제 (다른 사용자가 추가한 행은 유지)
+    for item_id in set(original) - kept_ids:
+        result = conn.execute(text("DELETE FROM budget_items WHERE id = :id AND version = :version"),
+                              {"id": item_id, "version": int(original[item_id]['version'])})
+        if result.rowcount == 0:
+            theirs = _fetch_budget_item(conn, item_id)
+            if theirs is not None:
+                conflicts.append({"id": item_id, "mine": None, "theirs": theirs})
+
+    return conflicts
+
+def resolve_conflicts_with_mine(edited_df, conflicts):
+    # 충돌 행의 version을 현재 DB 값으로 맞춰 내 변경 사항으로 다시 저장할 수 있게 함
+    resolved = edited_df.copy()
+    for conflict in conflicts:
+        mask = resolved['id'] == conflict['id']
+        if conflict['theirs'] is None:
+            resolved.loc[mask, 'id'] = None  # 다른 사용자가 삭제한 행은 새 행으로 추가
+        else:
+            resolved.loc[mask, 'version'] = conflict['theirs']['version']
+    return resolved
+
+def save_budget_category(category, original_df, edited_df):
+    with engine.connect() as conn:
+        conflicts = save_category_items(conn, category, original_df, edited_df)
+        if conflicts:
+            conn.rollback()
+        else:
+            conn.commit()
+    return conflicts
+
+def show_budget_conflicts(category, editor_key, snapshot_key):
+    state = st.session_state.budget_conflicts
+    st.warning(f"다른 사용자가 '{category}'의 항목 {len(state['conflicts'])}건을 먼저 수정했습니다. 저장할 값을 선택해주세요.")
+
+    for conflict in state['conflicts']:
+        theirs = conflict['theirs']
+        st.write(f"항목 id {conflict['id']}")
+        comparison = pd.DataFrame(
+            # 다른 사용자가 삭제한 행은 현재 값 대신 (삭제됨) 표시
+            [conflict['mine'] or {"항목명": "(삭제)"},
+             {col: theirs[col] for col in BUDGET_ITEM_COLUMNS} if theirs is not None else {"항목명": "(삭제됨)"}],
+            index=["내 변경", "현재 저장된 값"]
+        )
+        st.dataframe(comparison, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("내 변경 사항으로 덮어쓰기"):
+            edited_df = resolve_conflicts_with_mine(state['edited_df'], state['conflicts'])
+            # 내가 삭제한 행이 다른 사용자에 의해 수정된 경우 현재 version으로 삭제
+            original_df = state['original_df'].copy()
+            for conflict in state['conflicts']:
+                if conflict['mine'] is None:
+                    original_df.loc[original_df['id'] == conflict['id'], 'version'] = conflict['theirs']['version']
+            conflicts = save_budget_category(category, original_df, edited_df)
+            if conflicts:
+                state.update(conflicts=conflicts)
+                st.rerun()
+            del st.session_state.budget_conflicts
+            st.session_state.pop(snapshot_key, None)
+            st.session_state.pop(editor_key, None)
+            st.session_state.budget_saved = True
+            st.rerun()
+    with col2:
+        if st.button("다른 사용자 변경 사항 유지"):
+            del st.session_state.budget_conflicts
+            st.session_state.pop(snapshot_key, None)
+            st.session_state.pop(editor_key, None)
+            st.rerun()
+
+def save_grid_edits(editor_key):
+    # data_editor의 on_change: 바뀐 행만 행마다 저장하고, 편집기를 새 키로 바꿔 저장된 값으로 다시 불러옴
+    edited_rows = st.session_state[editor_key]['edited_rows']
+    if not edited_rows:
+        return
+    with engine.connect() as conn:
+        conflicts, read_only = save_row_edits(conn, st.session_state.budget_grid_page, edited_rows)
+    st.session_state.budget_grid_result = (len(edited_rows) - len(conflicts) - len(read_only), conflicts, read_only)
+    st.session_state.budget_grid_generation = st.session_state.get('budget_grid_generation', 0) + 1
+
+def budget_grid(categories):
+    col1, col2, col3, col4 = st.columns([3, 3, 2, 1])
+    with col1:
+        filter_categories = st.multiselect("대분류 필터", options=categories, key="budget_grid_categories")
+    with col2:
+        search = st.text_input("항목명 검색", key="budget_grid_search")
+    with col3:
+        sort = st.selectbox("정렬", options=list(SORT_COLUMNS), key="budget_grid_sort")
+    with col4:
+        descending = st.toggle("내림차순", key="budget_grid_descending")
+    query = GridQuery(tuple(filter_categories), search, sort, descending)
+
+    with engine.connect() as conn:
+        total_rows = count_rows(conn, query)
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page_size = st.selectbox("페이지당 행 수", options=PAGE_SIZES, key="budget_grid_page_size")
+    page_count = max(-(-total_rows // page_size), 1)
+    # 필터를 바꿔 페이지 수가 줄면 마지막 페이지로
+    if st.session_state.get('budget_grid_page_number', 1) > page_count:
+        st.session_state.budget_grid_page_number = page_count
+    with col2:
+        page = st.number_input("페이지", min_value=1, max_value=page_count, step=1, key="budget_grid_page_number") - 1
+    with engine.connect() as conn:
+        page_df = load_page(conn, query, page, page_size)
+    st.session_state.budget_grid_page = page_df
+    st.caption(f"총 {total_rows:,}행, {page + 1}/{page_count} 페이지")
+
+    editor_key = f"budget_grid_editor_{st.session_state.get('budget_grid_generation', 0)}"
+    st.data_editor(
+        page_df,
+        column_config={
+            "id": None,
+            "version": None,
+            "대분류": st.column_config.TextColumn(required=True, width="medium"),
+            "항목명": st.column_config.TextColumn(required=True, width="large"),
+            "단가": st.column_config.NumberColumn(required=True, min_value=0, width="medium", format="₩%d"),
+            "개수1": st.column_config.NumberColumn(required=True, min_value=1, step=1, width="small"),
+            "단위1": st.column_config.TextColumn(required=True, width="small"),
+            "개수2": st.column_config.NumberColumn(required=True, min_value=1, step=1, width="small"),
+            "단위2": st.column_config.TextColumn(required=True, width="small"),
+            "배정예산": st.column_config.NumberColumn(required=True, format="₩%d", width="medium", disabled=True),
+            "요청합계": st.column_config.NumberColumn(format="₩%d", width="medium", disabled=True),
+            "잔액": st.column_config.NumberColumn(required=True, format="₩%d", width="medium", disabled=True),
+            "source_key": st.column_config.TextColumn("동기화 원본 (수정 불가)", width="medium", disabled=True),
+        },
+        hide_index=True,
+        use_container_width=True,
+        disabled=["배정예산", "요청합계", "잔액", "source_key"],
+        key=editor_key,
+        on_change=save_grid_edits,
+        args=(editor_key,)
+    )
+
+    if 'budget_grid_result' in st.session_state:
+        saved, conflicts, read_only = st.session_state.pop('budget_grid_result')
+        if saved:
+            st.success(f"{saved}개 행이 저장되었습니다.")
+        if conflicts:
+            st.warning(f"다른 사용자가 먼저 수정한 행(id {', '.join(map(str, conflicts))})은 저장하지 않고 최신 값으로 다시 불러왔습니다.")
+        if read_only:
+            st.warning(f"이벤트에서 동기화된 행(id {', '.join(map(str, read_only))})은 이벤트 플래너에서 수정해주세요.")
+
 def budget_input():
     st.subheader("예산 항목 입력")
     
-    # 데이터베이스에서 기존 데이터 불러오기
-    with engine.connect() as conn:
-        df = pd.read_sql_query(text("SELECT * FROM budget_items"), conn)
-    
-    if df.empty:
-        df = pd.DataFrame(columns=['대분류', '항목명', '단가', '개수1', '단위1', '개수2', '단위2'])
-    
     # 기존 대분류 목록
-    existing_categories = list(df['대분류'].unique())
+    with engine.connect() as conn:
+        existing_categories = load_categories(conn)
     
     # 새 대분류 입력
     new_category = st.text_input("새 대분류 이름 (기존 대분류 수정 또는 새로 추가)")
@@ -67,11 +434,34 @@ def budget_input():
     selected_category = st.selectbox("대분류 선택", options=all_categories)
     
     # 선택된 대분류에 대한 항목 표시 및 편집
-    category_df = df[df['대분류'] == selected_category] if selected_category in existing_categories else pd.DataFrame(columns=df.columns)
+    # 편집을 시작한 시점의 행/버전을 스냅샷으로 보관하여 저장 시 충돌 여부를 확인
+    editor_key = f"budget_editor_{selected_category}"
+    snapshot_key = f"budget_snapshot_{selected_category}"
+    if snapshot_key not in st.session_state:
+        # 선택한 대분류의 행만 불러옴 (잔액은 SQL 집계로 계산)
+        with engine.connect() as conn:
+            st.session_state[snapshot_key] = load_budget_with_balance(conn, selected_category or '')
+    # event_planner에서 동기화된 행(source_key)은 다음 동기화에서 덮어쓰이므로 편집 대상에서 제외
+    snapshot = st.session_state[snapshot_key]
+    category_df = snapshot[snapshot['source_key'].isna()]
+    synced_df = snapshot[snapshot['source_key'].notna()]
+    if not synced_df.empty:
+        st.caption("이벤트에서 동기화된 항목 (이벤트 플래너에서 수정)")
+        st.dataframe(
+            synced_df[['항목명', '단가', '개수1', '단위1', '개수2', '단위2', '배정예산']],
+            column_config={
+                "단가": st.column_config.NumberColumn(format="₩%d"),
+                "배정예산": st.column_config.NumberColumn(format="₩%d"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
     
     edited_df = st.data_editor(
-        category_df,
+        category_df[['id', 'version', '항목명', '단가', '개수1', '단위1', '개수2', '단위2']],
         column_config={
+            "id": None,
+            "version": None,
             "항목명": st.column_config.TextColumn(required=True, width="large"),
             "단가": st.column_config.NumberColumn(required=True, min_value=0, width="medium", format="₩%d"),
             "개수1": st.column_config.NumberColumn(required=True, min_value=1, step=1, width="small"),
@@ -81,59 +471,49 @@ def budget_input():
         },
         hide_index=True,
         num_rows="dynamic",
-        key=f"budget_editor_{selected_category}"
+        key=editor_key
     )
     
     # 대분류 열 추가
     edited_df['대분류'] = selected_category
     
     # 배정예산 계산
-    edited_df['배정예산'] = (edited_df['단가'] * edited_df['개수1'] * edited_df['개수2']).astype(int)
-    
-    # 지출희망금액 열 추가
-    for col in ['지출희망금액1', '지출희망금액2', '지출희망금액3']:
-        if col not in edited_df.columns:
-            edited_df[col] = 0
-    
-    # 잔액 계산
-    edited_df['잔액'] = (edited_df['배정예산'] - 
-                         edited_df['지출희망금액1'].fillna(0) - 
-                         edited_df['지출희망금액2'].fillna(0) - 
-                         edited_df['지출희망금액3'].fillna(0)).astype(int)
-
-    if st.button("저장"):
-        # 기존 데이터프레임 업데이트
-        df = df[df['대분류'] != selected_category]  # 현재 대분류 데이터 제거
-        df = pd.concat([df, edited_df], ignore_index=True)  # 새로운 데이터 추가
-        
-        # 데이터베이스에 저장
-        with engine.connect() as conn:
-            df.to_sql('budget_items', conn, if_exists='replace', index=False)
+    edited_df['배정예산'] = (edited_df['단가'].fillna(0) * edited_df['개수1'].fillna(0) * edited_df['개수2'].fillna(0)).astype(int)
+
+    # 과거 단가 분포 참고
+    show_price_reference(edited_df, selected_category)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("저장") and selected_category:
+            conflicts = save_budget_category(selected_category, category_df, edited_df)
+            if conflicts:
+                st.session_state.budget_conflicts = {
+                    'category': selected_category,
+                    'conflicts': conflicts,
+                    'original_df': category_df,
+                    'edited_df': edited_df,
+                }
+            else:
+                st.session_state.pop(snapshot_key, None)
+                st.session_state.pop(editor_key, None)
+                st.session_state.budget_saved = True
+                st.rerun()
+    with col2:
+        if st.button("최신 데이터 불러오기"):
+            st.session_state.pop(snapshot_key, None)
+            st.session_state.pop(editor_key, None)
+            st.rerun()
+
+    if st.session_state.pop('budget_saved', False):
         st.success("데이터가 성공적으로 저장되었습니다.")
+
+    if 'budget_conflicts' in st.session_state and st.session_state.budget_conflicts['category'] == selected_category:
+        show_budget_conflicts(selected_category, editor_key, snapshot_key)
     
-    # 전체 예산 항목 표시
+    # 전체 예산 항목 표시 (보이는 페이지만 불러와 편집)
     st.subheader("전체 예산 항목")
-    st.data_editor(
-        df,
-        column_config={
-            "대분류": st.column_config.TextColumn(required=True, width="medium"),
-            "항목명": st.column_config.TextColumn(required=True, width="large"),
-            "단가": st.column_config.NumberColumn(required=True, min_value=0, width="medium", format="₩%d"),
-            "개수1": st.column_config.NumberColumn(required=True, min_value=1, step=1, width="small"),
-            "단위1": st.column_config.TextColumn(required=True, width="small"),
-            "개수2": st.column_config.NumberColumn(required=True, min_value=1, step=1, width="small"),
-            "단위2": st.column_config.TextColumn(required=True, width="small"),
-            "배정예산": st.column_config.NumberColumn(required=True, format="₩%d", width="medium", disabled=True),
-            "잔액": st.column_config.NumberColumn(required=True, format="₩%d", width="medium", disabled=True),
-            "지출희망금액1": st.column_config.NumberColumn(min_value=0, format="₩%d", width="medium"),
-            "지출희망금액2": st.column_config.NumberColumn(min_value=0, format="��%d", width="medium"),
-            "지출희망금액3": st.column_config.NumberColumn(min_value=0, format="₩%d", width="medium"),
-        },
-        hide_index=True,
-        use_container_width=True,
-        disabled=["배정예산", "잔액"],
-        key="updated_budget_editor"
-    )
+    budget_grid(existing_categories)
     
     # 지출 추가 버튼
     if st.button("지출 추가"):
@@ -143,41 +523,61 @@ def budget_input():
     if 'show_expense_form' in st.session_state and st.session_state.show_expense_form:
         with st.form("expense_form"):
             # 대분류 선택 (빈 값이 아닌 경우만 포함)
-            valid_categories = df['대분류'].dropna().unique().tolist()
-            selected_category = st.selectbox("대분류 선택", options=valid_categories)
+            selected_category = st.selectbox("대분류 선택", options=existing_categories)
             
             # 선택된 대분류에 해당하는 항목명만 표시
-            valid_items = df[df['대분류'] == selected_category]['항목명'].dropna().unique().tolist()
-            selected_item = st.selectbox("항목 선택", options=valid_items)
+            with engine.connect() as conn:
+                item_labels = load_category_items(conn, selected_category)
+            selected_item_id = st.selectbox("항목 선택", options=list(item_labels), format_func=item_labels.get)
             
             expense_amount = st.number_input("지출 희망 금액", min_value=0, step=1, value=0)
-            partner = st.text_input("협력사")
+            partner = partner_input("expense_request_partner")
             
-            if st.form_submit_button("지출 승인 요청"):
-                item_index = df[(df['대분류'] == selected_category) & (df['항목명'] == selected_item)].index[0]
-                if expense_amount <= df.loc[item_index, '잔액']:
-                    # 빈 지출희망금액 열 찾기
-                    for i in range(1, 4):
-                        if pd.isna(df.loc[item_index, f'지출희망금액{i}']):
-                            df.loc[item_index, f'지출희망금액{i}'] = expense_amount
-                            break
-                    else:
-                        st.error("더 이상 지출을 추가할 수 없습니다.")
-                        return
-                    
-                    # 잔액 재계산
-                    df.loc[item_index, '잔액'] = (df.loc[item_index, '배정예산'] - 
-                                                    df.loc[item_index, '지출희망금액1'].fillna(0) - 
-                                                    df.loc[item_index, '지출희망금액2'].fillna(0) - 
-                                                    df.loc[item_index, '지출희망금액3'].fillna(0)).astype(int)
-                    
-                    st.success("지출 승인 요청이 완료되었습니다.")
-                else:
-                    st.error("잔액이 부족합니다.")
-                
-                # 데이터베이스 업데이트
+            if st.form_submit_button("지출 승인 요청") and selected_item_id is not None:
                 with engine.connect() as conn:
-                    df.to_sql('budget_items', conn, if_exists='replace', index=False)
+                    if add_expense_request(conn, int(selected_item_id), expense_amount, partner):
+                        conn.commit()
+                        st.success("지출 승인 요청이 완료되었습니다.")
+                    else:
+                        st.error("잔액이 부족합니다.")
+
+    # 지출 요청 내역
+    with engine.connect() as conn:
+        requests_df = pd.read_sql_query(text("""
+            SELECT er.id, bi.대분류, bi.항목명, er.요청금액, er.협력사, er.상태, er.created_at, er.updated_at
+            FROM expense_requests er
+            JOIN budget_items bi ON bi.id = er.budget_item_id
+            WHERE bi.대분류 = :category
+            ORDER BY er.created_at DESC
+        """), conn, params={"category": selected_category})
+    if not requests_df.empty:
+        st.subheader("지출 요청 내역")
+        edited_requests = st.data_editor(
+            requests_df,
+            column_config={
+                "id": None,
+                "요청금액": st.column_config.NumberColumn(format="₩%d"),
+                "상태": st.column_config.SelectboxColumn(options=EXPENSE_REQUEST_STATUSES, required=True),
+            },
+            hide_index=True,
+            use_container_width=True,
+            disabled=["대분류", "항목명", "요청금액", "협력사", "created_at", "updated_at"],
+            key=f"expense_requests_editor_{selected_category}"
+        )
+        changed = edited_requests[edited_requests['상태'] != requests_df['상태']]
+        if not changed.empty and st.button("요청 상태 저장"):
+            rejected = []
+            with engine.connect() as conn:
+                for _, row in changed.iterrows():
+                    if update_expense_request_status(conn, int(row['id']), row['상태']):
+                        conn.commit()
+                    else:
+                        conn.rollback()
+                        rejected.append(f"{row['항목명']} (₩{int(row['요청금액']):,})")
+            if rejected:
+                st.error(f"잔액이 부족하여 반려 상태에서 되돌리지 못한 요청: {', '.join(rejected)}")
+            if len(rejected) < len(changed):
+                st.success("요청 상태가 저장되었습니다.")
 
 def add_expense():
     st.subheader("지출 추가")
@@ -190,10 +590,10 @@ def add_expense():
     selected_item = st.selectbox("항목 선택", options=budget_items['항목명'].tolist())
     expense_amount = st.number_input("지출 금액", min_value=0, step=1000)
     expense_date = st.date_input("지출 일자")
-    partner = st.text_input("협력사")
+    partner = partner_input("expense_partner")
     
     if st.button("지출 추가"):
-        item_id = budget_items[budget_items['항목명'] == selected_item]['id'].values[0]
+        item_id = int(budget_items[budget_items['항목명'] == selected_item]['id'].values[0])
         
         # 지출 추가
         with engine.connect() as conn:
@@ -205,69 +605,138 @@ def add_expense():
         
         st.success("지출이 추가되었습니다.")
 
+def load_budget_summary(conn):
+    # 예산 항목과 총 지출액 조회
+    return pd.read_sql_query(text("""
+        SELECT bi.*, COALESCE(SUM(e.지출금액), 0) as 총지출액,
+               bi.배정예산 - COALESCE(SUM(e.지출금액), 0) as 잔액
+        FROM budget_items bi
+        LEFT JOIN expenses e ON bi.id = e.budget_item_id
+        GROUP BY bi.id
+    """), conn)
+
 def view_budget():
     st.subheader("예산 및 지출 현황")
     
     with engine.connect() as conn:
-        # 예산 항목과 총 지출액 조회
-        df = pd.read_sql_query(text("""
-            SELECT bi.*, COALESCE(SUM(e.지출금액), 0) as 총지출액,
-                   bi.배정예산 - COALESCE(SUM(e.지출금액), 0) as 잔액
-            FROM budget_items bi
-            LEFT JOIN expenses e ON bi.id = e.budget_item_id
-            GROUP BY bi.id
-        """), conn)
+        df = load_budget_summary(conn)
     
     st.dataframe(df)
 
-def analyze_excel(df):
-    # 데이터프레임을 문자열로 변환
-    df_str = df.to_string()
-    
-    # OpenAI API를 사용하여 데이터 분석
-    response = openai.ChatCompletion.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant that analyzes Excel data and converts it to a specific format."},
-            {"role": "user", "content": f"Analyze this Excel data and convert it to the format with columns: 대분류, 항목명, 단가, 개수1, 단위1, 개수2, 단위2, 배정예산. Here's the data:\n\n{df_str}"}
-        ]
+# 분석 결과는 재실행 간에 유지하고 새 지출만 반영
+@st.cache_resource
+def get_budget_analytics():
+    return BurnRateAnalytics(engine)
+
+def view_analysis():
+    st.subheader("예산 소진 분석")
+
+    analytics = get_budget_analytics()
+    analytics.refresh()
+
+    burn_rate = analytics.burn_rate()
+    if burn_rate.empty:
+        st.info("분석할 예산 항목이 없습니다.")
+        return
+
+    # 너무 먼 소진 예상일은 날짜 대신 '10년 이상'으로 표시
+    burn_rate['예상소진일'] = [
+        "10년 이상" if days > MAX_FORECAST_DAYS else (day.isoformat() if pd.notna(day) else "-")
+        for days, day in zip(burn_rate['잔여일수'], burn_rate['예상소진일'])
+    ]
+
+    st.write("대분류별 소진율 및 예상 소진일")
+    st.dataframe(
+        burn_rate,
+        column_config={
+            "배정예산": st.column_config.NumberColumn(format="₩%d"),
+            "총지출액": st.column_config.NumberColumn(format="₩%d"),
+            "잔액": st.column_config.NumberColumn(format="₩%d"),
+            "일평균지출": st.column_config.NumberColumn(format="₩%d"),
+            "잔여일수": st.column_config.NumberColumn(format="%.0f"),
+        },
+        use_container_width=True
     )
-    
-    # API 응답에서 변환된 데이터 추출
-    converted_data = response.choices[0].message['content']
-    
-    # 변환된 데이터를 데이프레임으로 변환
-    converted_df = pd.read_csv(BytesIO(converted_data.encode()), sep='\s+')
-    
+
+    daily = analytics.daily_spend()
+    if daily.empty:
+        st.info("아직 등록된 지출이 없습니다.")
+        return
+
+    period = st.radio("지출 추이 단위", ["일별", "주별"], horizontal=True)
+    st.write("지출 추이")
+    st.bar_chart(daily if period == "일별" else analytics.weekly_spend())
+
+    st.write("누적 지출")
+    st.line_chart(analytics.cumulative_spend())
+
+def analyze_excel(records):
+    # 시트를 행 청크로 나누어 비동기로 동시에 변환 (llm_convert 참고)
+    progress_bar = st.progress(0.0, text="데이터 분석 중...")
+
+    def update_progress(done, total):
+        progress_bar.progress(done / total, text=f"데이터 분석 중... ({done}/{total} 청크)")
+
+    converted_df = convert_records(records, progress=update_progress)
+    progress_bar.empty()
+
     return converted_df
 
 def upload_excel():
     st.subheader("엑셀 파일 업로드")
     
-    uploaded_file = st.file_uploader("엑셀 파일을 선택하세요", type=["xlsx", "xls"])
+    uploaded_file = st.file_uploader("엑셀 파일을 선택하세요", type=["xlsx"])
     
     if uploaded_file is not None:
-        df = pd.read_excel(uploaded_file)
-        st.write("원본 데이터:")
-        st.dataframe(df)
+        # 시트 선택 (read-only 모드로 시트 목록만 조회)
+        sheet = st.selectbox("시트 선택", options=list_sheets(uploaded_file))
+        total_rows = sheet_row_count(uploaded_file, sheet)
+
+        # 원본 데이터는 페이지 단위로만 미리보기
+        page_size = 50
+        page_count = max(-(-(total_rows or 0) // page_size), 1)
+        page = st.number_input("미리보기 페이지", min_value=1, max_value=page_count, value=1, step=1,
+                               key=f"upload_preview_page_{sheet}") - 1
+        header, rows = read_page(uploaded_file, sheet, page, page_size)
+        st.write(f"원본 데이터: (총 {total_rows if total_rows is not None else '?'}행, {page + 1}/{page_count} 페이지)")
+        st.dataframe(pd.DataFrame(rows, columns=header))
         
         if st.button("데이터 분석 및 변환"):
-            converted_df = analyze_excel(df)
+            try:
+                st.session_state.converted_df = analyze_excel(iter_records(uploaded_file, sheet))
+            except Exception as e:
+                st.error(f"데이터 변환 중 오류가 발생했습니다: {str(e)}")
+
+        converted_df = st.session_state.get('converted_df')
+        if converted_df is not None:
             st.write("변환된 데이터:")
             st.dataframe(converted_df)
-            
+
+            # 기존 항목과 비교해 신규/변경/동일 행을 구분 (같은 파일을 다시 올려도 중복되지 않음)
+            with engine.connect() as conn:
+                plan = plan_merge(conn, converted_df)
+                conn.commit()
+            counts = plan['status'].value_counts()
+            st.write(" · ".join(f"{label} {counts.get(status, 0)}건" for status, label in STATUS_LABELS.items()))
+            pending = plan[plan['status'].isin([STATUS_NEW, STATUS_MODIFIED])]
+            if not pending.empty:
+                st.dataframe(pending.assign(상태=pending['status'].map(STATUS_LABELS))[['상태'] + list(converted_df.columns)])
+
             if st.button("데이터베이스에 저장"):
+                # 미리보기 이후 다른 사용자가 바꿨을 수 있으므로 저장 직전에 다시 비교
                 with engine.connect() as conn:
-                    converted_df.to_sql('budget_items', conn, if_exists='append', index=False)
-                st.success("데이터가 성공적으로 저장되었습니다.")
+                    result = apply_merge(conn, plan_merge(conn, converted_df))
+                    conn.commit()
+                st.session_state.converted_df = None
+                st.success(f"데이터가 성공적으로 저장되었습니다. (추가 {result[STATUS_NEW]}건, 수정 {result[STATUS_MODIFIED]}건)")
 
 def main():
     create_tables()
     st.title('예산 관리 시스템')
     
     with st.sidebar:
-        selected = option_menu("메뉴", ["예산 입력", "지출 추가", "예산 조회", "엑셀 업로드"], 
-            icons=['pencil-fill', 'cash-coin', 'eye-fill', 'file-earmark-excel'], menu_icon="list", default_index=0)
+        selected = option_menu("메뉴", ["예산 입력", "지출 추가", "예산 조회", "분석", "엑셀 업로드"], 
+            icons=['pencil-fill', 'cash-coin', 'eye-fill', 'graph-up', 'file-earmark-excel'], menu_icon="list", default_index=0)
 
 
     if selected == "예산 입력":
@@ -276,6 +745,8 @@ def main():
         add_expense()
     elif selected == "예산 조회":
         view_budget()
+    elif selected == "분석":
+        view_analysis()
     elif selected == "엑셀 업로드":
         upload_excel()
 
@@ -0,0 +1,147 @@
+from datetime import date
+from threading import Lock
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+# 대분류별 소진율(burn-rate) 및 예산 소진 예상일 분석
+# 일자 x 대분류 단위 집계만 보관하고, 새로 추가된 지출(id 기준)만 반영한다.
+# 예산 항목의 대분류가 바뀌면(version이 올라감) 그 항목의 예전/새 대분류 열만 다시 집계한다.
+
+BURN_RATE_WINDOW_DAYS = 28
+# 이보다 먼 소진 예상일은 계산하지 않음 (Timedelta 범위 초과 방지, 화면에는 '10년 이상')
+MAX_FORECAST_DAYS = 3650
+
+
+class BurnRateAnalytics:
+    def __init__(self, engine):
+        self.engine = engine
+        self.last_expense_id = 0
+        # index: 지출일자, columns: 대분류, values: 일별 지출 합계
+        self.daily = pd.DataFrame(dtype='int64')
+        # 지출이 있는 예산 항목 id -> 집계에 반영된 대분류
+        self.item_categories: Dict[int, str] = {}
+        # budget_items의 (행 수, version 합계, 최대 id). 바뀌었을 때만 항목별 대분류를 다시 비교
+        self.items_fingerprint = None
+        self._lock = Lock()
+
+    def refresh(self) -> int:
+        # 마지막으로 처리한 id 이후의 지출만 읽어서 일별 집계에 더함
+        with self._lock:
+            with self.engine.connect() as conn:
+                self._rebuild_moved_categories(conn)
+                new_rows = pd.read_sql_query(text("""
+                    SELECT e.id, e.budget_item_id, e.지출일자, e.지출금액, COALESCE(bi.대분류, '미분류') AS 대분류
+                    FROM expenses e
+                    LEFT JOIN budget_items bi ON bi.id = e.budget_item_id
+                    WHERE e.id > :last_id
+                """), conn, params={"last_id": self.last_expense_id})
+
+            if new_rows.empty:
+                return 0
+
+            self._add_rows(new_rows)
+            self.last_expense_id = int(new_rows['id'].max())
+            return len(new_rows)
+
+    def _add_rows(self, rows: pd.DataFrame) -> None:
+        if rows.empty:
+            return
+        rows['지출일자'] = pd.to_datetime(rows['지출일자']).dt.normalize()
+        increment = rows.pivot_table(
+            index='지출일자', columns='대분류', values='지출금액', aggfunc='sum', fill_value=0
+        )
+        self.daily = self.daily.add(increment, fill_value=0).fillna(0).sort_index()
+        # 정수가 아닌 id(예전에 BLOB으로 저장된 값 등)는 예산 항목과 연결되지 않으므로 추적하지 않음
+        item_ids = pd.to_numeric(rows['budget_item_id'], errors='coerce')
+        items = rows[item_ids.notna()]
+        self.item_categories.update(zip(item_ids[item_ids.notna()].astype('int64'), items['대분류']))
+
+    def _rebuild_moved_categories(self, conn) -> None:
+        # 그리드/업로드로 대분류가 바뀐 항목이 있으면 예전/새 대분류 열을 지우고 이미 처리한 지출로 다시 집계
+        fingerprint = tuple(conn.execute(text("""
+            SELECT COUNT(*), COALESCE(SUM(version), 0), COALESCE(MAX(id), 0) FROM budget_items
+        """)).one())
+        if fingerprint == self.items_fingerprint:
+            return
+        self.items_fingerprint = fingerprint
+        if not self.item_categories:
+            return
+
+        current = dict(conn.execute(text("SELECT id, COALESCE(대분류, '미분류') FROM budget_items")).fetchall())
+        moved = {item_id: category for item_id, category in self.item_categories.items()
+                 if current.get(item_id, '미분류') != category}
+        if not moved:
+            return
+        affected = set(moved.values()) | {current.get(item_id, '미분류') for item_id in moved}
+
+        rows = pd.read_sql_query(text("""
+            SELECT e.id, e.budget_item_id, e.지출일자, e.지출금액, COALESCE(bi.대분류, '미분류') AS 대분류
+            FROM expenses e
+            LEFT JOIN budget_items bi ON bi.id = e.budget_item_id
+            WHERE e.id <= :last_id AND COALESCE(bi.대분류, '미분류') IN :categories
+        """).bindparams(bindparam('categories', expanding=True)),
+            conn, params={"last_id": self.last_expense_id, "categories": sorted(affected)})
+        self.daily = self.daily.drop(columns=sorted(affected), errors='ignore')
+        self._add_rows(rows)
+
+    def daily_spend(self) -> pd.DataFrame:
+        if self.daily.empty:
+            return self.daily
+        full_range = pd.date_range(self.daily.index.min(), self.daily.index.max(), freq='D')
+        return self.daily.reindex(full_range, fill_value=0)
+
+    def weekly_spend(self) -> pd.DataFrame:
+        daily = self.daily_spend()
+        if daily.empty:
+            return daily
+        return daily.resample('W-MON', label='left', closed='left').sum()
+
+    def cumulative_spend(self) -> pd.DataFrame:
+        return self.daily_spend().cumsum()
+
+    def burn_rate(self, today: Optional[date] = None, window_days: int = BURN_RATE_WINDOW_DAYS) -> pd.DataFrame:
+        today = pd.Timestamp(today or date.today()).normalize()
+
+        with self.engine.connect() as conn:
+            budgets = pd.read_sql_query(text("""
+                SELECT 대분류, SUM(배정예산) AS 배정예산
+                FROM budget_items
+                WHERE 대분류 IS NOT NULL
+                GROUP BY 대분류
+            """), conn).set_index('대분류')['배정예산']
+
+        daily = self.daily_spend()
+        categories = budgets.index.union(daily.columns)
+        budgets = budgets.reindex(categories, fill_value=0).astype('float64')
+
+        if daily.empty:
+            spent = pd.Series(0.0, index=categories)
+            recent = pd.Series(0.0, index=categories)
+        else:
+            daily = daily.reindex(columns=categories, fill_value=0)
+            spent = daily.sum()
+            window_start = today - pd.Timedelta(days=window_days - 1)
+            recent = daily.loc[(daily.index >= window_start) & (daily.index <= today)].sum()
+
+        # 최근 window 기간의 일평균 지출 = 소진율
+        rate = recent.to_numpy(dtype='float64') / window_days
+        remaining = budgets.to_numpy() - spent.to_numpy(dtype='float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            days_left = np.where(rate > 0, np.maximum(remaining, 0) / rate, np.nan)
+
+        forecast_days = np.where(days_left <= MAX_FORECAST_DAYS, np.ceil(days_left), np.nan)
+        exhaustion = pd.to_datetime(today) + pd.to_timedelta(forecast_days, unit='D')
+
+        return pd.DataFrame({
+            '배정예산': budgets.to_numpy(),
+            '총지출액': spent.to_numpy(),
+            '잔액': remaining,
+            '일평균지출': np.round(rate),
+            '소진율(%)': np.round(np.divide(spent.to_numpy(), budgets.to_numpy(),
+                                          out=np.zeros(len(categories)), where=budgets.to_numpy() > 0) * 100, 1),
+            '잔여일수': days_left,
+            '예상소진일': exhaustion.date,
+        }, index=pd.Index(categories, name='대분류'))
@@ -0,0 +1,123 @@
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+
+# 전체 예산 항목 그리드 (필터/정렬/페이지를 SQL에서 처리)
+#
+# - 필터(대분류, 항목명 검색)와 정렬은 WHERE/ORDER BY로, 페이지는 LIMIT/OFFSET으로 잘라 보이는 행만 읽음
+# - 요청합계/잔액은 페이지에 들어온 행만 expense_requests 인덱스로 집계
+#   (요청합계/잔액으로 정렬할 때만 전체 집계를 조인해 페이지를 고름)
+# - 편집은 data_editor의 edited_rows(행 위치 -> 바뀐 열)로 받아 행마다 따로 UPDATE/커밋
+#   읽어온 version과 일치할 때만 적용 (낙관적 잠금)
+# - event_planner에서 동기화된 행(source_key)은 다음 동기화에서 덮어쓰이므로 읽기 전용
+
+EDITABLE_COLUMNS = ['대분류', '항목명', '단가', '개수1', '단위1', '개수2', '단위2']
+PAGE_SIZES = [50, 100, 200]
+
+# 정렬 열 -> SQL 식 (r은 요청합계 집계)
+SORT_COLUMNS = {
+    'id': 'bi.id',
+    '대분류': 'bi.대분류',
+    '항목명': 'bi.항목명',
+    '단가': 'bi.단가',
+    '배정예산': 'bi.배정예산',
+    '요청합계': 'COALESCE(r.요청합계, 0)',
+    '잔액': 'bi.배정예산 - COALESCE(r.요청합계, 0)',
+}
+AGGREGATE_SORTS = {'요청합계', '잔액'}
+
+REQUEST_TOTALS = """
+    SELECT budget_item_id, SUM(요청금액) AS 요청합계
+    FROM expense_requests
+    WHERE 상태 != '반려' {scope}
+    GROUP BY budget_item_id
+"""
+
+
+class GridQuery(NamedTuple):
+    categories: Tuple[str, ...] = ()
+    search: str = ''
+    sort: str = 'id'
+    descending: bool = False
+
+
+def _where(query: GridQuery) -> Tuple[str, Dict[str, Any]]:
+    clauses, params = [], {}
+    if query.categories:
+        params.update({f"category{i}": category for i, category in enumerate(query.categories)})
+        clauses.append(f"bi.대분류 IN ({', '.join(':category' + str(i) for i in range(len(query.categories)))})")
+    if query.search.strip():
+        # LIKE 특수 문자는 그대로 검색되도록 이스케이프
+        escaped = query.search.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params['search'] = f"%{escaped}%"
+        clauses.append("bi.항목명 LIKE :search ESCAPE '\\'")
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+
+def _order_by(query: GridQuery) -> str:
+    direction = 'DESC' if query.descending else 'ASC'
+    return f"ORDER BY {SORT_COLUMNS[query.sort]} {direction}, bi.id {direction}"
+
+
+def count_rows(conn, query: GridQuery) -> int:
+    where, params = _where(query)
+    return conn.execute(text(f"SELECT COUNT(*) FROM budget_items bi {where}"), params).scalar()
+
+
+def load_page(conn, query: GridQuery, page: int, page_size: int) -> pd.DataFrame:
+    where, params = _where(query)
+    order_by = _order_by(query)
+    totals = ''
+    if query.sort in AGGREGATE_SORTS:
+        totals = f"LEFT JOIN ({REQUEST_TOTALS.format(scope='')}) r ON r.budget_item_id = bi.id"
+    page_scope = "AND budget_item_id IN (SELECT id FROM page)"
+    return pd.read_sql_query(text(f"""
+        WITH page AS (
+            SELECT bi.id FROM budget_items bi {totals} {where}
+            {order_by}
+            LIMIT :limit OFFSET :offset
+        )
+        SELECT bi.id, bi.version, bi.대분류, bi.항목명, bi.단가, bi.개수1, bi.단위1, bi.개수2, bi.단위2, bi.배정예산,
+               COALESCE(r.요청합계, 0) AS 요청합계,
+               bi.배정예산 - COALESCE(r.요청합계, 0) AS 잔액,
+               bi.source_key
+        FROM page
+        JOIN budget_items bi ON bi.id = page.id
+        LEFT JOIN ({REQUEST_TOTALS.format(scope=page_scope)}) r ON r.budget_item_id = bi.id
+        {order_by}
+    """), conn, params={**params, 'limit': page_size, 'offset': page * page_size})
+
+
+def _db_value(value):
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def save_row_edits(conn, page_df: pd.DataFrame,
+                   edited_rows: Dict[int, Dict[str, Any]]) -> Tuple[List[int], List[int]]:
+    # 편집한 행마다 따로 커밋. (version이 달라 적용하지 못한 행, 동기화 행이라 건너뛴 행)의 id 목록을 반환
+    conflicts, read_only = [], []
+    for position, changes in sorted(edited_rows.items(), key=lambda item: int(item[0])):
+        row = page_df.iloc[int(position)]
+        if pd.notna(row['source_key']):
+            read_only.append(int(row['id']))
+            continue
+        record = {col: _db_value(row[col]) for col in EDITABLE_COLUMNS}
+        record.update({col: _db_value(value) for col, value in changes.items() if col in EDITABLE_COLUMNS})
+        record['배정예산'] = int((record['단가'] or 0) * (record['개수1'] or 0) * (record['개수2'] or 0))
+        item_id = int(row['id'])
+
+        result = conn.execute(text("""
+            UPDATE budget_items
+            SET 대분류 = :대분류, 항목명 = :항목명, 단가 = :단가, 개수1 = :개수1, 단위1 = :단위1,
+                개수2 = :개수2, 단위2 = :단위2, 배정예산 = :배정예산, version = version + 1
+            WHERE id = :id AND version = :version AND source_key IS NULL
+        """), {**record, 'id': item_id, 'version': int(row['version'])})
+        if result.rowcount == 0:
+            conn.rollback()
+            conflicts.append(item_id)
+        else:
+            conn.commit()
+    return conflicts, read_only
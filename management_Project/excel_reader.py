@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import openpyxl
+
+# openpyxl read-only 모드 기반 스트리밍 엑셀 리더
+# 전체 시트를 DataFrame으로 만들지 않고 필요한 행만 순차적으로 읽는다.
+
+
+@contextmanager
+def open_workbook(file):
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield wb
+    finally:
+        wb.close()
+
+
+def list_sheets(file) -> List[str]:
+    with open_workbook(file) as wb:
+        return list(wb.sheetnames)
+
+
+def _header(ws, header_row: int) -> List[str]:
+    row = next(ws.iter_rows(min_row=header_row, max_row=header_row, values_only=True), ())
+    header = []
+    for idx, value in enumerate(row):
+        name = str(value).strip() if value not in (None, '') else f"열{idx + 1}"
+        # 중복 컬럼명 구분
+        while name in header:
+            name = f"{name}_"
+        header.append(name)
+    return header
+
+
+def _is_empty(values) -> bool:
+    return all(v in (None, '') for v in values)
+
+
+def sheet_row_count(file, sheet: str, header_row: int = 1) -> Optional[int]:
+    # 시트 dimension 정보가 없는 파일은 None
+    with open_workbook(file) as wb:
+        max_row = wb[sheet].max_row
+    return max(max_row - header_row, 0) if max_row else None
+
+
+def iter_records(file, sheet: str, header_row: int = 1) -> Iterator[Dict[str, Any]]:
+    with open_workbook(file) as wb:
+        ws = wb[sheet]
+        header = _header(ws, header_row)
+        for values in ws.iter_rows(min_row=header_row + 1, values_only=True):
+            if _is_empty(values):
+                continue
+            yield dict(zip(header, values))
+
+
+def read_page(file, sheet: str, page: int, page_size: int = 50, header_row: int = 1) -> Tuple[List[str], List[Tuple]]:
+    # 미리보기용 페이지 조회 - 요청한 범위의 행만 읽음
+    with open_workbook(file) as wb:
+        ws = wb[sheet]
+        header = _header(ws, header_row)
+        start = header_row + 1 + page * page_size
+        rows = [
+            tuple(values[:len(header)])
+            for values in islice(ws.iter_rows(min_row=start, max_row=start + page_size - 1, values_only=True), page_size)
+        ]
+    return header, rows
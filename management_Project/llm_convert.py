@@ -0,0 +1,224 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import openai
+import pandas as pd
+
+# 변환 결과 컬럼 설정
+TARGET_COLUMNS = ['대분류', '항목명', '단가', '개수1', '단위1', '개수2', '단위2', '배정예산']
+INT_COLUMNS = ['단가', '개수1', '개수2', '배정예산']
+
+# 청크/동시성/재시도 기본값 (환경 변수로 조정 가능)
+CHUNK_ROWS = int(os.getenv("LLM_CHUNK_ROWS", "40"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+BACKOFF_BASE = 1.0
+
+# 프롬프트가 바뀌면 캐시도 무효화되도록 버전을 해시에 포함
+PROMPT_VERSION = "v1"
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that analyzes Excel data and converts it to a specific format. "
+    "Always answer with a JSON object of the form {\"rows\": [...]} and nothing else."
+)
+
+USER_PROMPT = (
+    "Convert the following Excel rows (JSON records) to rows with the keys: "
+    "대분류, 항목명, 단가, 개수1, 단위1, 개수2, 단위2, 배정예산. "
+    "단가, 개수1, 개수2, 배정예산 must be integers. Skip rows that are not budget lines.\n\n{rows}"
+)
+
+
+class ChunkValidationError(ValueError):
+    pass
+
+
+# OpenAI 호환 백엔드 - api_base를 지정하면 로컬 스텁 서버 등으로 대체 가능
+class OpenAIBackend:
+    def __init__(self, model: str = "gpt-4o", api_base: Optional[str] = None, api_key: Optional[str] = None):
+        self.model = model
+        self.api_base = api_base
+        self.api_key = api_key
+
+    @property
+    def name(self) -> str:
+        return f"{self.api_base or 'openai'}:{self.model}"
+
+    async def complete(self, messages: List[Dict[str, str]]) -> str:
+        kwargs = {"model": self.model, "messages": messages, "temperature": 0}
+        if self.api_base:
+            kwargs["api_base"] = self.api_base
+        if self.api_key:
+            kwargs["api_key"] = self.api_key
+        response = await openai.ChatCompletion.acreate(**kwargs)
+        return response.choices[0].message['content']
+
+
+def get_backend() -> OpenAIBackend:
+    # LLM_BACKEND=local 이면 LLM_BASE_URL의 OpenAI 호환 서버(llm_stub_server.py 등)를 사용
+    backend = os.getenv("LLM_BACKEND", "openai")
+    model = os.getenv("LLM_MODEL", "gpt-4o")
+    if backend == "local":
+        return OpenAIBackend(
+            model=model,
+            api_base=os.getenv("LLM_BASE_URL", "http://127.0.0.1:8765/v1"),
+            api_key=os.getenv("LLM_API_KEY", "local"),
+        )
+    return OpenAIBackend(model=model)
+
+
+# 청크 해시 기반 결과 캐시 (LRU)
+class ChunkCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def set(self, key: str, rows: List[Dict[str, Any]]) -> None:
+        self._data[key] = rows
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# 모듈 단위 캐시는 Streamlit 재실행 간에도 유지됨
+chunk_cache = ChunkCache()
+
+
+def _json_default(value: Any) -> str:
+    return str(value)
+
+
+def chunk_records(records: Iterable[Dict[str, Any]], size: int = CHUNK_ROWS) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def chunk_key(chunk: List[Dict[str, Any]], backend_name: str) -> str:
+    payload = json.dumps(chunk, ensure_ascii=False, sort_keys=True, default=_json_default)
+    return hashlib.sha256(f"{PROMPT_VERSION}|{backend_name}|{payload}".encode('utf-8')).hexdigest()
+
+
+def _to_int(value: Any, field: str) -> int:
+    if value is None or value == '':
+        return 0
+    if isinstance(value, str):
+        value = value.replace(',', '').replace('₩', '').replace('원', '').strip()
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        raise ChunkValidationError(f"{field} 값이 숫자가 아닙니다: {value!r}")
+
+
+def _strip_code_fence(content: str) -> str:
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split('\n', 1)[1] if '\n' in content else ''
+        content = content.rsplit("```", 1)[0]
+    return content
+
+
+# 청크 단위 구조화 출력 검증
+def validate_chunk_output(content: str) -> List[Dict[str, Any]]:
+    try:
+        parsed = json.loads(_strip_code_fence(content))
+    except json.JSONDecodeError as e:
+        raise ChunkValidationError(f"JSON 파싱 실패: {e}")
+
+    rows = parsed.get('rows') if isinstance(parsed, dict) else parsed
+    if not isinstance(rows, list):
+        raise ChunkValidationError("응답에 rows 목록이 없습니다.")
+
+    validated = []
+    for row in rows:
+        if not isinstance(row, dict):
+            raise ChunkValidationError(f"행 형식이 올바르지 않습니다: {row!r}")
+        if not row.get('항목명'):
+            raise ChunkValidationError(f"항목명이 없는 행이 있습니다: {row!r}")
+        clean = {col: row.get(col) for col in TARGET_COLUMNS}
+        for col in INT_COLUMNS:
+            clean[col] = _to_int(clean[col], col)
+        for col in ['개수1', '개수2']:
+            clean[col] = clean[col] or 1
+        for col in ['대분류', '항목명', '단위1', '단위2']:
+            clean[col] = '' if clean[col] is None else str(clean[col]).strip()
+        if not clean['배정예산']:
+            clean['배정예산'] = clean['단가'] * clean['개수1'] * clean['개수2']
+        validated.append(clean)
+    return validated
+
+
+async def _convert_chunk(chunk: List[Dict[str, Any]], backend, semaphore: asyncio.Semaphore,
+                         cache: ChunkCache, max_retries: int) -> List[Dict[str, Any]]:
+    key = chunk_key(chunk, backend.name)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": USER_PROMPT.format(rows=json.dumps(chunk, ensure_ascii=False, default=_json_default))},
+    ]
+
+    last_error = None
+    for attempt in range(max_retries + 1):
+        try:
+            async with semaphore:
+                content = await backend.complete(messages)
+            rows = validate_chunk_output(content)
+            cache.set(key, rows)
+            return rows
+        except Exception as e:
+            last_error = e
+            if attempt < max_retries:
+                # 지수 백오프 + 지터
+                await asyncio.sleep(BACKOFF_BASE * (2 ** attempt) + random.uniform(0, BACKOFF_BASE))
+    raise last_error
+
+
+async def convert_records_async(records: Iterable[Dict[str, Any]], backend=None,
+                                chunk_rows: int = CHUNK_ROWS, max_concurrency: int = MAX_CONCURRENCY,
+                                max_retries: int = MAX_RETRIES, cache: Optional[ChunkCache] = None,
+                                progress: Optional[Callable[[int, int], None]] = None) -> pd.DataFrame:
+    backend = backend or get_backend()
+    cache = chunk_cache if cache is None else cache
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    tasks = [
+        asyncio.ensure_future(_convert_chunk(chunk, backend, semaphore, cache, max_retries))
+        for chunk in chunk_records(records, chunk_rows)
+    ]
+
+    done = 0
+    for future in asyncio.as_completed(tasks):
+        await future
+        done += 1
+        if progress:
+            progress(done, len(tasks))
+
+    # 청크 순서를 유지하여 결과 병합
+    rows = [row for task in tasks for row in task.result()]
+    return pd.DataFrame(rows, columns=TARGET_COLUMNS)
+
+
+def convert_records(records: Iterable[Dict[str, Any]], backend=None, **kwargs) -> pd.DataFrame:
+    return asyncio.run(convert_records_async(records, backend=backend, **kwargs))
@@ -0,0 +1,91 @@
+import argparse
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# OpenAI 호환 로컬 스텁 서버 (테스트 및 오프라인 실행용)
+# 사용법: python llm_stub_server.py --port 8765
+#        LLM_BACKEND=local LLM_BASE_URL=http://127.0.0.1:8765/v1 streamlit run app.py
+
+# 원본 컬럼명 -> 변환 컬럼명 매핑 (앞쪽 후보가 우선)
+COLUMN_ALIASES = {
+    '대분류': ['대분류', '구분', '분류', 'category'],
+    '항목명': ['항목명', '항목', '품목', '품명', '내용', 'item'],
+    '단가': ['단가', 'unit_price', 'price'],
+    '개수1': ['개수1', '수량', 'qty', 'quantity'],
+    '단위1': ['단위1', '단위', 'unit'],
+    '개수2': ['개수2', '기간', '일수', '횟수'],
+    '단위2': ['단위2', '기간단위', '기간 단위'],
+    '배정예산': ['배정예산', '금액', '합계', '예산', 'amount', 'total'],
+}
+
+
+def _pick(record, aliases):
+    for alias in aliases:
+        for key, value in record.items():
+            if key.strip().lower() == alias.lower() and value not in (None, ''):
+                return value
+    return None
+
+
+def convert_rows(records):
+    rows = []
+    for record in records:
+        row = {col: _pick(record, aliases) for col, aliases in COLUMN_ALIASES.items()}
+        if not row['항목명']:
+            continue
+        rows.append(row)
+    return rows
+
+
+def extract_records(prompt: str):
+    match = re.search(r'(\[.*\])\s*$', prompt, re.S)
+    if not match:
+        return []
+    return json.loads(match.group(1))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+
+        content = json.dumps({"rows": convert_rows(extract_records(prompt))}, ensure_ascii=False)
+        payload = json.dumps({
+            "id": f"stub-{int(time.time() * 1000)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get('model', 'stub'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }, ensure_ascii=False).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 LLM 스텁 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"LLM 스텁 서버 실행 중: http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
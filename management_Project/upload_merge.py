@@ -0,0 +1,166 @@
+import unicodedata
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# 엑셀 업로드 병합 (같은 파일을 다시 올려도 중복 행이 생기지 않게)
+#
+# - 행을 정규화(NFKC, 공백 정리, 숫자 정수화)한 뒤 대분류 안에서 (항목명, 같은 항목명의 몇 번째 행)을
+#   row_key로, 전체 열의 해시를 content_hash로 계산 (pandas 해시로 한 번에)
+# - upload_fingerprints에 budget_items 행별 (대분류, row_key, content_hash, version)을 보관
+#   version이 다르거나 지문이 없는 행(화면에서 수정/추가된 행)이 있는 대분류만 budget_items에서 다시 계산
+# - 업로드 행을 지문과 비교해 신규/변경/동일로 나누고, 신규는 INSERT, 변경은 UPDATE(version + 1)만 한
+#   트랜잭션에서 적용 (업로드에 없는 기존 행은 그대로 둠)
+
+MERGE_COLUMNS = ['대분류', '항목명', '단가', '개수1', '단위1', '개수2', '단위2', '배정예산']
+TEXT_COLUMNS = ['대분류', '항목명', '단위1', '단위2']
+INT_COLUMNS = ['단가', '개수1', '개수2', '배정예산']
+
+STATUS_NEW = 'new'
+STATUS_MODIFIED = 'modified'
+STATUS_UNCHANGED = 'unchanged'
+STATUS_LABELS = {STATUS_NEW: '신규', STATUS_MODIFIED: '변경', STATUS_UNCHANGED: '동일'}
+
+
+def ensure_fingerprint_schema(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS upload_fingerprints (
+            budget_item_id INTEGER PRIMARY KEY,
+            대분류 TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            content_hash INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            UNIQUE (대분류, row_key)
+        )
+    """))
+
+
+def _normalize_text(series: pd.Series) -> pd.Series:
+    return (series.fillna('').astype(str)
+            .map(lambda value: unicodedata.normalize('NFKC', value))
+            .str.replace(r'\s+', ' ', regex=True).str.strip())
+
+
+def normalize_rows(df: pd.DataFrame) -> pd.DataFrame:
+    normalized = pd.DataFrame(index=df.index)
+    for column in MERGE_COLUMNS:
+        values = df[column] if column in df else pd.Series(None, index=df.index, dtype=object)
+        if column in TEXT_COLUMNS:
+            normalized[column] = _normalize_text(values)
+        else:
+            normalized[column] = pd.to_numeric(values, errors='coerce').fillna(0).round().astype('int64')
+    return normalized[normalized['항목명'] != '']
+
+
+def fingerprint(normalized: pd.DataFrame) -> pd.DataFrame:
+    # 입력 순서(또는 id 순서)대로 같은 (대분류, 항목명)의 몇 번째 행인지를 row_key에 포함
+    occurrence = normalized.groupby(['대분류', '항목명'], sort=False).cumcount()
+    result = normalized.copy()
+    result['row_key'] = normalized['항목명'] + '#' + occurrence.astype(str)
+    result['content_hash'] = pd.util.hash_pandas_object(normalized[MERGE_COLUMNS], index=False).to_numpy().view(np.int64)
+    return result
+
+
+def _in_clause(prefix: str, values: List[str]) -> (str, Dict[str, str]):
+    params = {f"{prefix}{i}": value for i, value in enumerate(values)}
+    return ', '.join(':' + name for name in params), params
+
+
+def refresh_fingerprints(conn, categories: Iterable[str]) -> int:
+    # 지문이 없거나 오래된 행이 있는 대분류의 지문을 다시 계산. 다시 계산한 대분류 수를 반환
+    categories = sorted(set(categories))
+    if not categories:
+        return 0
+    placeholders, params = _in_clause('category', categories)
+    stale = [row[0] for row in conn.execute(text(f"""
+        SELECT TRIM(bi.대분류) FROM budget_items bi
+        LEFT JOIN upload_fingerprints f ON f.budget_item_id = bi.id
+        WHERE bi.source_key IS NULL AND TRIM(bi.대분류) IN ({placeholders})
+          AND (f.budget_item_id IS NULL OR f.version != bi.version)
+        UNION
+        SELECT f.대분류 FROM upload_fingerprints f
+        LEFT JOIN budget_items bi ON bi.id = f.budget_item_id
+        WHERE f.대분류 IN ({placeholders}) AND (bi.id IS NULL OR TRIM(bi.대분류) IS NOT f.대분류)
+    """), params)]
+    if not stale:
+        return 0
+
+    placeholders, params = _in_clause('stale', stale)
+    existing = pd.read_sql_query(text(f"""
+        SELECT id, version, {', '.join(MERGE_COLUMNS)} FROM budget_items
+        WHERE source_key IS NULL AND TRIM(대분류) IN ({placeholders})
+        ORDER BY id
+    """), conn, params=params)
+    conn.execute(text(f"DELETE FROM upload_fingerprints WHERE 대분류 IN ({placeholders})"), params)
+
+    normalized = normalize_rows(existing)
+    prints = fingerprint(normalized)
+    prints['budget_item_id'] = existing.loc[normalized.index, 'id']
+    prints['version'] = existing.loc[normalized.index, 'version']
+    if not prints.empty:
+        conn.execute(text("""
+            INSERT INTO upload_fingerprints (budget_item_id, 대분류, row_key, content_hash, version)
+            VALUES (:budget_item_id, :대분류, :row_key, :content_hash, :version)
+        """), prints[['budget_item_id', '대분류', 'row_key', 'content_hash', 'version']].to_dict(orient='records'))
+    return len(stale)
+
+
+def plan_merge(conn, df: pd.DataFrame) -> pd.DataFrame:
+    # 업로드 행별 status(new/modified/unchanged)와 대상 budget_item_id
+    ensure_fingerprint_schema(conn)
+    incoming = fingerprint(normalize_rows(df))
+    categories = sorted(incoming['대분류'].unique())
+    refresh_fingerprints(conn, categories)
+
+    if categories:
+        placeholders, params = _in_clause('category', categories)
+        known = pd.read_sql_query(text(f"""
+            SELECT 대분류, row_key, content_hash AS known_hash, budget_item_id FROM upload_fingerprints
+            WHERE 대분류 IN ({placeholders})
+        """), conn, params=params)
+    else:
+        known = pd.DataFrame(columns=['대분류', 'row_key', 'known_hash', 'budget_item_id'])
+
+    plan = incoming.merge(known, on=['대분류', 'row_key'], how='left')
+    plan['status'] = np.select(
+        [plan['budget_item_id'].isna(), plan['known_hash'] == plan['content_hash']],
+        [STATUS_NEW, STATUS_UNCHANGED],
+        STATUS_MODIFIED,
+    )
+    return plan.drop(columns=['known_hash'])
+
+
+def apply_merge(conn, plan: pd.DataFrame) -> Dict[str, int]:
+    # 신규 INSERT, 변경 UPDATE만 실행 (commit은 호출하는 쪽에서)
+    new_rows = plan[plan['status'] == STATUS_NEW]
+    for record in new_rows[MERGE_COLUMNS + ['row_key', 'content_hash']].to_dict(orient='records'):
+        item_id, version = conn.execute(text("""
+            INSERT INTO budget_items (대분류, 항목명, 단가, 개수1, 단위1, 개수2, 단위2, 배정예산)
+            VALUES (:대분류, :항목명, :단가, :개수1, :단위1, :개수2, :단위2, :배정예산)
+            RETURNING id, version
+        """), record).fetchone()
+        conn.execute(text("""
+            INSERT OR REPLACE INTO upload_fingerprints (budget_item_id, 대분류, row_key, content_hash, version)
+            VALUES (:budget_item_id, :대분류, :row_key, :content_hash, :version)
+        """), {**record, 'budget_item_id': item_id, 'version': version})
+
+    modified = plan[plan['status'] == STATUS_MODIFIED].copy()
+    if not modified.empty:
+        modified['budget_item_id'] = modified['budget_item_id'].astype('int64')
+        records = modified[MERGE_COLUMNS + ['budget_item_id', 'content_hash']].to_dict(orient='records')
+        conn.execute(text("""
+            UPDATE budget_items
+            SET 대분류 = :대분류, 항목명 = :항목명, 단가 = :단가, 개수1 = :개수1, 단위1 = :단위1,
+                개수2 = :개수2, 단위2 = :단위2, 배정예산 = :배정예산, version = version + 1
+            WHERE id = :budget_item_id
+        """), records)
+        conn.execute(text("""
+            UPDATE upload_fingerprints
+            SET content_hash = :content_hash,
+                version = (SELECT version FROM budget_items WHERE id = :budget_item_id)
+            WHERE budget_item_id = :budget_item_id
+        """), records)
+
+    return {status: int((plan['status'] == status).sum()) for status in STATUS_LABELS}